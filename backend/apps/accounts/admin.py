@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+from collections import Counter
+
+from django.apps import apps
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
+from django.db import transaction
+from django.utils.text import capfirst
 from django.utils.translation import gettext_lazy as _
 
+from apps.jobs.services.queue import enqueue
+from config.sqlite import serialized_writes
+
 from .models import User
+from .services.purge import count_user_rows
 
 
 @admin.register(User)
@@ -43,3 +52,28 @@ class UserAdmin(DjangoUserAdmin):
 
     list_filter = ("is_staff", "is_active")
     readonly_fields = ("date_joined", "last_login")
+
+    # Deletes go through the `accounts.purge_user` job: Django's cascade would
+    # remove a user's whole history in long single statements, and its
+    # confirmation page would list every study session and schedule.
+
+    def get_deleted_objects(self, objs, request):
+        users = list(objs)
+        perms_needed = set() if self.has_delete_permission(request) else {self.opts.verbose_name}
+        model_count = Counter({self.opts.verbose_name_plural: len(users)})
+        for user in users:
+            for label, count in count_user_rows(user.pk).items():
+                model_count[apps.get_model(label)._meta.verbose_name_plural] += count
+        to_delete = [f"{capfirst(self.opts.verbose_name)}: {user}" for user in users]
+        return to_delete, dict(model_count), perms_needed, []
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, [obj])
+
+    def delete_queryset(self, request, queryset):
+        # Deactivated now, purged by background jobs.
+        user_ids = [user.pk for user in queryset]
+        with serialized_writes(), transaction.atomic():
+            User.objects.filter(pk__in=user_ids).update(is_active=False)
+            for user_id in user_ids:
+                enqueue("accounts.purge_user", {"user_id": user_id})
@@ -0,0 +1,131 @@
+"""
+Account deletion without Django's deletion collector.
+
+`user.delete()` loads the rows of every relation it cannot fast-delete (the
+token tables, with the blacklist cascading from them, and the admin log)
+into Python, and removes each other dependent table in one statement: for a
+learner with a long history that is one DELETE of tens of thousands of
+study sessions, holding the database write lock for as long as it runs.
+`purge_user` walks the same relations from the model metadata and deletes
+each dependent table in batches, deepest tables first, one short
+transaction per batch. Each batch is a single `DELETE ... WHERE pk IN
+(SELECT pk ... LIMIT n)`, so no keys are fetched and memory stays the same
+however much data the user has; other writers get the lock between batches,
+and an interrupted purge can simply be run again.
+
+The user is deactivated first, so their tokens stop authenticating and no
+new rows arrive while the batches run. Purged rows get no delete signals;
+none of the user's dependents have receivers. The token blacklist tables are
+deleted too, although `OutstandingToken.user` is SET_NULL: tokens of a
+deleted account are of no use to anyone.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+
+from config.sqlite import serialized_writes
+
+
+# Dependents removed even though their foreign key to the user is SET_NULL.
+DELETE_SET_NULL = {"token_blacklist.outstandingtoken"}
+
+
+@dataclass(frozen=True)
+class PurgeStep:
+    model: type[models.Model]
+    # Lookup from `model` to the user's primary key, e.g. "token__user".
+    path: str
+    # Field set to NULL instead of deleting the row (`SET_NULL` relations).
+    nullify: str | None = None
+
+    @property
+    def label(self) -> str:
+        return self.model._meta.label_lower
+
+    def queryset(self, user_id, using: str):
+        return self.model._base_manager.using(using).filter(**{self.path: user_id})
+
+
+@dataclass
+class PurgeResult:
+    user_id: int
+    rows: Counter = field(default_factory=Counter)
+    batches: int = 0
+
+
+def _steps_for(model, path: str, seen: frozenset) -> list[PurgeStep]:
+    steps = []
+    for relation in model._meta.related_objects:
+        related = relation.related_model
+        if relation.many_to_many or related in seen:
+            continue
+        on_delete = relation.on_delete
+        child_path = f"{relation.field.name}__{path}" if path else relation.field.name
+        if on_delete is models.CASCADE or related._meta.label_lower in DELETE_SET_NULL:
+            steps += _steps_for(related, child_path, seen | {related})
+            steps.append(PurgeStep(related, child_path))
+        elif on_delete is models.SET_NULL:
+            steps.append(PurgeStep(related, child_path, nullify=relation.field.name))
+        elif on_delete in (models.PROTECT, models.RESTRICT):
+            raise ValueError(f"{related._meta.label} protects {model._meta.label} rows from deletion")
+    # Auto-created many-to-many tables (groups, permissions) of this model.
+    for m2m in model._meta.many_to_many:
+        through = m2m.remote_field.through
+        if through._meta.auto_created:
+            column = m2m.m2m_field_name()
+            steps.append(PurgeStep(through, f"{column}__{path}" if path else column))
+    return steps
+
+
+def purge_plan() -> list[PurgeStep]:
+    """Every table holding rows of a user, in a safe deletion order."""
+    User = get_user_model()
+    return _steps_for(User, "", frozenset({User}))
+
+
+def count_user_rows(user_id, *, using: str = DEFAULT_DB_ALIAS) -> Counter:
+    """Rows `purge_user` would remove or detach, per model label (one COUNT per table)."""
+    counts = Counter()
+    for step in purge_plan():
+        count = step.queryset(user_id, using).count()
+        if count:
+            counts[step.label] += count
+    return counts
+
+
+def _purge_step(step: PurgeStep, user_id, *, batch_size: int, using: str, result: PurgeResult) -> None:
+    # One statement per batch: the keys are picked by a LIMITed subquery, never fetched into Python.
+    pending = step.queryset(user_id, using).order_by().values("pk")
+    while True:
+        batch = step.model._base_manager.using(using).filter(pk__in=pending[:batch_size])
+        with serialized_writes(using), transaction.atomic(using=using):
+            count = batch.update(**{step.nullify: None}) if step.nullify else batch._raw_delete(using)
+        if count:
+            result.rows[step.label] += count
+            result.batches += 1
+        if count < batch_size:
+            return
+
+
+def purge_user(user_id, *, batch_size: int = 1000, using: str = DEFAULT_DB_ALIAS) -> PurgeResult:
+    """
+    Delete the user and everything that belongs to them in batches of
+    `batch_size` rows. Returns rows removed per model.
+    """
+
+    User = get_user_model()
+    result = PurgeResult(user_id=user_id)
+    with serialized_writes(using):
+        User._base_manager.using(using).filter(pk=user_id).update(is_active=False)
+
+    for step in purge_plan():
+        _purge_step(step, user_id, batch_size=batch_size, using=using, result=result)
+
+    with serialized_writes(using), transaction.atomic(using=using):
+        result.rows[User._meta.label_lower] += User._base_manager.using(using).filter(pk=user_id)._raw_delete(using)
+    return result
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from apps.jobs.registry import task
+
+from .services.purge import purge_user as purge
+
+
+@task("accounts.purge_user", max_attempts=5, lease_seconds=3600)
+def purge_user(user_id: int, batch_size: int = 1000):
+    return purge(user_id, batch_size=batch_size)
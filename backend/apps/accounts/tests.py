@@ -1,3 +1,94 @@
-from django.test import TestCase
+from collections import Counter
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.core.testing import QueryBudgetMixin
+from apps.jobs.services.worker import Worker
+from apps.learning.models import Course, Lesson
+from apps.tracking.models import RevisionSchedule, StudySession
+from apps.tracking.services.study_calendar import record_study_day
+
+from .services.purge import count_user_rows, purge_user
+
+
+PASSWORD = "correct horse battery"
+
+
+class AccountsQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email="learner@example.com", password=PASSWORD)
+
+    def test_register(self):
+        payload = {"first_name": "New", "email": "new@example.com", "password": PASSWORD}
+        self.assertQueryBudget(3, lambda: self.client.post("/api/auth/register/", payload, format="json"))
+
+    def test_login(self):
+        payload = {"email": self.user.email, "password": PASSWORD}
+        self.assertQueryBudget(2, lambda: self.client.post("/api/auth/login/", payload, format="json"))
+
+    def test_refresh(self):
+        payload = {"refresh": str(RefreshToken.for_user(self.user))}
+        # SimpleJWT rotation: blacklist check, user lookups, blacklist the old token, record the new one.
+        self.assertQueryBudget(13, lambda: self.client.post("/api/auth/refresh/", payload, format="json"))
+
+    def test_logout(self):
+        payload = {"refresh": str(RefreshToken.for_user(self.user))}
+        self.client.force_authenticate(self.user)
+        self.assertQueryBudget(7, lambda: self.client.post("/api/auth/logout/", payload, format="json"))
+
+    def test_me(self):
+        self.client.force_authenticate(self.user)
+        self.assertQueryBudget(0, lambda: self.client.get("/api/auth/me/"))
+
+
+class AccountDeleteTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email="learner@example.com", password=PASSWORD)
+        cls.other = get_user_model().objects.create_user(email="other@example.com", password=PASSWORD)
+
+    def add_history(self, user, sessions: int) -> None:
+        now = timezone.now()
+        course, _ = Course.objects.get_or_create(slug="english", defaults={"title": "English"})
+        lesson, _ = Lesson.objects.get_or_create(slug="lesson-0", defaults={"course": course, "title": "Lesson 0"})
+        StudySession.objects.bulk_create(StudySession(user=user, duration_seconds=60) for _ in range(sessions))
+        RevisionSchedule.objects.create(user=user, lesson=lesson, lesson_completed_at=now, next_review_at=now)
+        record_study_day(user_id=user.pk, seconds=60, now=now)
+        RefreshToken.for_user(user).blacklist()
+
+    @override_settings(JOBS_SCHEDULE={})
+    def test_delete_removes_all_user_rows(self):
+        self.add_history(self.user, sessions=25)
+        self.add_history(self.other, sessions=3)
+        before = count_user_rows(self.other.pk)
+        self.client.force_authenticate(self.user)
+
+        response = self.client.delete("/api/auth/me/", {"password": PASSWORD}, format="json")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(get_user_model().objects.get(pk=self.user.pk).is_active)
+        self.assertEqual(Worker().run(once=True).succeeded, 1)
+        self.assertFalse(get_user_model().objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(count_user_rows(self.user.pk), {})
+        self.assertEqual(count_user_rows(self.other.pk), before)
+
+    def test_purge_in_small_batches(self):
+        self.add_history(self.user, sessions=25)
+        rows = count_user_rows(self.user.pk)
+
+        result = purge_user(self.user.pk, batch_size=10)
+
+        self.assertEqual(count_user_rows(self.user.pk), {})
+        self.assertEqual(result.rows - Counter({"accounts.user": 1}), rows)
+        self.assertGreaterEqual(result.batches, 3)
+
+    def test_delete_requires_password(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.delete("/api/auth/me/", {"password": "wrong password"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(get_user_model().objects.filter(pk=self.user.pk, is_active=True).exists())
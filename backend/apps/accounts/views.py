@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 
-from .serializers import LoginSerializer, RegisterSerializer, UserSerializer
+from apps.jobs.services.queue import enqueue
+from config.sqlite import serialized_writes
+
+from .serializers import AccountDeleteSerializer, LoginSerializer, RegisterSerializer, UserSerializer
 
 
 User = get_user_model()
@@ -92,3 +96,15 @@ class MeView(APIView):
 
     def get(self, request):
         return Response(UserSerializer(request.user).data)
+
+    def delete(self, request):
+        """
+        Delete the account and all its data; the password confirms it. The
+        account is deactivated at once and purged by a background job.
+        """
+        serializer = AccountDeleteSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        with serialized_writes(), transaction.atomic():
+            User.objects.filter(pk=request.user.pk).update(is_active=False)
+            enqueue("accounts.purge_user", {"user_id": request.user.pk})
+        return Response(status=status.HTTP_202_ACCEPTED)
@@ -1,3 +1,9 @@
-from django.test import TestCase
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from apps.core.testing import QueryBudgetMixin
+
+
+class ContactQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    def test_create(self):
+        payload = {"name": "Learner", "phone": "+998901234567", "message": "Hello"}
+        self.assertQueryBudget(1, lambda: self.client.post("/api/contact/", payload, format="json"))
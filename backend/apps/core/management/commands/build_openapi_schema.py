@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from apps.core.openapi import schema_filename
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema into a versioned static file (run before collectstatic)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            default=None,
+            help="Directory to write into (defaults to settings.OPENAPI_SCHEMA_DIR).",
+        )
+
+    def handle(self, *args, **options):
+        output_dir = Path(options["output_dir"] or settings.OPENAPI_SCHEMA_DIR)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / schema_filename()
+
+        call_command("spectacular", "--file", str(path), "--format", "openapi-json", "--validate")
+        self.stdout.write(self.style.SUCCESS(f"Wrote OpenAPI schema to {path}"))
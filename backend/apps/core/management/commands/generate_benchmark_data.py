@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+
+def _datagen():
+    # `benchmarks` is a development-only package, not part of deployments:
+    # import it only when the command runs.
+    try:
+        from benchmarks import datagen
+    except ImportError as exc:
+        raise CommandError("generate_benchmark_data needs the `benchmarks` package (backend/benchmarks/).") from exc
+    return datagen
+
+
+class Command(BaseCommand):
+    help = "Generate deterministic synthetic users, lessons, study sessions and revision schedules for benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale", help="Preset sizes (small, medium, large); the options below override them."
+        )
+        parser.add_argument("--users", type=int)
+        parser.add_argument("--lessons", type=int)
+        parser.add_argument("--cards", type=int, help="Cards per lesson.")
+        parser.add_argument("--sessions", type=int, help="Closed study sessions per user.")
+        parser.add_argument("--lessons-per-user", type=int, help="Lessons each user has a revision schedule for.")
+        parser.add_argument("--seed", type=int)
+        parser.add_argument(
+            "--anchor",
+            type=datetime.fromisoformat,
+            help="ISO timestamp the data is generated around (default: midnight UTC today).",
+        )
+        parser.add_argument("--replace", action="store_true", help="Delete previously generated data first.")
+
+    def handle(self, *args, **options):
+        datagen = _datagen()
+        if options["scale"] and options["scale"] not in datagen.SCALES:
+            raise CommandError(f"Unknown scale {options['scale']!r}; choose from {', '.join(sorted(datagen.SCALES))}.")
+        base = datagen.SCALES[options["scale"]] if options["scale"] else datagen.Scale()
+        overrides = {
+            name: options[name]
+            for name in ("users", "lessons", "cards", "sessions", "lessons_per_user", "seed")
+            if options[name] is not None
+        }
+        scale = datagen.Scale(**{**base.as_dict(), **overrides})
+
+        if options["replace"]:
+            datagen.clear()
+        try:
+            counts = datagen.generate(scale, anchor=options["anchor"])
+        except IntegrityError as exc:
+            raise CommandError("Benchmark data already exists; pass --replace to regenerate it.") from exc
+
+        summary = ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Generated {summary}."))
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import os
+
+from django.conf import settings as django_settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+
+class LessonImageWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also serves generated lesson cover images
+    (`LESSON_IMAGE_ROOT` at `LESSON_IMAGE_URL`).
+
+    Their file names contain a hash of their contents, so they are always
+    cached as immutable. Variants generated after the worker started (a lesson
+    saved in the admin) are picked up from disk on their first request.
+    """
+
+    def __init__(self, get_response=None, settings=django_settings):
+        super().__init__(get_response, settings=settings)
+        self.image_root = os.path.abspath(settings.LESSON_IMAGE_ROOT)
+        self.image_prefix = ensure_leading_trailing_slash(settings.LESSON_IMAGE_URL)
+        if self.autorefresh or os.path.isdir(self.image_root):
+            self.add_files(self.image_root, prefix=self.image_prefix)
+
+    def __call__(self, request):
+        url = request.path_info
+        if not self.autorefresh and url.startswith(self.image_prefix) and url not in self.files:
+            self._add_new_image(url)
+        return super().__call__(request)
+
+    def _add_new_image(self, url: str) -> None:
+        if not self.url_is_canonical(url):
+            return
+        path = os.path.join(self.image_root, url[len(self.image_prefix) :])
+        if self.path_is_child_of(path, self.image_root + os.path.sep) and os.path.isfile(path):
+            self.add_file_to_dictionary(url, path)
+
+    def immutable_file_test(self, path, url):
+        if url.startswith(self.image_prefix):
+            return True
+        return super().immutable_file_test(path, url)
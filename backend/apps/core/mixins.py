@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from .renderers import JSONRenderer
+
+
+class StreamingListMixin:
+    """
+    For `ListAPIView`s with large, unpaginated results: the JSON response is
+    written while the queryset is iterated, a chunk of rows at a time, instead
+    of serializing the whole list and then encoding it. Peak memory per request
+    stays flat regardless of the list size, and the bytes sent are the same.
+
+    Falls back to the regular `list()` for paginated views, for renderers
+    other than `apps.core.renderers.JSONRenderer` (e.g. the browsable API) and
+    under ASGI, where Django would read the whole (sync) stream in a thread
+    before sending it, and warn: the memory saving is lost there anyway.
+
+    The status code is committed before the rows are read, so a failure while
+    streaming ends the response early rather than turning it into a 500.
+    """
+
+    stream_lists = True
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        renderer = getattr(request, "accepted_renderer", None)
+        renderer_context = self.get_renderer_context()
+        if (
+            not self.stream_lists
+            or isinstance(request._request, ASGIRequest)
+            or self.paginator is not None
+            or not isinstance(renderer, JSONRenderer)
+            or not renderer.can_stream(request.accepted_media_type, renderer_context)
+        ):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        items = (serializer.to_representation(obj) for obj in queryset.iterator(chunk_size=self.stream_chunk_size))
+        return StreamingHttpResponse(
+            renderer.render_list_stream(items, request.accepted_media_type, renderer_context),
+            content_type=f"{request.accepted_media_type}; charset={renderer.charset}"
+            if renderer.charset
+            else request.accepted_media_type,
+        )
@@ -0,0 +1,67 @@
+"""
+OpenAPI schema serving.
+
+In production the schema is generated once at deploy time by
+`build_openapi_schema` into a versioned static file, collected with content
+hashing and served by WhiteNoise with far-future caching. Live introspection
+(`SpectacularAPIView`) only runs when `DEBUG` is on.
+
+drf_spectacular is imported inside the views, not at module level: it is only
+needed by the docs endpoints, and keeping it off the URLconf import keeps it
+out of every worker's cold start.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+
+from django.conf import settings
+from django.http import Http404, HttpResponseRedirect
+from django.templatetags.static import static
+from django.utils.cache import patch_cache_control
+from django.views import View
+
+
+def schema_filename() -> str:
+    return f"schema-{settings.SPECTACULAR_SETTINGS['VERSION']}.json"
+
+
+def schema_static_url() -> str:
+    """
+    URL of the collected schema file; raises Http404 if it was never built.
+    """
+
+    try:
+        return static(f"openapi/{schema_filename()}")
+    except ValueError as exc:
+        # Manifest storage has no entry: `build_openapi_schema` + `collectstatic` were not run.
+        raise Http404("OpenAPI schema has not been built.") from exc
+
+
+class SchemaView(View):
+    def get(self, request, *args, **kwargs):
+        if settings.DEBUG:
+            from drf_spectacular.views import SpectacularAPIView
+
+            return SpectacularAPIView.as_view()(request, *args, **kwargs)
+
+        response = HttpResponseRedirect(schema_static_url())
+        patch_cache_control(response, public=True, max_age=300)
+        return response
+
+
+@cache
+def _swagger_view():
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    class SwaggerView(SpectacularSwaggerView):
+        def _get_schema_url(self, request):
+            if settings.DEBUG:
+                return super()._get_schema_url(request)
+            return schema_static_url()
+
+    return SwaggerView.as_view(url_name="schema")
+
+
+def swagger_view(request, *args, **kwargs):
+    return _swagger_view()(request, *args, **kwargs)
@@ -0,0 +1,33 @@
+"""
+JSON request parsing on orjson, with DRF's stdlib parser as the fallback
+(non-UTF-8 charsets, or orjson not installed).
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+_UTF8 = {"utf-8", "utf8"}
+
+
+class JSONParser(parsers.JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in _UTF8:
+            return super().parse(stream, media_type, parser_context)
+
+        # orjson rejects NaN/Infinity like DRF's strict mode does.
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,201 @@
+"""
+Plain-dict serialization for hot read paths.
+
+A `RowSerializer` wraps a DRF `ModelSerializer` and produces exactly the same
+output (same keys, same order, same JSON once rendered) from `.values()` rows,
+without building model instances or going through DRF's per-row field
+machinery (`get_attribute`, `to_representation` dispatch, nested serializer
+binding). The field list and per-field converters are compiled once from the
+DRF serializer, so the two cannot drift apart:
+
+    rows = REVISION_SCHEDULE_ROWS.values(queryset)
+    data = REVISION_SCHEDULE_ROWS.many(rows, context={"request": request})
+
+Supported fields: model fields (UUID/datetime/plain scalars get fast paths,
+anything else goes through the DRF field's own `to_representation`), nested
+single-object serializers, and `SerializerMethodField`s given explicitly as
+`methods={"name": (("lookup", …), fn)}`, called as `fn(*values, context)`.
+
+A nested serializer can also be filled from memory instead of a join:
+`in_memory={"lesson": load}` selects only the foreign key (`lesson_id`), and
+rendering calls `load(ids) -> {id: object}` once per batch of rows and reads
+the nested fields from those objects.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+
+_VALUE, _DATETIME, _NESTED, _METHOD = range(4)
+
+# Exact DRF field types whose `to_representation` is the identity for values
+# already coming out of the database as the right Python type.
+_IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.EmailField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.SlugField,
+)
+
+
+def _identity(value):
+    return value
+
+
+def _fast_datetime(field: serializers.DateTimeField) -> bool:
+    """Whether DRF renders this field as ISO 8601 in the current time zone."""
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    return (
+        output_format is not None
+        and output_format.lower() == ISO_8601
+        and not hasattr(field, "timezone")
+        and settings.USE_TZ
+    )
+
+
+def _iso_datetime(value, field: serializers.DateTimeField, tz) -> str:
+    if timezone.is_naive(value):
+        return field.to_representation(value)
+    # DateTimeField.enforce_timezone + isoformat, minus the dispatch.
+    value = value.astimezone(tz).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def _value_converter(field: serializers.Field):
+    if isinstance(field, serializers.UUIDField):
+        return str if field.uuid_format == "hex_verbose" else field.to_representation
+    if type(field) in _IDENTITY_FIELDS:
+        return _identity
+    return field.to_representation
+
+
+def _resolve(instance, lookup: str):
+    value = instance
+    for attr in lookup.split("__"):
+        if value is None:
+            return None
+        value = getattr(value, attr)
+    return value
+
+
+def _render(plan, row: dict, context: dict, tz) -> dict:
+    data = {}
+    for name, kind, key, payload in plan:
+        if kind == _VALUE:
+            value = row[key]
+            data[name] = None if value is None else payload(value)
+        elif kind == _DATETIME:
+            value = row[key]
+            data[name] = None if value is None else _iso_datetime(value, payload, tz)
+        elif kind == _NESTED:
+            data[name] = None if row[key] is None else _render(payload, row, context, tz)
+        else:
+            data[name] = payload(*(row[k] for k in key), context)
+    return data
+
+
+class RowSerializer:
+    def __init__(
+        self, serializer_class: type[serializers.ModelSerializer], *, methods=None, nested=None, in_memory=None
+    ):
+        self.serializer_class = serializer_class
+        self.methods = methods or {}
+        self.nested = nested or {}
+        self.in_memory = in_memory or {}
+
+    def _compile(self, prefix: str) -> tuple[list, list[str], list]:
+        plan = []
+        lookups = []
+        # (foreign key lookup, loader, nested lookups, their prefix, presence key) per in-memory nested field.
+        fills = []
+        serializer = self.serializer_class()
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in self.methods:
+                    raise ImproperlyConfigured(
+                        f"{self.serializer_class.__name__}.{name} is a SerializerMethodField; "
+                        "pass it to RowSerializer as methods={name: (lookups, fn)}."
+                    )
+                method_lookups, fn = self.methods[name]
+                keys = tuple(f"{prefix}{lookup}" for lookup in method_lookups)
+                plan.append((name, _METHOD, keys, fn))
+                lookups.extend(keys)
+                continue
+            if isinstance(field, serializers.ListSerializer) or field.source == "*":
+                raise ImproperlyConfigured(f"{self.serializer_class.__name__}.{name} cannot be read from a values() row.")
+
+            lookup = prefix + "__".join(field.source_attrs)
+            if isinstance(field, serializers.BaseSerializer):
+                nested = self.nested.get(name) or RowSerializer(type(field))
+                nested_plan, nested_lookups, nested_fills = nested._compile(f"{lookup}__")
+                pk_lookup = f"{lookup}__{field.Meta.model._meta.pk.name}"
+                if name in self.in_memory:
+                    # `pk_lookup` is not selected: `_fill` sets it, to None when the loader has no object.
+                    fk_lookup = prefix + self.serializer_class.Meta.model._meta.get_field(field.source).attname
+                    fills.append((fk_lookup, self.in_memory[name], nested_lookups, f"{lookup}__", pk_lookup))
+                    lookups.append(fk_lookup)
+                else:
+                    lookups.append(pk_lookup)
+                    lookups.extend(nested_lookups)
+                fills.extend(nested_fills)
+                plan.append((name, _NESTED, pk_lookup, nested_plan))
+            elif isinstance(field, serializers.DateTimeField) and _fast_datetime(field):
+                plan.append((name, _DATETIME, lookup, field))
+                lookups.append(lookup)
+            else:
+                plan.append((name, _VALUE, lookup, _value_converter(field)))
+                lookups.append(lookup)
+        return plan, lookups, fills
+
+    @cached_property
+    def _compiled(self) -> tuple[list, tuple[str, ...], list]:
+        plan, lookups, fills = self._compile("")
+        return plan, tuple(dict.fromkeys(lookups)), fills
+
+    def _fill(self, rows: list[dict]) -> None:
+        for fk_lookup, load, nested_lookups, prefix, pk_lookup in self._compiled[2]:
+            objects = load({row[fk_lookup] for row in rows if row[fk_lookup] is not None})
+            for row in rows:
+                obj = objects.get(row[fk_lookup])
+                # A missing object renders as null, like a null foreign key.
+                row[pk_lookup] = None if obj is None else row[fk_lookup]
+                for lookup in nested_lookups:
+                    row[lookup] = None if obj is None else _resolve(obj, lookup.removeprefix(prefix))
+
+    @property
+    def lookups(self) -> tuple[str, ...]:
+        """Everything `.values()` has to select for this serializer."""
+        return self._compiled[1]
+
+    def values(self, queryset):
+        return queryset.values(*self.lookups)
+
+    def one(self, row: dict, context: dict | None = None) -> dict:
+        self._fill([row])
+        return _render(self._compiled[0], row, context or {}, timezone.get_current_timezone())
+
+    def many(self, rows, context: dict | None = None) -> list[dict]:
+        plan = self._compiled[0]
+        context = context or {}
+        tz = timezone.get_current_timezone()
+        if self._compiled[2]:
+            rows = list(rows)
+            self._fill(rows)
+        return [_render(plan, row, context, tz) for row in rows]
+
+    def instance(self, obj, context: dict | None = None) -> dict:
+        """Serialize a model instance already in memory (e.g. one just created)."""
+        return self.one({lookup: _resolve(obj, lookup) for lookup in self.lookups}, context)
@@ -0,0 +1,81 @@
+"""
+Test helpers for query budgets and index usage.
+
+`QueryBudgetMixin.assertQueryBudget` calls an endpoint at several dataset
+sizes and fails unless every call makes the same number of queries, within
+the budget: an N+1 (a property that queries, a nested serializer without
+`select_related`) shows up as a count that grows with the data.
+
+`assertUsesIndex` runs `EXPLAIN` on a captured query and fails unless the
+plan uses the index Django created for a `Meta.indexes` entry. SQLite plans
+come from `EXPLAIN QUERY PLAN`; on PostgreSQL sequential scans are disabled
+while explaining, since test tables are small enough for the planner to
+prefer them.
+"""
+
+from __future__ import annotations
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+DATASET_SIZES = (1, 5, 20)
+
+
+class QueryBudgetMixin:
+    def capture_queries(self, call) -> tuple[object, list[str]]:
+        """`(response, sql list)` for `call()`."""
+        with CaptureQueriesContext(connection) as captured:
+            response = call()
+            if getattr(response, "streaming", False):
+                response.getvalue()  # streamed lists query while the body is read
+        return response, [query["sql"] for query in captured.captured_queries]
+
+    def assertQueryBudget(self, budget: int, call, *, grow=None, sizes=DATASET_SIZES, warm_up=False) -> list[str]:
+        """
+        Call `grow(size)` then `call()` for each size; every call must succeed
+        with the same query count, at most `budget`. Returns the last queries.
+        `warm_up` makes an uncounted call first, for endpoints that fill a
+        process cache on first use.
+        """
+
+        counts = {}
+        for size in sizes if grow else sizes[:1]:
+            if grow:
+                grow(size)
+            if warm_up:
+                call()
+            response, queries = self.capture_queries(call)
+            self.assertLess(response.status_code, 400, getattr(response, "data", response.status_code))
+            counts[size] = len(queries)
+
+        listing = "\n".join(queries)
+        self.assertEqual(len(set(counts.values())), 1, f"query count grows with the data {counts}:\n{listing}")
+        self.assertLessEqual(counts[size], budget, f"{counts[size]} queries, budget {budget}:\n{listing}")
+        return queries
+
+    def find_query(self, queries: list[str], table: str, *, contains: str = "") -> str:
+        """The first captured SELECT from `table` whose SQL contains `contains`."""
+        quoted = connection.ops.quote_name(table)
+        for sql in queries:
+            if sql.lstrip().upper().startswith("SELECT") and f"FROM {quoted}" in sql and contains in sql:
+                return sql
+        self.fail(f"no SELECT from {table} containing {contains!r} in:\n" + "\n".join(queries))
+
+    def explain(self, sql: str) -> str:
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                return "\n".join(str(row[-1]) for row in cursor.fetchall())
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                cursor.execute(f"EXPLAIN {sql}")
+                return "\n".join(row[0] for row in cursor.fetchall())
+            finally:
+                cursor.execute("RESET enable_seqscan")
+
+    def assertUsesIndex(self, sql: str, model, fields: list[str]) -> None:
+        index = next((index for index in model._meta.indexes if list(index.fields) == list(fields)), None)
+        self.assertIsNotNone(index, f"{model.__name__} declares no index on {fields}")
+        plan = self.explain(sql)
+        self.assertIn(index.name, plan, f"expected {index.name} {tuple(fields)} in the plan for\n{sql}\n\n{plan}")
@@ -0,0 +1,72 @@
+import json
+import os
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+from unittest import skipIf, skipUnless
+
+from django.test import SimpleTestCase
+from rest_framework import renderers as drf_renderers
+
+from benchmarks import cold_start
+
+from . import renderers
+
+
+# Module counts move with the Python version and dependency bumps; only a
+# jump past this fraction over the budget fails the test.
+MODULE_TOLERANCE = 1.1
+
+
+@skipUnless(os.environ.get("COLD_START_TESTS"), "set COLD_START_TESTS=1 to check the cold-start budget")
+class ColdStartBudgetTests(SimpleTestCase):
+    """
+    `benchmarks/cold_start_budget.json`, as `python -m benchmarks.cold_start --check`
+    applies it, minus the time limits and with `MODULE_TOLERANCE` on the module
+    counts. Opt-in (CI): it spawns `-X importtime` subprocesses.
+    """
+
+    def test_cold_start_within_budget(self):
+        budget = json.loads(cold_start.BUDGET_FILE.read_text())
+        for target in cold_start.TARGETS:
+            with self.subTest(target=target):
+                limits = {
+                    **budget[target],
+                    "total_ms": float("inf"),
+                    "modules": int(budget[target]["modules"] * MODULE_TOLERANCE),
+                }
+                result = cold_start.measure_best(target, "/api/lessons/", repeat=1)
+                self.assertEqual(cold_start.check_budget([result], {target: limits}), [])
+
+
+@skipIf(renderers.orjson is None, "orjson is not installed")
+class JSONRendererTests(SimpleTestCase):
+    """`apps.core.renderers.JSONRenderer` against DRF's stdlib renderer, and their documented differences."""
+
+    def render(self, data) -> tuple[bytes, bytes]:
+        return renderers.JSONRenderer().render(data), drf_renderers.JSONRenderer().render(data)
+
+    def test_same_bytes_as_drf(self):
+        data = {
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "english": "apple",
+            "uzbek": "Oʻzbekiston, so‘z, gʻisht — ўзбек тили 😀",
+            "separators": "a\u2028b\u2029c",
+            "rank": [12.3456, 0.1, 1.0, -0.0, 0.0001, 1e-10, 123456789.123, 1e16, 1.7976931348623157e308],
+            "count": [0, -1, 2**63 - 1],
+            "decimal": Decimal("1.10"),
+            "at": datetime(2026, 3, 4, 5, 6, 7, 891234, tzinfo=UTC),
+            "nothing": None,
+            "flags": [True, False],
+        }
+
+        fast, stdlib = self.render(data)
+
+        self.assertEqual(fast, stdlib)
+        self.assertIn("Oʻzbekiston".encode(), fast)
+
+    def test_documented_float_differences(self):
+        self.assertEqual(self.render([2.5e-7, 7.5e-5]), (b"[2.5e-7,0.000075]", b"[2.5e-07,7.5e-05]"))
+        self.assertEqual(renderers.JSONRenderer().render([float("nan"), float("inf")]), b"[null,null]")
+        with self.assertRaises(ValueError):
+            drf_renderers.JSONRenderer().render([float("nan")])
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from django.contrib import admin
+
+from .models import Job, JobSchedule
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_at", "started_at", "duration_ms", "claimed_by")
+    list_filter = ("status", "name")
+    search_fields = ("name", "claimed_by")
+    readonly_fields = (
+        "attempts",
+        "claimed_by",
+        "lease_expires_at",
+        "result",
+        "last_error",
+        "started_at",
+        "finished_at",
+        "duration_ms",
+    )
+    ordering = ("-created_at",)
+
+
+@admin.register(JobSchedule)
+class JobScheduleAdmin(admin.ModelAdmin):
+    list_display = ("name", "next_run_at", "last_enqueued_at")
+    ordering = ("name",)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.jobs.services.metrics import job_metrics
+
+
+COLUMNS = ("name", "queued", "running", "succeeded", "failed", "retries", "avg_ms", "max_ms", "lag_seconds")
+
+
+def _cell(value) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.0f}" if isinstance(value, float) else str(value)
+
+
+class Command(BaseCommand):
+    help = "Per-task job counts, retries, run times and queue lag."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24, help="Only jobs created in the last N hours (0: all).")
+        parser.add_argument("--json", action="store_true", help="Print JSON instead of a table.")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options["hours"]) if options["hours"] else None
+        metrics = job_metrics(since=since)
+
+        if options["json"]:
+            self.stdout.write(json.dumps([asdict(row) for row in metrics], indent=2))
+            return
+
+        rows = [COLUMNS] + [tuple(_cell(getattr(row, column)) for column in COLUMNS) for row in metrics]
+        widths = [max(len(row[i]) for row in rows) for i in range(len(COLUMNS))]
+        for row in rows:
+            self.stdout.write("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
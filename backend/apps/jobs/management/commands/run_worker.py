@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import signal
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs.services.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs and enqueue the periodic ones (settings.JOBS_SCHEDULE)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run everything that is due, then exit (e.g. from cron) instead of polling.",
+        )
+        parser.add_argument("--max-jobs", type=int, default=None, help="Exit after running this many jobs.")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Seconds to sleep when the queue is empty (default: settings.JOBS_POLL_SECONDS).",
+        )
+        parser.add_argument("--worker-id", default=None, help="Name recorded on claimed jobs (default: host:pid).")
+
+    def handle(self, *args, **options):
+        worker = Worker(worker_id=options["worker_id"], poll_seconds=options["poll_interval"])
+        # Let the current job finish on SIGTERM/SIGINT.
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: worker.stop())
+
+        self.stdout.write(f"Worker {worker.worker_id} started.")
+        result = worker.run(once=options["once"], max_jobs=options["max_jobs"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Worker {worker.worker_id} stopped after {result.jobs} jobs "
+                f"({result.succeeded} succeeded, {result.retried} to retry, {result.failed} failed)."
+            )
+        )
@@ -0,0 +1,65 @@
+"""
+Tasks the job worker can run.
+
+Apps declare them in a `tasks.py` module:
+
+    @task("tracking.close_stale_sessions")
+    def close_stale_sessions(batch_size: int = 1000): ...
+
+A job's `payload` is passed as keyword arguments and the return value (a
+dict, or a dataclass such as the services' result objects) is stored as its
+`result`. `tasks.py` modules are imported on first lookup rather than at
+startup, so web workers that never enqueue do not pay for them.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import autodiscover_modules
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    func: Callable
+    # Runs before the job is marked failed (the first run included).
+    max_attempts: int = 3
+    # How long a worker may run it before another worker can take it over;
+    # `settings.JOBS_LEASE_SECONDS` when unset.
+    lease_seconds: int | None = None
+
+
+_tasks: dict[str, Task] = {}
+_discovered = False
+
+
+def task(name: str, *, max_attempts: int = 3, lease_seconds: int | None = None):
+    """Register the decorated function as the task `name`."""
+
+    def register(func):
+        if name in _tasks and _tasks[name].func is not func:
+            raise ImproperlyConfigured(f"Job task {name!r} is registered twice.")
+        _tasks[name] = Task(name=name, func=func, max_attempts=max_attempts, lease_seconds=lease_seconds)
+        return func
+
+    return register
+
+
+def autodiscover() -> None:
+    global _discovered
+    if not _discovered:
+        autodiscover_modules("tasks")
+        _discovered = True
+
+
+def get_task(name: str) -> Task | None:
+    autodiscover()
+    return _tasks.get(name)
+
+
+def registered_tasks() -> dict[str, Task]:
+    autodiscover()
+    return dict(_tasks)
@@ -0,0 +1 @@
+"""Service layer for the jobs app."""
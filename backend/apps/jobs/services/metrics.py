@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum
+from django.utils import timezone
+
+from ..models import Job, JobStatus
+
+
+@dataclass
+class TaskMetrics:
+    name: str
+    queued: int
+    running: int
+    succeeded: int
+    failed: int
+    # Runs beyond the first, across all jobs of the task.
+    retries: int
+    avg_ms: float | None
+    max_ms: int | None
+    # How long the oldest due job has been waiting for a worker.
+    lag_seconds: float | None
+
+
+def job_metrics(*, since=None, now=None, using: str = DEFAULT_DB_ALIAS) -> list[TaskMetrics]:
+    """Per-task counts, retries, run times and queue lag, in one query (jobs created since `since`)."""
+
+    now = now or timezone.now()
+    jobs = Job.objects.using(using)
+    if since is not None:
+        jobs = jobs.filter(created_at__gte=since)
+
+    def count(status):
+        return Count("id", filter=Q(status=status))
+
+    rows = (
+        jobs.values("name")
+        .annotate(
+            queued=count(JobStatus.QUEUED),
+            running=count(JobStatus.RUNNING),
+            succeeded=count(JobStatus.SUCCEEDED),
+            failed=count(JobStatus.FAILED),
+            retries=Sum(F("attempts") - 1, filter=Q(attempts__gt=1), default=0),
+            avg_ms=Avg("duration_ms", filter=Q(status=JobStatus.SUCCEEDED)),
+            max_ms=Max("duration_ms", filter=Q(status=JobStatus.SUCCEEDED)),
+            oldest_due=Min("run_at", filter=Q(status=JobStatus.QUEUED, run_at__lte=now)),
+        )
+        .order_by("name")
+    )
+    return [
+        TaskMetrics(
+            **{key: value for key, value in row.items() if key != "oldest_due"},
+            lag_seconds=(now - row["oldest_due"]).total_seconds() if row["oldest_due"] else None,
+        )
+        for row in rows
+    ]
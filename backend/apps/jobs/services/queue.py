@@ -0,0 +1,165 @@
+"""
+The job queue: enqueueing, claiming and finishing `Job` rows.
+
+Enqueueing is an INSERT in the caller's transaction, so a job is queued if
+and only if the work that asked for it commits.
+
+Claiming picks the oldest due job and marks it running with a conditional
+UPDATE (`WHERE status = 'queued'`): of several workers racing for a row only
+one changes it, and the others move on. On PostgreSQL the pick is a
+`SELECT ... FOR UPDATE SKIP LOCKED`, so concurrent workers take different
+rows instead of waiting on each other's; SQLite has no row locks and a
+single writer, and its `BEGIN IMMEDIATE` transactions (`config.sqlite`)
+already queue the claims.
+
+A claim is a lease: a worker that dies mid-job leaves the row running until
+`lease_expires_at`, after which `requeue_expired` hands it to another worker
+(or fails it once it is out of attempts). Finishing a job is conditional on
+the claim, so a worker whose lease was taken over cannot overwrite the new
+run's outcome.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import random
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from config.sqlite import serialized_writes
+
+from ..models import Job, JobStatus
+from ..registry import get_task
+
+
+# Retry backoff: base * 2 ** (attempt - 1), capped, with up to 10% jitter.
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+# Kept at the end of `last_error` when a traceback is longer.
+MAX_ERROR_CHARS = 4000
+
+
+class UnknownTask(LookupError):
+    pass
+
+
+def enqueue(name: str, payload: dict | None = None, *, run_at=None, using: str = DEFAULT_DB_ALIAS) -> Job:
+    """Queue a run of the registered task `name` (now, or at `run_at`)."""
+
+    spec = get_task(name)
+    if spec is None:
+        raise UnknownTask(f"No job task named {name!r}.")
+    with serialized_writes(using):
+        return Job.objects.using(using).create(
+            name=name,
+            payload=payload or {},
+            run_at=run_at or timezone.now(),
+            max_attempts=spec.max_attempts,
+        )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+    return timedelta(seconds=seconds * (1 + random.random() / 10))
+
+
+def _lease(name: str) -> timedelta:
+    spec = get_task(name)
+    return timedelta(seconds=(spec and spec.lease_seconds) or settings.JOBS_LEASE_SECONDS)
+
+
+def claim(worker_id: str, *, now=None, using: str = DEFAULT_DB_ALIAS) -> Job | None:
+    """Mark the oldest due job as running for `worker_id` and return it (None if there is none)."""
+
+    now = now or timezone.now()
+    jobs = Job.objects.using(using)
+    due = jobs.filter(status=JobStatus.QUEUED, run_at__lte=now).order_by("run_at", "id")
+    if connections[using].features.has_select_for_update_skip_locked:
+        due = due.select_for_update(skip_locked=True)
+    # Unique per claim, so a lapsed claim by the same worker is told apart.
+    token = f"{worker_id}/{uuid.uuid4().hex[:8]}"
+
+    with serialized_writes(using), transaction.atomic(using=using):
+        candidate = due.values("id", "name").first()
+        if candidate is None:
+            return None
+        claimed = jobs.filter(id=candidate["id"], status=JobStatus.QUEUED).update(
+            status=JobStatus.RUNNING,
+            claimed_by=token,
+            attempts=F("attempts") + 1,
+            started_at=now,
+            lease_expires_at=now + _lease(candidate["name"]),
+        )
+    # Lost the race for it (SQLite without IMMEDIATE transactions).
+    return jobs.get(id=candidate["id"]) if claimed else None
+
+
+def _finish(job: Job, using: str, **fields) -> bool:
+    fields.setdefault("claimed_by", "")
+    fields.setdefault("lease_expires_at", None)
+    with serialized_writes(using):
+        updated = (
+            Job.objects.using(using)
+            .filter(id=job.id, status=JobStatus.RUNNING, claimed_by=job.claimed_by)
+            .update(**fields)
+        )
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return bool(updated)
+
+
+def _duration_ms(job: Job, now) -> int:
+    return max(int((now - job.started_at).total_seconds() * 1000), 0)
+
+
+def mark_succeeded(job: Job, result=None, *, now=None, using: str = DEFAULT_DB_ALIAS) -> bool:
+    """Record a finished run. False if the claim had lapsed and another worker owns the job now."""
+
+    now = now or timezone.now()
+    if dataclasses.is_dataclass(result):
+        # Shallow: `asdict` would rebuild `Counter` fields from their items.
+        result = {field.name: getattr(result, field.name) for field in dataclasses.fields(result)}
+    return _finish(
+        job,
+        using,
+        status=JobStatus.SUCCEEDED,
+        result=result,
+        last_error="",
+        finished_at=now,
+        duration_ms=_duration_ms(job, now),
+    )
+
+
+def mark_failed(job: Job, error: str, *, retry: bool = True, now=None, using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Record a failed run: queued again after `retry_delay` while attempts
+    remain (and `retry`), failed for good otherwise.
+    """
+
+    now = now or timezone.now()
+    fields = {"last_error": error[-MAX_ERROR_CHARS:], "duration_ms": _duration_ms(job, now)}
+    if retry and job.attempts < job.max_attempts:
+        fields.update(status=JobStatus.QUEUED, run_at=now + retry_delay(job.attempts))
+    else:
+        fields.update(status=JobStatus.FAILED, finished_at=now)
+    return _finish(job, using, **fields)
+
+
+def requeue_expired(*, now=None, using: str = DEFAULT_DB_ALIAS) -> int:
+    """Release running jobs whose lease has lapsed (their worker died). Returns how many."""
+
+    now = now or timezone.now()
+    expired = Job.objects.using(using).filter(status=JobStatus.RUNNING, lease_expires_at__lt=now)
+    released = {"claimed_by": "", "lease_expires_at": None, "last_error": "Worker lease expired."}
+    with serialized_writes(using), transaction.atomic(using=using):
+        failed = expired.filter(attempts__gte=F("max_attempts")).update(
+            status=JobStatus.FAILED, finished_at=now, **released
+        )
+        requeued = expired.update(status=JobStatus.QUEUED, run_at=now, **released)
+    return failed + requeued
@@ -0,0 +1,143 @@
+"""
+The `run_worker` loop: enqueue due periodic tasks, release lapsed claims,
+then claim and run jobs one at a time until stopped (or, with `once`, until
+nothing is due).
+
+Periodic tasks are declared in `settings.JOBS_SCHEDULE`:
+
+    JOBS_SCHEDULE = {"tracking.close_stale_sessions": {"every": 600, "payload": {}}}
+
+Each has a `JobSchedule` row; whichever worker moves its `next_run_at` on
+(a conditional UPDATE) enqueues the run, so any number of workers enqueue it
+once. A run is skipped while the previous one is still queued or running.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, transaction
+from django.utils import timezone
+
+from config.sqlite import serialized_writes
+
+from ..models import Job, JobSchedule, JobStatus
+from ..registry import get_task
+from .queue import claim, enqueue, mark_failed, mark_succeeded, requeue_expired
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkerResult:
+    succeeded: int = 0
+    retried: int = 0
+    failed: int = 0
+
+    @property
+    def jobs(self) -> int:
+        return self.succeeded + self.retried + self.failed
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_scheduled(*, now=None, using: str = DEFAULT_DB_ALIAS) -> list[Job]:
+    """Enqueue every periodic task whose `next_run_at` has passed."""
+
+    now = now or timezone.now()
+    schedule = settings.JOBS_SCHEDULE
+    rows = JobSchedule.objects.using(using)
+    jobs = []
+    for name, next_run_at in rows.filter(name__in=schedule, next_run_at__lte=now).values_list("name", "next_run_at"):
+        entry = schedule[name]
+        with serialized_writes(using), transaction.atomic(using=using):
+            advanced = rows.filter(name=name, next_run_at=next_run_at).update(
+                next_run_at=now + timedelta(seconds=entry["every"]), last_enqueued_at=now
+            )
+            if not advanced:
+                continue  # another worker got there first
+            pending = Job.objects.using(using).filter(name=name, status__in=(JobStatus.QUEUED, JobStatus.RUNNING))
+            if pending.exists():
+                continue
+            jobs.append(enqueue(name, entry.get("payload"), run_at=now, using=using))
+    return jobs
+
+
+class Worker:
+    def __init__(self, *, worker_id: str | None = None, poll_seconds: float | None = None, using=DEFAULT_DB_ALIAS):
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_seconds = settings.JOBS_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.using = using
+        self._stopping = threading.Event()
+
+    def stop(self) -> None:
+        """Finish the current job, then return from `run`."""
+        self._stopping.set()
+
+    def _ensure_schedules(self) -> None:
+        now = timezone.now()
+        with serialized_writes(self.using):
+            JobSchedule.objects.using(self.using).bulk_create(
+                [JobSchedule(name=name, next_run_at=now) for name in settings.JOBS_SCHEDULE],
+                ignore_conflicts=True,
+            )
+
+    def run(self, *, once: bool = False, max_jobs: int | None = None) -> WorkerResult:
+        result = WorkerResult()
+        self._ensure_schedules()
+        next_upkeep = 0.0
+        while not self._stopping.is_set() and (max_jobs is None or result.jobs < max_jobs):
+            close_old_connections()
+            if time.monotonic() >= next_upkeep:
+                enqueue_scheduled(using=self.using)
+                requeue_expired(using=self.using)
+                next_upkeep = time.monotonic() + self.poll_seconds
+
+            job = claim(self.worker_id, using=self.using)
+            if job is not None:
+                self.run_job(job, result)
+            elif once:
+                break
+            else:
+                self._stopping.wait(self.poll_seconds)
+        close_old_connections()
+        return result
+
+    def run_job(self, job: Job, result: WorkerResult) -> None:
+        spec = get_task(job.name)
+        if spec is None:
+            mark_failed(job, f"No job task named {job.name!r}.", retry=False, using=self.using)
+            result.failed += 1
+            return
+
+        started = time.perf_counter()
+        try:
+            value = spec.func(**job.payload)
+        except Exception:
+            mark_failed(job, traceback.format_exc(), using=self.using)
+            retried = job.status == JobStatus.QUEUED
+            logger.warning(
+                "Job %s #%s failed (attempt %s of %s)%s",
+                job.name, job.pk, job.attempts, job.max_attempts, ", will retry" if retried else "",
+                exc_info=True,
+            )
+            if retried:
+                result.retried += 1
+            else:
+                result.failed += 1
+            return
+
+        mark_succeeded(job, value, using=self.using)
+        result.succeeded += 1
+        logger.info("Job %s #%s succeeded in %.0f ms", job.name, job.pk, (time.perf_counter() - started) * 1000)
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from config.sqlite import serialized_writes
+
+from .models import Job, JobStatus
+from .registry import task
+
+
+@task("jobs.prune_finished")
+def prune_finished(batch_size: int = 1000) -> dict:
+    """Delete finished jobs older than `JOBS_KEEP_FINISHED_DAYS`, one short statement per batch."""
+
+    cutoff = timezone.now() - timedelta(days=settings.JOBS_KEEP_FINISHED_DAYS)
+    finished = Job.objects.filter(status__in=(JobStatus.SUCCEEDED, JobStatus.FAILED), finished_at__lt=cutoff)
+    deleted = 0
+    while True:
+        with serialized_writes():
+            count, _ = Job.objects.filter(pk__in=finished.values("pk")[:batch_size]).delete()
+        deleted += count
+        if count < batch_size:
+            return {"deleted": deleted}
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job, JobSchedule, JobStatus
+from .registry import task
+from .services.metrics import job_metrics
+from .services.queue import UnknownTask, claim, enqueue, mark_succeeded, requeue_expired
+from .services.worker import Worker, enqueue_scheduled
+
+
+calls = []
+
+
+@task("tests.record")
+def record(value: int = 0) -> dict:
+    calls.append(value)
+    return {"value": value}
+
+
+@task("tests.fail", max_attempts=2)
+def fail():
+    raise RuntimeError("boom")
+
+
+@override_settings(JOBS_SCHEDULE={})
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.now = timezone.now()
+
+    def test_enqueue_unknown_task(self):
+        with self.assertRaises(UnknownTask):
+            enqueue("tests.missing")
+
+    def test_claim_takes_each_due_job_once(self):
+        first = enqueue("tests.record", run_at=self.now - timedelta(seconds=2))
+        enqueue("tests.record", run_at=self.now + timedelta(hours=1))
+
+        job = claim("w1", now=self.now)
+        self.assertEqual((job.pk, job.status, job.attempts), (first.pk, JobStatus.RUNNING, 1))
+        self.assertTrue(job.claimed_by.startswith("w1/"))
+        self.assertIsNone(claim("w2", now=self.now))
+
+    def test_worker_runs_jobs(self):
+        enqueue("tests.record", {"value": 1})
+        enqueue("tests.record", {"value": 2})
+
+        result = Worker(poll_seconds=0).run(once=True)
+
+        self.assertEqual((result.succeeded, calls), (2, [1, 2]))
+        job = Job.objects.order_by("id").last()
+        self.assertEqual((job.status, job.result, job.claimed_by), (JobStatus.SUCCEEDED, {"value": 2}, ""))
+        self.assertIsNotNone(job.duration_ms)
+
+    def test_failed_job_is_retried_then_failed(self):
+        job = enqueue("tests.fail")
+
+        with self.assertLogs("apps.jobs.services.worker", "WARNING"):
+            self.assertEqual(Worker(poll_seconds=0).run(once=True).retried, 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.QUEUED, 1))
+        self.assertIn("RuntimeError: boom", job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs("apps.jobs.services.worker", "WARNING") as logs:
+            self.assertEqual(Worker(poll_seconds=0).run(once=True).failed, 1)
+        self.assertIn("attempt 2 of 2", logs.output[0])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.FAILED, 2))
+
+    def test_lapsed_claim_is_requeued_and_cannot_finish(self):
+        enqueue("tests.record", run_at=self.now)
+        enqueue("tests.fail", run_at=self.now)
+        lapsed = [claim("dead", now=self.now), claim("dead", now=self.now)]
+        Job.objects.filter(name="tests.fail").update(attempts=2)
+
+        later = self.now + timedelta(days=1)
+        self.assertEqual(requeue_expired(now=later), 2)
+        self.assertEqual(Job.objects.get(name="tests.record").status, JobStatus.QUEUED)
+        self.assertEqual(Job.objects.get(name="tests.fail").status, JobStatus.FAILED)
+        self.assertFalse(mark_succeeded(lapsed[0], now=later))
+
+    def test_metrics(self):
+        enqueue("tests.record")
+        enqueue("tests.fail")
+        with self.assertLogs("apps.jobs.services.worker", "WARNING"):
+            Worker(poll_seconds=0).run(once=True)
+        enqueue("tests.record", run_at=timezone.now() - timedelta(minutes=1))
+
+        metrics = {row.name: row for row in job_metrics()}
+
+        self.assertEqual((metrics["tests.record"].succeeded, metrics["tests.record"].queued), (1, 1))
+        self.assertGreaterEqual(metrics["tests.record"].lag_seconds, 60)
+        self.assertEqual((metrics["tests.fail"].queued, metrics["tests.fail"].failed), (1, 0))
+
+
+@override_settings(JOBS_SCHEDULE={"tests.record": {"every": 60, "payload": {"value": 7}}})
+class JobScheduleTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_periodic_task_is_enqueued_once_per_period(self):
+        now = timezone.now()
+        JobSchedule.objects.create(name="tests.record", next_run_at=now)
+
+        self.assertEqual(len(enqueue_scheduled(now=now)), 1)
+        self.assertEqual(enqueue_scheduled(now=now), [])
+        # Due again, but the previous run has not been picked up yet.
+        self.assertEqual(enqueue_scheduled(now=now + timedelta(minutes=2)), [])
+        self.assertEqual(Job.objects.get().payload, {"value": 7})
+
+    def test_worker_creates_schedules(self):
+        Worker(poll_seconds=0).run(once=True)
+
+        self.assertEqual(calls, [7])
+        self.assertGreater(JobSchedule.objects.get(name="tests.record").next_run_at, timezone.now())
@@ -18,6 +18,7 @@ class LessonAdmin(admin.ModelAdmin):
     search_fields = ("title", "slug")
     list_filter = ("course",)
     ordering = ("course", "order")
+    readonly_fields = ("cover_image_variants",)
 
 
 @admin.register(LessonCard)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.learning.models import Lesson
+from apps.learning.services.images import build_lesson_images
+
+
+class Command(BaseCommand):
+    help = "Generate responsive AVIF/WebP/JPEG variants of lesson cover images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lesson",
+            action="append",
+            default=None,
+            help="Only this lesson slug (repeatable).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate even if the variants are up to date.",
+        )
+
+    def handle(self, *args, **options):
+        lessons = Lesson.objects.order_by("order", "title")
+        if options["lesson"]:
+            lessons = lessons.filter(slug__in=options["lesson"])
+
+        updated = build_lesson_images(lessons, force=options["force"])
+        for slug in updated:
+            self.stdout.write(f"  {slug}")
+
+        self.stdout.write(self.style.SUCCESS(f"Updated cover images for {len(updated)} lesson(s)."))
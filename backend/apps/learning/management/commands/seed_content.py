@@ -4,13 +4,35 @@ import json
 from pathlib import Path
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import DEFAULT_DB_ALIAS, transaction
 
-from apps.learning.models import Course, Lesson, LessonCard
+from apps.learning.models import ContentKind, Course, Lesson, LessonCard
+from apps.learning.services.content_sync import publishing
+from apps.learning.services.search import refresh_search_index
+
+
+CARD_FIELDS = ("order", "uzbek", "pronunciation", "mnemonic_example", "translation")
+
+
+def _upsert(queryset, lookup: dict, values: dict):
+    """Create the object, or save the fields that differ; untouched when nothing does."""
+
+    obj = queryset.filter(**lookup).first()
+    if obj is None:
+        return queryset.create(**lookup, **values)
+    changed = [name for name, value in values.items() if getattr(obj, name) != value]
+    if changed:
+        for name in changed:
+            setattr(obj, name, values[name])
+        obj.save(using=queryset.db, update_fields=changed)
+    return obj
 
 
 class Command(BaseCommand):
-    help = "Seed initial Course/Lesson/LessonCard data from seed.json"
+    help = (
+        "Seed Course/Lesson/LessonCard data from seed.json. Rows are updated in place (cards keep their ids, "
+        "matched by lesson and English word) and the changes are published as one content version."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -18,9 +40,30 @@ class Command(BaseCommand):
             default=None,
             help="Optional path to seed.json (defaults to apps/learning/seed_data/seed.json).",
         )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to seed (e.g. `replica` when testing with two local databases).",
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
+        db = options["database"]
+        with transaction.atomic(using=db), publishing("seed_content", using=db) as batch:
+            self.seed(options, batch)
+
+        if batch.version is None:
+            self.stdout.write(self.style.SUCCESS("Seeded content successfully (no changes)."))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Seeded content successfully: version {batch.version.version} "
+                    f"({batch.version.change_count} changes)."
+                )
+            )
+
+    def seed(self, options, batch):
+        db = options["database"]
+
         if options["path"]:
             seed_path = Path(options["path"]).resolve()
         else:
@@ -33,9 +76,12 @@ class Command(BaseCommand):
         course_data = seed["course"]
         lessons_data = seed["lessons"]
 
-        course, _ = Course.objects.update_or_create(
-            slug=course_data["slug"],
-            defaults={
+        # Saves go through the models (and are recorded by their signals);
+        # cards are written in bulk and added to the batch here.
+        course = _upsert(
+            Course.objects.using(db),
+            {"slug": course_data["slug"]},
+            {
                 "title": course_data["title"],
                 "description": course_data.get("description", ""),
                 "is_active": True,
@@ -43,31 +89,42 @@ class Command(BaseCommand):
         )
 
         for lesson_data in lessons_data:
-            lesson, _ = Lesson.objects.update_or_create(
-                slug=lesson_data["slug"],
-                defaults={
+            lesson = _upsert(
+                Lesson.objects.using(db),
+                {"slug": lesson_data["slug"]},
+                {
                     "course": course,
                     "title": lesson_data["title"],
                     "cover_image_path": lesson_data.get("cover_image_path", ""),
                     "order": int(lesson_data.get("order", 0)),
                 },
             )
+            self.seed_cards(db, batch, lesson, lesson_data.get("cards", []))
 
-            LessonCard.objects.filter(lesson=lesson).delete()
-            LessonCard.objects.bulk_create(
-                [
-                    LessonCard(
-                        lesson=lesson,
-                        order=int(card.get("order", idx + 1)),
-                        english=card["english"],
-                        uzbek=card["uzbek"],
-                        pronunciation=card.get("pronunciation", ""),
-                        mnemonic_example=card.get("mnemonic_example", ""),
-                        translation=card.get("translation", ""),
-                    )
-                    for idx, card in enumerate(lesson_data.get("cards", []))
-                ],
-                batch_size=500,
-            )
+        refresh_search_index(db)
+
+    def seed_cards(self, db, batch, lesson, cards_data) -> None:
+        existing = {card.english: card for card in LessonCard.objects.using(db).filter(lesson=lesson)}
+        to_create, to_update = [], []
+        for idx, card in enumerate(cards_data):
+            values = {
+                "order": int(card.get("order", idx + 1)),
+                "uzbek": card["uzbek"],
+                "pronunciation": card.get("pronunciation", ""),
+                "mnemonic_example": card.get("mnemonic_example", ""),
+                "translation": card.get("translation", ""),
+            }
+            current = existing.pop(card["english"], None)
+            if current is None:
+                to_create.append(LessonCard(lesson=lesson, english=card["english"], **values))
+            elif any(getattr(current, name) != value for name, value in values.items()):
+                for name, value in values.items():
+                    setattr(current, name, value)
+                to_update.append(current)
 
-        self.stdout.write(self.style.SUCCESS("Seeded content successfully."))
+        LessonCard.objects.using(db).bulk_create(to_create, batch_size=500)
+        LessonCard.objects.using(db).bulk_update(to_update, CARD_FIELDS, batch_size=500)
+        batch.add(ContentKind.CARD, [card.id for card in (*to_create, *to_update)])
+        if existing:
+            # Per-object delete signals record these.
+            LessonCard.objects.using(db).filter(id__in=[card.id for card in existing.values()]).delete()
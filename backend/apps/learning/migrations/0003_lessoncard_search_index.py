@@ -0,0 +1,94 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:40
+
+from django.db import DatabaseError, migrations, transaction
+
+
+CARD_TABLE = "learning_lessoncard"
+FTS_TABLE = "learning_lessoncard_fts"
+SEARCH_COLUMNS = ("english", "uzbek", "pronunciation", "translation")
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+
+# SQLite: external-content FTS5 index over the card table (keyed by its
+# implicit rowid), kept in sync by triggers. Apostrophes are separators, so
+# o‘zbek / o'zbek / oʻzbek all tokenize alike.
+SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE "{FTS_TABLE}" USING fts5(
+        {_columns},
+        content='{CARD_TABLE}',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER "{FTS_TABLE}_ai" AFTER INSERT ON "{CARD_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}" (rowid, {_columns}) VALUES (new.rowid, {_new_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER "{FTS_TABLE}_ad" AFTER DELETE ON "{CARD_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}" ("{FTS_TABLE}", rowid, {_columns}) VALUES ('delete', old.rowid, {_old_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER "{FTS_TABLE}_au" AFTER UPDATE ON "{CARD_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}" ("{FTS_TABLE}", rowid, {_columns}) VALUES ('delete', old.rowid, {_old_values});
+        INSERT INTO "{FTS_TABLE}" (rowid, {_columns}) VALUES (new.rowid, {_new_values});
+    END
+    """,
+    f"""INSERT INTO "{FTS_TABLE}" ("{FTS_TABLE}") VALUES ('rebuild')""",
+]
+
+# PostgreSQL: trigram GIN indexes matching the `UPPER(col::text) LIKE` that
+# `icontains` compiles to.
+POSTGRES_TRGM_DDL = [
+    f'CREATE INDEX IF NOT EXISTS "{CARD_TABLE}_{column}_trgm" ON "{CARD_TABLE}" '
+    f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+    for column in SEARCH_COLUMNS
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                for statement in SQLITE_FTS_DDL:
+                    schema_editor.execute(statement)
+        except DatabaseError:
+            # SQLite built without FTS5: search falls back to the in-process trie.
+            pass
+    elif vendor == "postgresql":
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError:
+            # No privilege to install pg_trgm: search falls back to the in-process trie.
+            return
+        for statement in POSTGRES_TRGM_DDL:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS "{FTS_TABLE}_{suffix}"')
+        schema_editor.execute(f'DROP TABLE IF EXISTS "{FTS_TABLE}"')
+    elif vendor == "postgresql":
+        for column in SEARCH_COLUMNS:
+            schema_editor.execute(f'DROP INDEX IF EXISTS "{CARD_TABLE}_{column}_trgm"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0002_lesson_cover_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0003_lessoncard_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentVersion',
+            fields=[
+                ('version', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('source', models.CharField(max_length=50)),
+                ('change_count', models.PositiveIntegerField(default=0)),
+                ('published_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-version'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ContentChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('course', 'Course'), ('lesson', 'Lesson'), ('card', 'Card')], max_length=8)),
+                ('object_id', models.UUIDField()),
+                ('version', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='learning.contentversion')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('version', 'kind', 'object_id'), name='uniq_content_change')],
+            },
+        ),
+    ]
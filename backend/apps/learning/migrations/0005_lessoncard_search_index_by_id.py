@@ -0,0 +1,104 @@
+# Generated by Django 6.0.2 on 2026-10-19 21:10
+
+from importlib import import_module
+
+from django.db import DatabaseError, migrations, transaction
+
+
+CARD_TABLE = "learning_lessoncard"
+FTS_TABLE = "learning_lessoncard_fts"
+DOC_TABLE = "learning_lessoncard_fts_doc"
+SEARCH_COLUMNS = ("english", "uzbek", "pronunciation", "translation")
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+_card_values = ", ".join(f"card.{column}" for column in SEARCH_COLUMNS)
+
+# SQLite: 0003 keyed the index by the card table's implicit rowid, which VACUUM
+# may renumber (the primary key is a UUID). Key it by the card id instead: each
+# card gets a `docid` in DOC_TABLE (an INTEGER PRIMARY KEY, so VACUUM keeps it)
+# and the contentless FTS5 table uses that docid as its rowid.
+SQLITE_FTS_DDL = [
+    f"""
+    CREATE TABLE "{DOC_TABLE}" (
+        "docid" integer NOT NULL PRIMARY KEY,
+        "card_id" char(32) NOT NULL UNIQUE
+    )
+    """,
+    f"""
+    CREATE VIRTUAL TABLE "{FTS_TABLE}" USING fts5(
+        {_columns},
+        content='',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER "{FTS_TABLE}_ai" AFTER INSERT ON "{CARD_TABLE}" BEGIN
+        INSERT INTO "{DOC_TABLE}" (card_id) VALUES (new.id);
+        INSERT INTO "{FTS_TABLE}" (rowid, {_columns})
+            SELECT docid, {_new_values} FROM "{DOC_TABLE}" WHERE card_id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER "{FTS_TABLE}_ad" AFTER DELETE ON "{CARD_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}" ("{FTS_TABLE}", rowid, {_columns})
+            SELECT 'delete', docid, {_old_values} FROM "{DOC_TABLE}" WHERE card_id = old.id;
+        DELETE FROM "{DOC_TABLE}" WHERE card_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER "{FTS_TABLE}_au" AFTER UPDATE ON "{CARD_TABLE}" BEGIN
+        INSERT INTO "{FTS_TABLE}" ("{FTS_TABLE}", rowid, {_columns})
+            SELECT 'delete', docid, {_old_values} FROM "{DOC_TABLE}" WHERE card_id = old.id;
+        UPDATE "{DOC_TABLE}" SET card_id = new.id WHERE card_id = old.id;
+        INSERT INTO "{FTS_TABLE}" (rowid, {_columns})
+            SELECT docid, {_new_values} FROM "{DOC_TABLE}" WHERE card_id = new.id;
+    END
+    """,
+    f'INSERT INTO "{DOC_TABLE}" (card_id) SELECT id FROM "{CARD_TABLE}"',
+    f"""
+    INSERT INTO "{FTS_TABLE}" (rowid, {_columns})
+        SELECT doc.docid, {_card_values} FROM "{DOC_TABLE}" AS doc
+        JOIN "{CARD_TABLE}" AS card ON card.id = doc.card_id
+    """,
+]
+
+
+def _drop_sqlite_index(schema_editor):
+    for suffix in ("ai", "ad", "au"):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS "{FTS_TABLE}_{suffix}"')
+    schema_editor.execute(f'DROP TABLE IF EXISTS "{FTS_TABLE}"')
+    schema_editor.execute(f'DROP TABLE IF EXISTS "{DOC_TABLE}"')
+
+
+def key_search_index_by_id(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    _drop_sqlite_index(schema_editor)
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            for statement in SQLITE_FTS_DDL:
+                schema_editor.execute(statement)
+    except DatabaseError:
+        # SQLite built without FTS5: search falls back to the in-process trie.
+        pass
+
+
+def key_search_index_by_rowid(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    _drop_sqlite_index(schema_editor)
+    import_module("apps.learning.migrations.0003_lessoncard_search_index").create_search_index(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0004_content_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(key_search_index_by_id, key_search_index_by_rowid),
+    ]
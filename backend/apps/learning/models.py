@@ -5,6 +5,8 @@ import uuid
 from django.db import models
 from django.utils.text import slugify
 
+from .services.images import queue_lesson_images
+
 
 class Course(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -36,6 +38,8 @@ class Lesson(models.Model):
     title = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True)
     cover_image_path = models.CharField(max_length=500, blank=True)
+    # Generated responsive variants of the cover (see `services.images`).
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -46,19 +50,48 @@ class Lesson(models.Model):
         ]
         ordering = ["order", "title"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_cover_image_path = instance.__dict__.get("cover_image_path", models.DEFERRED)
+        return instance
+
+    def _cover_image_changed(self, update_fields) -> bool:
+        if update_fields is not None and "cover_image_path" not in update_fields:
+            return False
+        if "cover_image_path" not in self.__dict__:
+            return False
+        return self.cover_image_path != getattr(self, "_saved_cover_image_path", "")
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        update_fields = kwargs.get("update_fields")
+        cover_changed = self._cover_image_changed(update_fields)
+        if cover_changed:
+            # The old variants show the old image; the job generates the new ones.
+            self.cover_image_variants = {}
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "cover_image_variants"}
         super().save(*args, **kwargs)
+        self._saved_cover_image_path = self.cover_image_path
+        if cover_changed and self.cover_image_path:
+            queue_lesson_images([self.pk], using=self._state.db)
 
     @property
     def card_count(self) -> int:
-        return self.cards.count()
+        # List views annotate `annotated_card_count=Count("cards")`; without it
+        # this is one query per lesson.
+        annotated = getattr(self, "annotated_card_count", None)
+        return self.cards.count() if annotated is None else annotated
 
     def __str__(self) -> str:
         return self.title
 
 
+# On SQLite, `learning_lessoncard_fts` is kept in sync by triggers on this table
+# (migration 0005). A migration that rebuilds the table drops them; recreate them
+# in the same migration.
 class LessonCard(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="cards")
@@ -83,3 +116,43 @@ class LessonCard(models.Model):
 
     def __str__(self) -> str:
         return f"{self.lesson.title}: {self.english}"
+
+
+class ContentKind(models.TextChoices):
+    COURSE = "course", "Course"
+    LESSON = "lesson", "Lesson"
+    CARD = "card", "Card"
+
+
+class ContentVersion(models.Model):
+    """
+    A published content snapshot. Versions are numbered 1, 2, ... in commit
+    order (see `services.content_sync`); each lists the objects it changed.
+    """
+
+    version = models.PositiveIntegerField(primary_key=True)
+    source = models.CharField(max_length=50)
+    change_count = models.PositiveIntegerField(default=0)
+    published_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-version"]
+
+    def __str__(self) -> str:
+        return f"v{self.version} ({self.source})"
+
+
+class ContentChange(models.Model):
+    """A course, lesson or card added, changed or deleted in a version."""
+
+    version = models.ForeignKey(ContentVersion, on_delete=models.CASCADE, related_name="changes")
+    kind = models.CharField(max_length=8, choices=ContentKind.choices)
+    object_id = models.UUIDField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["version", "kind", "object_id"], name="uniq_content_change"),
+        ]
+
+    def __str__(self) -> str:
+        return f"v{self.version_id} {self.kind} {self.object_id}"
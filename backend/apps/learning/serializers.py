@@ -2,7 +2,11 @@ from __future__ import annotations
 
 from rest_framework import serializers
 
-from .models import Course, Lesson, LessonCard
+from apps.core.row_serializers import RowSerializer
+
+from .models import ContentKind, Course, Lesson, LessonCard
+from .services.images import cover_images, cover_images_from_variants
+from .services.search import AUTOCOMPLETE_TOP_K
 
 
 class CourseSerializer(serializers.ModelSerializer):
@@ -13,10 +17,14 @@ class CourseSerializer(serializers.ModelSerializer):
 
 class LessonSerializer(serializers.ModelSerializer):
     card_count = serializers.IntegerField(read_only=True)
+    cover_images = serializers.SerializerMethodField()
 
     class Meta:
         model = Lesson
-        fields = ("id", "course", "title", "slug", "cover_image_path", "order", "card_count")
+        fields = ("id", "course", "title", "slug", "cover_image_path", "cover_images", "order", "card_count")
+
+    def get_cover_images(self, obj: Lesson):
+        return cover_images(obj, self.context.get("request"))
 
 
 class LessonCardSerializer(serializers.ModelSerializer):
@@ -24,3 +32,61 @@ class LessonCardSerializer(serializers.ModelSerializer):
         model = LessonCard
         fields = ("id", "order", "english", "uzbek", "pronunciation", "mnemonic_example", "translation")
 
+
+class SearchLessonSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Lesson
+        fields = ("id", "slug", "title")
+
+
+class LessonCardSearchResultSerializer(LessonCardSerializer):
+    lesson = SearchLessonSerializer(read_only=True)
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(LessonCardSerializer.Meta):
+        fields = (*LessonCardSerializer.Meta.fields, "lesson", "rank")
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100, trim_whitespace=True)
+    limit = serializers.IntegerField(min_value=1, max_value=50, required=False, default=20)
+
+
+class AutocompleteQuerySerializer(SearchQuerySerializer):
+    limit = serializers.IntegerField(min_value=1, max_value=AUTOCOMPLETE_TOP_K, required=False, default=8)
+
+
+class ContentChangesQuerySerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0, required=False, default=0)
+
+
+class ContentCourseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Course
+        fields = ("id", "title", "slug", "description", "is_active")
+
+
+class ContentLessonSerializer(LessonSerializer):
+    class Meta(LessonSerializer.Meta):
+        fields = ("id", "course", "title", "slug", "cover_image_path", "cover_images", "order")
+
+
+class ContentCardSerializer(LessonCardSerializer):
+    class Meta(LessonCardSerializer.Meta):
+        fields = ("id", "lesson", *LessonCardSerializer.Meta.fields[1:])
+
+
+# `.values()`-based equivalents for `/content/changes/`, whose first sync is the whole catalog.
+CONTENT_ROWS = {
+    ContentKind.COURSE: RowSerializer(ContentCourseSerializer),
+    ContentKind.LESSON: RowSerializer(
+        ContentLessonSerializer,
+        methods={
+            "cover_images": (
+                ("cover_image_variants",),
+                lambda variants, context: cover_images_from_variants(variants, context.get("request")),
+            ),
+        },
+    ),
+    ContentKind.CARD: RowSerializer(ContentCardSerializer),
+}
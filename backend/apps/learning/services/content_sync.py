@@ -0,0 +1,162 @@
+"""
+Versioned content for clients that cache courses, lessons and cards.
+
+Every content write publishes a `ContentVersion` listing the objects it
+touched (`ContentChange`). `content_changes(since)` answers "what changed
+after the version I have" with the current rows of everything changed since,
+plus the ids of those that no longer exist, so a client's sync costs bytes
+in proportion to the edit rather than the catalog.
+
+Saves and deletes through the ORM are recorded by signal receivers
+(`signals.py`), one version each; code that writes in bulk (`seed_content`)
+opens `publishing()` and adds what it changed, and everything inside the
+block becomes a single version. Deleting a course or lesson does not list
+the lessons and cards deleted along with it: clients drop those with their
+parent.
+
+Versions must become visible in number order, or a client could skip one
+that commits late. The version is allocated inside the publishing
+transaction, after taking a transaction-scoped lock on PostgreSQL (an
+advisory lock) or, on SQLite, behind the single writer.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial
+
+from django.core.cache import cache as django_cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max
+from django.dispatch import Signal
+
+from config.sqlite import serialized_writes
+
+from ..models import ContentChange, ContentKind, ContentVersion, Course, Lesson, LessonCard
+
+
+# Arbitrary key for `pg_advisory_xact_lock`, shared by all publishers.
+PUBLISH_LOCK_KEY = 0x5E50C0
+
+# The latest committed version, for in-process copies of content (`lesson_registry`).
+VERSION_CACHE_KEY = "learning:content-version"
+
+# Sent inside the publishing transaction with `version` and its `changes`
+# (`{(kind, object_id)}`), for apps that keep state derived from content.
+content_published = Signal()
+
+CONTENT_MODELS = {ContentKind.COURSE: Course, ContentKind.LESSON: Lesson, ContentKind.CARD: LessonCard}
+
+_batch: ContextVar[_Batch | None] = ContextVar("content_batch", default=None)
+
+
+@dataclass
+class _Batch:
+    source: str
+    using: str
+    changes: set = field(default_factory=set)
+    # Set when the block ends.
+    version: ContentVersion | None = None
+
+    def add(self, kind: str, object_ids) -> None:
+        self.changes.update((kind, object_id) for object_id in object_ids)
+
+
+def head_version(using: str = DEFAULT_DB_ALIAS) -> int:
+    return ContentVersion.objects.using(using).aggregate(head=Max("version"))["head"] or 0
+
+
+def publish(changes, *, source: str, using: str = DEFAULT_DB_ALIAS) -> ContentVersion | None:
+    """Record `(kind, object_id)` changes as the next version (None when there are none)."""
+
+    changes = set(changes)
+    if not changes:
+        return None
+    with serialized_writes(using), transaction.atomic(using=using):
+        connection = connections[using]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [PUBLISH_LOCK_KEY])
+        version = ContentVersion.objects.using(using).create(
+            version=head_version(using) + 1, source=source, change_count=len(changes)
+        )
+        ContentChange.objects.using(using).bulk_create(
+            [ContentChange(version=version, kind=kind, object_id=object_id) for kind, object_id in changes],
+            batch_size=500,
+        )
+        content_published.send(sender=ContentVersion, version=version, changes=changes, using=using)
+        transaction.on_commit(partial(django_cache.set, VERSION_CACHE_KEY, version.version, None), using=using)
+    return version
+
+
+@contextmanager
+def publishing(source: str, *, using: str = DEFAULT_DB_ALIAS):
+    """
+    Collect the changes made inside the block (recorded by signals, or added
+    with `batch.add(kind, ids)`) and publish them as one version at the end.
+    Use inside the transaction that makes the changes.
+    """
+
+    batch = _Batch(source=source, using=using)
+    token = _batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _batch.reset(token)
+    batch.version = publish(batch.changes, source=source, using=using)
+
+
+def record_change(kind: str, object_id, *, source: str, using: str = DEFAULT_DB_ALIAS) -> None:
+    """One saved or deleted object: into the open `publishing()` batch, or a version of its own."""
+
+    batch = _batch.get()
+    if batch is not None and batch.using == using:
+        batch.add(kind, [object_id])
+    else:
+        publish([(kind, object_id)], source=source, using=using)
+
+
+@dataclass
+class ContentDelta:
+    version: int
+    since: int
+    # Everything, rather than changes: `since` was 0 or not a version of this database.
+    full: bool
+    objects: dict = field(default_factory=dict)
+    deleted: dict = field(default_factory=dict)
+
+
+def _querysets(using: str) -> dict:
+    return {
+        ContentKind.COURSE: Course.objects.using(using).order_by("title"),
+        ContentKind.LESSON: Lesson.objects.using(using).order_by("order", "title"),
+        ContentKind.CARD: LessonCard.objects.using(using).order_by("lesson_id", "order", "english"),
+    }
+
+
+def content_changes(since: int, *, using: str = DEFAULT_DB_ALIAS) -> ContentDelta:
+    """
+    The current rows (unevaluated querysets, per kind) of everything changed
+    after version `since`, and the ids of changed objects that are gone.
+    """
+
+    querysets = _querysets(using)
+    version = head_version(using)
+    if since <= 0 or since > version:
+        return ContentDelta(version=version, since=since, full=True, objects=querysets)
+
+    changed = defaultdict(set)
+    rows = ContentChange.objects.using(using).filter(version__gt=since, version__lte=version)
+    for kind, object_id in rows.values_list("kind", "object_id").distinct():
+        changed[kind].add(object_id)
+
+    delta = ContentDelta(version=version, since=since, full=False)
+    for kind, queryset in querysets.items():
+        ids = changed.get(kind, set())
+        existing = set(CONTENT_MODELS[kind].objects.using(using).filter(id__in=ids).values_list("id", flat=True))
+        delta.objects[kind] = queryset.filter(id__in=existing)
+        delta.deleted[kind] = sorted(str(object_id) for object_id in ids - existing)
+    return delta
@@ -0,0 +1,256 @@
+"""
+Lesson cover image pipeline.
+
+`Lesson.cover_image_path` names a source image (e.g. `/picture/animals.png`),
+resolved against `LESSON_IMAGE_SOURCE_DIRS`. From it we generate AVIF, WebP and
+JPEG variants at `LESSON_IMAGE_WIDTHS` (never upscaling) into
+`LESSON_IMAGE_ROOT`. Each file name carries a hash of its bytes, so WhiteNoise
+serves them with immutable caching (see `apps.core.middleware`). The result is
+recorded on `Lesson.cover_image_variants`:
+
+    {
+        "source": "/picture/animals.png",
+        "source_hash": "…",
+        "width": 350,
+        "height": 199,
+        "variants": {"avif": [[160, "animals-160w.1a2b3c4d5e6f.avif"], …], "webp": […], "jpeg": […]},
+    }
+
+Variants are generated by `build_lesson_images` (the command, or the
+`learning.build_lesson_images` job that `Lesson.save()` queues when the cover
+path changes), never inside a request. Pillow is imported lazily: only they
+need it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.encoding import iri_to_uri
+from django.utils.text import slugify
+
+from apps.jobs.services.queue import enqueue
+
+
+logger = logging.getLogger(__name__)
+
+# Preferred first; the frontend lists them in this order in `<picture>`.
+FORMATS = (
+    ("avif", "AVIF", {"quality": 50}),
+    ("webp", "WEBP", {"quality": 75, "method": 6}),
+    ("jpeg", "JPEG", {"quality": 80, "optimize": True, "progressive": True}),
+)
+
+MIME_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+# JPEG has no alpha channel; transparent covers are flattened onto this.
+JPEG_BACKGROUND = (255, 255, 255)
+
+HASH_LENGTH = 12
+
+
+def resolve_source(cover_image_path: str) -> Path | None:
+    relative = cover_image_path.lstrip("/")
+    if not relative:
+        return None
+    for directory in settings.LESSON_IMAGE_SOURCE_DIRS:
+        root = Path(directory).resolve()
+        candidate = (root / relative).resolve()
+        if candidate.is_relative_to(root) and candidate.is_file():
+            return candidate
+    return None
+
+
+def _file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def _target_widths(source_width: int) -> list[int]:
+    widths = [width for width in settings.LESSON_IMAGE_WIDTHS if width < source_width]
+    return [*widths, source_width]
+
+
+def _supported_formats():
+    from PIL import features
+
+    return [fmt for fmt in FORMATS if fmt[0] != "avif" or features.check("avif")]
+
+
+def _encode(image, pil_format: str, options: dict) -> bytes:
+    from PIL import Image
+
+    if pil_format == "JPEG" and image.mode != "RGB":
+        rgba = image.convert("RGBA")
+        flattened = Image.new("RGB", rgba.size, JPEG_BACKGROUND)
+        flattened.paste(rgba, mask=rgba.getchannel("A"))
+        image = flattened
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=pil_format, **options)
+    return buffer.getvalue()
+
+
+def _write_variant(stem: str, width: int, ext: str, data: bytes) -> str:
+    name = f"{stem}-{width}w.{_file_hash(data)}.{ext}"
+    path = Path(settings.LESSON_IMAGE_ROOT) / name
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f"{path.suffix}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    return name
+
+
+def generate_variants(cover_image_path: str) -> dict:
+    """
+    Build (or reuse) the variants for one source image. Returns the
+    `cover_image_variants` payload, or `{}` if the source cannot be found.
+    """
+
+    source = resolve_source(cover_image_path)
+    if source is None:
+        logger.warning("Lesson cover image not found: %s", cover_image_path)
+        return {}
+
+    from PIL import Image, ImageOps
+
+    data = source.read_bytes()
+    with Image.open(io.BytesIO(data)) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+
+    stem = slugify(source.stem) or "cover"
+    variants: dict[str, list[list]] = {}
+    for width in _target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+        for ext, pil_format, options in _supported_formats():
+            name = _write_variant(stem, width, ext, _encode(resized, pil_format, options))
+            variants.setdefault(ext, []).append([width, name])
+
+    return {
+        "source": cover_image_path,
+        "source_hash": _file_hash(data),
+        "width": image.width,
+        "height": image.height,
+        "variants": variants,
+    }
+
+
+def variants_outdated(lesson) -> bool:
+    """
+    Whether `lesson.cover_image_variants` no longer matches its source image
+    (path or content changed) or any variant file is missing.
+    """
+
+    current = lesson.cover_image_variants or {}
+    if current.get("source") != lesson.cover_image_path:
+        return True
+    if not lesson.cover_image_path:
+        return False
+
+    source = resolve_source(lesson.cover_image_path)
+    if source is None or _file_hash(source.read_bytes()) != current.get("source_hash"):
+        return True
+
+    root = Path(settings.LESSON_IMAGE_ROOT)
+    return any(
+        not (root / name).exists() for entries in current.get("variants", {}).values() for _, name in entries
+    )
+
+
+def refresh_lesson_images(lesson, *, force: bool = False) -> bool:
+    """
+    Regenerate `lesson.cover_image_variants` in memory (the caller saves).
+    Returns whether anything changed.
+    """
+
+    if not force and not variants_outdated(lesson):
+        return False
+
+    variants = generate_variants(lesson.cover_image_path) if lesson.cover_image_path else {}
+    changed = variants != lesson.cover_image_variants
+    lesson.cover_image_variants = variants
+    return changed
+
+
+def build_lesson_images(lessons, *, force: bool = False) -> list[str]:
+    """
+    Refresh the variants of each lesson in the `lessons` queryset and save the
+    ones that changed, published as one content version. Returns their slugs.
+    """
+
+    # `content_sync` imports the models, which import this module.
+    from .content_sync import publishing
+
+    updated = []
+    for lesson in lessons:
+        if refresh_lesson_images(lesson, force=force):
+            with transaction.atomic(using=lessons.db), publishing("build_lesson_images", using=lessons.db):
+                lesson.save(using=lessons.db, update_fields=["cover_image_variants"])
+            updated.append(lesson.slug)
+    return updated
+
+
+def queue_lesson_images(lesson_ids, *, using: str = DEFAULT_DB_ALIAS) -> None:
+    """Queue the `learning.build_lesson_images` job for these lessons once the transaction commits."""
+
+    payload = {"lesson_ids": [str(lesson_id) for lesson_id in lesson_ids]}
+    transaction.on_commit(lambda: enqueue("learning.build_lesson_images", payload, using=using), using=using)
+
+
+def cover_images(lesson, request=None) -> dict | None:
+    """
+    `srcset`-ready description of a lesson's cover for API responses:
+
+        {"width": 350, "height": 199, "src": "<largest jpeg>",
+         "sources": [{"type": "image/avif", "srcset": "<url> 160w, <url> 350w"}, …]}
+
+    The last source is the JPEG fallback (also `src`). Returns None when the
+    lesson has no generated variants.
+    """
+
+    return cover_images_from_variants(lesson.cover_image_variants, request)
+
+
+def cover_images_from_variants(data: dict | None, request=None) -> dict | None:
+    """`cover_images` for a raw `cover_image_variants` value (e.g. from `.values()`)."""
+
+    data = data or {}
+    variants = data.get("variants")
+    if not variants:
+        return None
+
+    base_url = settings.LESSON_IMAGE_URL
+
+    if request is not None:
+        # build_absolute_uri once for the directory rather than per file.
+        base_url = request.build_absolute_uri(base_url)
+
+    def url(name: str) -> str:
+        return f"{base_url}{iri_to_uri(name)}"
+
+    sources = [
+        {
+            "type": MIME_TYPES[ext],
+            "srcset": ", ".join(f"{url(name)} {width}w" for width, name in variants[ext]),
+        }
+        for ext, _, _ in FORMATS
+        if variants.get(ext)
+    ]
+    fallback = variants.get("jpeg") or next(iter(variants.values()))
+    return {
+        "width": data["width"],
+        "height": data["height"],
+        "src": url(fallback[-1][1]),
+        "sources": sources,
+    }
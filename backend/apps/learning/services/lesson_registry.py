@@ -0,0 +1,102 @@
+"""
+An in-process copy of the lesson fields that other apps' read paths show
+next to their own rows (`id`, `slug`, `title` and the cover), so those
+queries can select only their own table and skip the join to
+`learning_lesson`:
+
+    records = lesson_registry.get_many(row["lesson_id"] for row in rows)
+
+Lessons are a small table whose every change publishes a content version
+(`services.content_sync`), which also stores the version number in the cache
+once committed. A worker reloads its records when that number is newer than
+the one it loaded at, when asked for a lesson it does not have (created
+since), and at least every `LESSON_REGISTRY_MAX_AGE_SECONDS`.
+
+The version number only reaches other workers through a shared cache
+(`CACHE_URL`, e.g. Redis). With the default per-process cache, only the
+worker that published sees it at once; the others catch up at the age limit.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache as django_cache
+
+from ..models import Lesson
+from .content_sync import VERSION_CACHE_KEY, head_version
+
+
+logger = logging.getLogger(__name__)
+
+
+class LessonRecord(NamedTuple):
+    id: object
+    slug: str
+    title: str
+    cover_image_path: str
+    cover_image_variants: dict
+
+
+class LessonRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: dict | None = None
+        self._version = None
+        self._loaded_at = 0.0
+
+    def _fresh(self, version) -> bool:
+        return (
+            self._records is not None
+            # Publishes can reach the cache out of order; a newer load is fresh.
+            and (version is None or self._version >= version)
+            and time.monotonic() - self._loaded_at < settings.LESSON_REGISTRY_MAX_AGE_SECONDS
+        )
+
+    def _load(self) -> None:
+        started = time.perf_counter()
+        # The version first: a publish committing in between is reloaded on the next call.
+        version = head_version()
+        rows = Lesson.objects.order_by().values_list(*LessonRecord._fields)
+        self._records = {row[0]: LessonRecord(*row) for row in rows}
+        self._version = version
+        self._loaded_at = time.monotonic()
+        logger.info(
+            "Loaded %d lesson records (content version %d) in %.1f ms",
+            len(self._records),
+            version,
+            (time.perf_counter() - started) * 1000,
+        )
+
+    def records(self) -> dict:
+        version = django_cache.get(VERSION_CACHE_KEY)
+        if self._fresh(version):
+            return self._records
+        with self._lock:
+            if not self._fresh(version):
+                self._load()
+            return self._records
+
+    def get_many(self, ids) -> dict:
+        """`{id: LessonRecord}` for the given lesson ids (lessons that no longer exist are left out)."""
+
+        ids = set(ids)
+        records = self.records()
+        if not ids <= records.keys():
+            # Lessons created since the load.
+            with self._lock:
+                if self._records is records:
+                    self._load()
+                records = self._records
+        return {lesson_id: records[lesson_id] for lesson_id in ids if lesson_id in records}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records = None
+
+
+lesson_registry = LessonRegistry()
@@ -0,0 +1,404 @@
+"""
+Vocabulary search over `LessonCard` (english, uzbek, pronunciation,
+translation).
+
+Full-text search picks the best index the database offers:
+
+- SQLite: the FTS5 table `learning_lessoncard_fts` (migration 0005, synced by
+  triggers and keyed by card id through `learning_lessoncard_fts_doc`),
+  prefix-matched and ranked by weighted bm25;
+- PostgreSQL: `icontains` filtering served by pg_trgm GIN indexes, ranked by
+  weighted trigram word similarity;
+- otherwise (or if FTS5 / pg_trgm are unavailable): `VocabularyTrie`.
+
+Autocomplete always uses the in-process `VocabularyTrie`: each node keeps its
+best few cards, so a lookup is a walk down the prefix without touching the
+database. The trie is rebuilt when `bump_search_version()` is called (on card
+and lesson saves, and by `seed_content`) and at least every
+`SEARCH_TRIE_MAX_AGE_SECONDS`, which bounds staleness when workers do not share
+a cache.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import re
+import threading
+import time
+import unicodedata
+from functools import cache
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import Q
+
+from ..models import LessonCard
+
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ("english", "uzbek", "pronunciation", "translation")
+
+# Relative importance of a match in each field (same order as SEARCH_FIELDS).
+FIELD_WEIGHTS = (10.0, 8.0, 3.0, 1.0)
+
+FTS_TABLE = "learning_lessoncard_fts"
+FTS_DOC_TABLE = "learning_lessoncard_fts_doc"
+FTS_TRIGGERS = (f"{FTS_TABLE}_ai", f"{FTS_TABLE}_ad", f"{FTS_TABLE}_au")
+
+VERSION_CACHE_KEY = "learning:search-version"
+
+# Cards kept per trie node; autocomplete never returns more than this.
+AUTOCOMPLETE_TOP_K = 10
+
+MAX_QUERY_TOKENS = 8
+
+TOKEN = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """
+    Casefold and strip diacritics (matching FTS5's `remove_diacritics`).
+    """
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    # `\w` excludes apostrophes, so o‘zbek / o'zbek / oʻzbek tokenize alike.
+    return TOKEN.findall(normalize(text))
+
+
+class SearchHit(NamedTuple):
+    card_id: object
+    rank: float
+
+
+class TrieCard(NamedTuple):
+    id: object
+    english: str
+    uzbek: str
+    lesson_id: object
+    lesson_slug: str
+    lesson_title: str
+
+    def as_suggestion(self) -> dict:
+        return {
+            "id": str(self.id),
+            "english": self.english,
+            "uzbek": self.uzbek,
+            "lesson": {"id": str(self.lesson_id), "slug": self.lesson_slug, "title": self.lesson_title},
+        }
+
+
+class _Node:
+    __slots__ = ("children", "postings", "top")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        # (card index, field index, word position) for tokens ending here.
+        self.postings: list[tuple[int, int, int]] = []
+        # Best card indexes in this subtree, best first.
+        self.top: tuple[int, ...] = ()
+
+
+class VocabularyTrie:
+    """
+    Prefix trie over the tokens of every card's searchable fields.
+    """
+
+    def __init__(self, rows, *, top_k: int = AUTOCOMPLETE_TOP_K):
+        self.cards: list[TrieCard] = []
+        self.root = _Node()
+        self.top_k = top_k
+        for row in rows:
+            index = len(self.cards)
+            self.cards.append(
+                TrieCard(
+                    row["id"],
+                    row["english"],
+                    row["uzbek"],
+                    row["lesson_id"],
+                    row["lesson__slug"],
+                    row["lesson__title"],
+                )
+            )
+            for field_index, field in enumerate(SEARCH_FIELDS):
+                for position, token in enumerate(tokenize(row[field] or "")):
+                    self._insert(token, (index, field_index, position))
+        self._rank_subtree(self.root, depth=0)
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def _insert(self, token: str, posting: tuple[int, int, int]) -> None:
+        node = self.root
+        for ch in token:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _Node()
+            node = child
+        node.postings.append(posting)
+
+    def _rank_subtree(self, node: _Node, depth: int) -> list[tuple]:
+        """
+        Fill `node.top` bottom-up. Candidates are ranked by field, first word
+        before later words, then shorter (closer) words, then card order.
+        """
+
+        best: dict[int, tuple] = {}
+        for card, field, position in node.postings:
+            key = (field, position > 0, depth, card)
+            if card not in best or key < best[card]:
+                best[card] = key
+        for child in node.children.values():
+            for key in self._rank_subtree(child, depth + 1):
+                card = key[-1]
+                if card not in best or key < best[card]:
+                    best[card] = key
+
+        ranked = heapq.nsmallest(self.top_k, best.values())
+        node.top = tuple(key[-1] for key in ranked)
+        return ranked
+
+    def _find(self, prefix: str) -> _Node | None:
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def _prefix_scores(self, prefix: str) -> dict[int, float]:
+        node = self._find(prefix)
+        if node is None:
+            return {}
+        scores: dict[int, float] = {}
+        stack = [(node, len(prefix))]
+        while stack:
+            current, length = stack.pop()
+            for card, field, position in current.postings:
+                score = FIELD_WEIGHTS[field] * (1.0 if length == len(prefix) else 0.5) * (1.0 if position == 0 else 0.8)
+                if score > scores.get(card, 0.0):
+                    scores[card] = score
+            stack.extend((child, length + 1) for child in current.children.values())
+        return scores
+
+    def _ranked(self, query: str, limit: int) -> list[tuple[int, float]]:
+        tokens = tokenize(query)[:MAX_QUERY_TOKENS]
+        if not tokens:
+            return []
+
+        totals: dict[int, float] | None = None
+        for token in tokens:
+            scores = self._prefix_scores(token)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {card: totals[card] + score for card, score in scores.items() if card in totals}
+            if not totals:
+                return []
+
+        return heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], item[0]))
+
+    def search(self, query: str, limit: int) -> list[SearchHit]:
+        """
+        Cards matching every query token as a word prefix, best first.
+        """
+
+        return [SearchHit(self.cards[card].id, round(score, 4)) for card, score in self._ranked(query, limit)]
+
+    def autocomplete(self, query: str, limit: int) -> list[TrieCard]:
+        tokens = tokenize(query)
+        if len(tokens) == 1:
+            node = self._find(tokens[0])
+            return [self.cards[card] for card in node.top[:limit]] if node else []
+        return [self.cards[card] for card, _ in self._ranked(query, limit)]
+
+
+def _trie_rows():
+    return (
+        LessonCard.objects.order_by("lesson__order", "lesson__title", "order", "english")
+        .values("id", "english", "uzbek", "pronunciation", "translation", "lesson_id", "lesson__slug", "lesson__title")
+        .iterator(chunk_size=2000)
+    )
+
+
+class _SharedTrie:
+    """
+    The process-wide trie, rebuilt lazily when the search version changes or
+    it gets older than `SEARCH_TRIE_MAX_AGE_SECONDS`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._trie: VocabularyTrie | None = None
+        self._version = None
+        self._built_at = 0.0
+
+    def _fresh(self, version) -> bool:
+        return (
+            self._trie is not None
+            and self._version == version
+            and time.monotonic() - self._built_at < settings.SEARCH_TRIE_MAX_AGE_SECONDS
+        )
+
+    def get(self) -> VocabularyTrie:
+        version = django_cache.get(VERSION_CACHE_KEY)
+        if self._fresh(version):
+            return self._trie
+        with self._lock:
+            if not self._fresh(version):
+                started = time.perf_counter()
+                self._trie = VocabularyTrie(_trie_rows())
+                self._version = version
+                self._built_at = time.monotonic()
+                logger.info(
+                    "Built vocabulary trie: %d cards in %.1f ms",
+                    len(self._trie),
+                    (time.perf_counter() - started) * 1000,
+                )
+            return self._trie
+
+    def clear(self) -> None:
+        with self._lock:
+            self._trie = None
+
+
+shared_trie = _SharedTrie()
+
+
+def bump_search_version() -> None:
+    """
+    Invalidate every worker's trie (those sharing the cache; others within
+    `SEARCH_TRIE_MAX_AGE_SECONDS`).
+    """
+
+    django_cache.set(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+    shared_trie.clear()
+
+
+def refresh_search_index(using: str) -> None:
+    """
+    After bulk card changes (`seed_content`): merge the FTS5 index segments
+    left by the trigger churn and invalidate the tries once committed.
+    """
+
+    connection = connections[using]
+    if connection.vendor == "sqlite" and _fts5_ready(using):
+        with connection.cursor() as cursor:
+            cursor.execute(f'INSERT INTO "{FTS_TABLE}" ("{FTS_TABLE}") VALUES (%s)', ["optimize"])
+    transaction.on_commit(bump_search_version, using=using)
+
+
+def _read_alias() -> str:
+    return router.db_for_read(LessonCard)
+
+
+@cache
+def _fts5_ready(alias: str) -> bool:
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s, %s)",
+            [FTS_TABLE, FTS_DOC_TABLE, *FTS_TRIGGERS],
+        )
+        found = {row[0] for row in cursor.fetchall()}
+    if FTS_TABLE in found and not found.issuperset(FTS_TRIGGERS):
+        # A migration that rebuilt learning_lessoncard dropped the sync triggers.
+        logger.warning("%s exists but its triggers are missing; using the trie for search.", FTS_TABLE)
+    return found == {FTS_TABLE, FTS_DOC_TABLE, *FTS_TRIGGERS}
+
+
+@cache
+def _trigram_ready(alias: str) -> bool:
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def search_backend(alias: str | None = None) -> str:
+    alias = alias or _read_alias()
+    vendor = connections[alias].vendor
+    if vendor == "sqlite" and _fts5_ready(alias):
+        return "fts5"
+    if vendor == "postgresql" and _trigram_ready(alias):
+        return "trigram"
+    return "trie"
+
+
+def _fts5_search(alias: str, tokens: list[str], limit: int) -> list[SearchHit]:
+    # Every token as a quoted prefix term; FTS5 ANDs them.
+    match = " ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+    weights = ", ".join(str(weight) for weight in FIELD_WEIGHTS)
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            f'SELECT card.id, bm25("{FTS_TABLE}", {weights}) AS score '
+            f'FROM "{FTS_TABLE}" JOIN "{FTS_DOC_TABLE}" AS doc ON doc.docid = "{FTS_TABLE}".rowid '
+            f'JOIN "{LessonCard._meta.db_table}" AS card ON card.id = doc.card_id '
+            f'WHERE "{FTS_TABLE}" MATCH %s ORDER BY score LIMIT %s',
+            [match, limit],
+        )
+        rows = cursor.fetchall()
+    to_python = LessonCard._meta.pk.to_python
+    return [SearchHit(to_python(card_id), round(-score, 4)) for card_id, score in rows]
+
+
+def _trigram_search(alias: str, query: str, tokens: list[str], limit: int) -> list[SearchHit]:
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    cards = LessonCard.objects.using(alias)
+    for token in tokens:
+        cards = cards.filter(
+            Q(english__icontains=token)
+            | Q(uzbek__icontains=token)
+            | Q(pronunciation__icontains=token)
+            | Q(translation__icontains=token)
+        )
+    rank = sum(
+        (weight * TrigramWordSimilarity(query, field) for field, weight in zip(SEARCH_FIELDS, FIELD_WEIGHTS)),
+        start=0.0,
+    )
+    rows = cards.annotate(rank=rank).order_by("-rank", "order").values_list("id", "rank")[:limit]
+    return [SearchHit(card_id, round(score, 4)) for card_id, score in rows]
+
+
+def search_cards(query: str, *, limit: int = 20) -> tuple[str, list[LessonCard]]:
+    """
+    Ranked cards matching `query` (each card has a `rank` attribute, higher is
+    better). Returns `(backend, cards)`.
+    """
+
+    tokens = tokenize(query)[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return "none", []
+
+    alias = _read_alias()
+    backend = search_backend(alias)
+    try:
+        if backend == "fts5":
+            hits = _fts5_search(alias, tokens, limit)
+        elif backend == "trigram":
+            hits = _trigram_search(alias, query, tokens, limit)
+        else:
+            hits = shared_trie.get().search(query, limit)
+    except DatabaseError:
+        logger.exception("%s search failed; falling back to the trie", backend)
+        backend = "trie"
+        hits = shared_trie.get().search(query, limit)
+
+    by_id = LessonCard.objects.using(alias).select_related("lesson").in_bulk([hit.card_id for hit in hits])
+    cards = []
+    for hit in hits:
+        card = by_id.get(hit.card_id)
+        if card is not None:
+            card.rank = hit.rank
+            cards.append(card)
+    return backend, cards
+
+
+def autocomplete(query: str, *, limit: int = 8) -> list[dict]:
+    return [card.as_suggestion() for card in shared_trie.get().autocomplete(query, limit)]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ContentKind, Course, Lesson, LessonCard
+from .services.content_sync import record_change
+from .services.search import bump_search_version
+
+
+CONTENT_KINDS = {Course: ContentKind.COURSE, Lesson: ContentKind.LESSON, LessonCard: ContentKind.CARD}
+
+
+@receiver(post_save, sender=LessonCard)
+@receiver(post_delete, sender=LessonCard)
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def invalidate_search(sender, **kwargs):
+    # Bulk operations send no signals; `seed_content` bumps the version itself.
+    transaction.on_commit(bump_search_version, using=kwargs.get("using"))
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Lesson)
+@receiver(post_save, sender=LessonCard)
+def record_content_save(sender, instance, using, **kwargs):
+    record_change(CONTENT_KINDS[sender], instance.pk, source="save", using=using)
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_delete, sender=LessonCard)
+def record_content_delete(sender, instance, using, origin=None, **kwargs):
+    # Deleted along with its course or lesson: clients drop it with the parent.
+    if isinstance(origin, models.Model) and origin is not instance:
+        return
+    record_change(CONTENT_KINDS[sender], instance.pk, source="delete", using=using)
@@ -0,0 +1,16 @@
+"""Lesson cover variants, generated by the job worker (queued by `Lesson.save()`)."""
+
+from __future__ import annotations
+
+from apps.jobs.registry import task
+
+from .models import Lesson
+from .services.images import build_lesson_images as build
+
+
+@task("learning.build_lesson_images", lease_seconds=1800)
+def build_lesson_images(lesson_ids: list[str] | None = None, force: bool = False):
+    lessons = Lesson.objects.order_by("order", "title")
+    if lesson_ids is not None:
+        lessons = lessons.filter(id__in=lesson_ids)
+    return {"updated": build(lessons, force=force)}
@@ -1,3 +1,253 @@
-from django.test import TestCase
+import copy
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase
+from rest_framework.test import APITestCase
+
+from apps.core.testing import QueryBudgetMixin
+from apps.jobs.models import Job
+from apps.jobs.services.worker import Worker
+
+from .models import ContentKind, ContentVersion, Course, Lesson, LessonCard
+from .services.search import bump_search_version, search_backend, search_cards
+from .views import LessonListView
+
+
+class LearningQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email="learner@example.com", password="x" * 12)
+        cls.course = Course.objects.create(title="English", slug="english")
+        cls.lesson = Lesson.objects.create(course=cls.course, title="Lesson 0", slug="lesson-0")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def add_lessons(self, count: int) -> None:
+        start = Lesson.objects.count()
+        for i in range(start, count):
+            lesson = Lesson.objects.create(course=self.course, title=f"Lesson {i}", slug=f"lesson-{i}", order=i)
+            LessonCard.objects.bulk_create(
+                LessonCard(lesson=lesson, order=j, english=f"word {i} {j}", uzbek=f"so‘z {j}") for j in range(3)
+            )
+
+    def add_cards(self, count: int) -> None:
+        LessonCard.objects.bulk_create(
+            LessonCard(lesson=self.lesson, order=j, english=f"apple {j}", uzbek=f"olma {j}")
+            for j in range(self.lesson.cards.count(), count)
+        )
+
+    def test_course_list(self):
+        self.assertQueryBudget(1, lambda: self.client.get("/api/courses/"))
+
+    def test_lesson_list(self):
+        # `card_count` comes from an annotation, not a query per lesson.
+        self.assertQueryBudget(1, lambda: self.client.get("/api/lessons/"), grow=self.add_lessons)
+
+    def test_lesson_cards(self):
+        self.assertQueryBudget(2, lambda: self.client.get("/api/lessons/lesson-0/cards/"), grow=self.add_cards)
+
+    def test_content_changes(self):
+        # The head version, then one query per kind.
+        self.assertQueryBudget(4, lambda: self.client.get("/api/content/changes/"), grow=self.add_lessons)
+
+    def add_searchable_cards(self, count: int) -> None:
+        self.add_cards(count)
+        # Test transactions never commit, so the on-commit invalidation does not run.
+        bump_search_version()
+
+    def test_search(self):
+        self.assertQueryBudget(
+            2, lambda: self.client.get("/api/search/?q=apple"), grow=self.add_searchable_cards, warm_up=True
+        )
+
+    def test_autocomplete(self):
+        # Served from the in-process trie once it is built.
+        self.assertQueryBudget(
+            0, lambda: self.client.get("/api/search/autocomplete/?q=app"), grow=self.add_searchable_cards, warm_up=True
+        )
+
+
+class VocabularySearchTests(TransactionTestCase):
+    # Not wrapped in a transaction, so VACUUM can run.
+
+    def setUp(self):
+        course = Course.objects.create(title="English", slug="english")
+        lesson = Lesson.objects.create(course=course, title="Fruit", slug="fruit")
+        self.cards = {
+            english: LessonCard.objects.create(lesson=lesson, order=i, english=english, uzbek=uzbek)
+            for i, (english, uzbek) in enumerate(
+                [("apple", "olma"), ("pineapple", "ananas"), ("apple pie", "olma pirogi"), ("pear", "nok")]
+            )
+        }
+        bump_search_version()
+
+    def found(self, query: str) -> list[str]:
+        return [card.english for card in search_cards(query)[1]]
+
+    def test_results_follow_card_changes(self):
+        self.assertEqual(self.found("apple"), ["apple", "apple pie"])
+        self.assertEqual(self.found("olma pir"), ["apple pie"])
+
+        pear = self.cards["pear"]
+        pear.english = "apple pear"
+        pear.save(update_fields=["english"])
+        self.cards["apple"].delete()
+        self.assertEqual(self.found("apple"), ["apple pear", "apple pie"])
+        self.assertEqual(self.found("nok"), ["apple pear"])
+
+    def test_results_survive_vacuum(self):
+        if search_backend() != "fts5":
+            self.skipTest("SQLite FTS5 is not available")
+        # Gaps in the card table let VACUUM renumber its implicit rowids.
+        self.cards["apple"].delete()
+        self.cards["pineapple"].delete()
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM")
+
+        self.assertEqual(self.found("apple"), ["apple pie"])
+        self.assertEqual(self.found("nok"), ["pear"])
+
+
+class ContentChangesTests(APITestCase):
+    seed = {
+        "course": {"slug": "english", "title": "English"},
+        "lessons": [
+            {
+                "slug": "fruit",
+                "title": "Fruit",
+                "order": 1,
+                "cards": [{"english": "apple", "uzbek": "olma"}, {"english": "pear", "uzbek": "nok"}],
+            }
+        ],
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email="learner@example.com", password="x" * 12)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def run_seed(self, seed=None) -> None:
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as handle:
+            json.dump(seed or self.seed, handle)
+        self.addCleanup(os.unlink, handle.name)
+        call_command("seed_content", path=handle.name, stdout=io.StringIO())
+
+    def changes(self, since: int) -> dict:
+        response = self.client.get(f"/api/content/changes/?since={since}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_seed_publishes_one_version_and_keeps_card_ids(self):
+        self.run_seed()
+        ids = set(LessonCard.objects.values_list("id", flat=True))
+        self.assertEqual(ContentVersion.objects.get().change_count, 4)
+
+        self.run_seed()
+        self.assertEqual(ContentVersion.objects.count(), 1)
+        self.assertEqual(set(LessonCard.objects.values_list("id", flat=True)), ids)
+
+        full = self.changes(0)
+        self.assertEqual((full["version"], full["full"]), (1, True))
+        self.assertEqual([card["english"] for card in full["cards"]], ["apple", "pear"])
+
+    def test_delta_lists_changed_and_deleted_objects(self):
+        self.run_seed()
+        pear = LessonCard.objects.get(english="pear")
+        seed = copy.deepcopy(self.seed)
+        seed["lessons"][0]["cards"] = [{"english": "apple", "uzbek": "olma!"}, {"english": "plum", "uzbek": "olxo‘ri"}]
+        self.run_seed(seed)
+
+        delta = self.changes(1)
+        self.assertEqual((delta["version"], delta["full"]), (2, False))
+        self.assertEqual(sorted(card["english"] for card in delta["cards"]), ["apple", "plum"])
+        self.assertEqual((delta["courses"], delta["lessons"]), ([], []))
+        self.assertEqual(delta["deleted"]["cards"], [str(pear.id)])
+        self.assertEqual(self.changes(2)["cards"], [])
+        # A version this server never published gets everything.
+        self.assertTrue(self.changes(99)["full"])
+
+    def test_deleting_a_lesson_records_only_the_lesson(self):
+        self.run_seed()
+        lesson = Lesson.objects.get()
+        lesson_id = lesson.id
+        lesson.delete()
+
+        version = ContentVersion.objects.first()
+        self.assertEqual(list(version.changes.values_list("kind", "object_id")), [(ContentKind.LESSON, lesson_id)])
+        self.assertEqual(self.changes(1)["deleted"]["lessons"], [str(lesson_id)])
+
+
+VARIANTS = {"source": "/picture/new.png", "width": 160, "height": 90, "variants": {"jpeg": [[160, "new.jpg"]]}}
+
+
+class LessonCoverImageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        course = Course.objects.create(title="English", slug="english")
+        cls.lesson = Lesson.objects.create(
+            course=course, title="Animals", slug="animals", cover_image_path="/picture/old.png"
+        )
+        Lesson.objects.filter(pk=cls.lesson.pk).update(cover_image_variants={"source": "/picture/old.png"})
+
+    def test_saves_without_a_new_cover_leave_the_variants_alone(self):
+        lesson = Lesson.objects.get(pk=self.lesson.pk)
+        lesson.title = "Animals and pets"
+        with mock.patch("apps.learning.services.images.generate_variants") as generate:
+            with self.captureOnCommitCallbacks(execute=True):
+                lesson.save()
+
+        generate.assert_not_called()
+        self.assertFalse(Job.objects.exists())
+        lesson.refresh_from_db()
+        self.assertEqual(lesson.cover_image_variants, {"source": "/picture/old.png"})
+
+    def test_a_new_cover_is_generated_by_the_job(self):
+        lesson = Lesson.objects.get(pk=self.lesson.pk)
+        lesson.cover_image_path = "/picture/new.png"
+        with mock.patch("apps.learning.services.images.generate_variants", return_value=VARIANTS) as generate:
+            with self.captureOnCommitCallbacks(execute=True):
+                lesson.save(update_fields=["cover_image_path"])
+
+            generate.assert_not_called()
+            lesson.refresh_from_db()
+            self.assertEqual(lesson.cover_image_variants, {})
+            job = Job.objects.get()
+            self.assertEqual(job.name, "learning.build_lesson_images")
+
+            head = ContentVersion.objects.order_by("-version").first().version
+            Worker(poll_seconds=0).run(once=True)
+
+        generate.assert_called_once_with("/picture/new.png")
+        lesson.refresh_from_db()
+        self.assertEqual(lesson.cover_image_variants, VARIANTS)
+        self.assertEqual(ContentVersion.objects.get(version=head + 1).source, "build_lesson_images")
+
+
+class LessonListStreamingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        course = Course.objects.create(title="English", slug="english")
+        Lesson.objects.bulk_create(
+            Lesson(course=course, title=f"Lesson {i}", slug=f"lesson-{i}", order=i) for i in range(3)
+        )
+
+    def test_streamed_under_wsgi_only(self):
+        view = LessonListView.as_view()
+        streamed = view(RequestFactory().get("/api/lessons/"))
+        # ASGI would buffer a sync stream in a thread (and warn); it gets the plain response.
+        buffered = view(AsyncRequestFactory().get("/api/lessons/"))
+
+        self.assertTrue(streamed.streaming)
+        self.assertFalse(buffered.streaming)
+        buffered.render()
+        self.assertEqual(b"".join(streamed.streaming_content), buffered.content)
@@ -1,11 +1,21 @@
 from django.urls import path
 
-from .views import CourseListView, LessonCardsView, LessonListView
+from .views import (
+    ContentChangesView,
+    CourseListView,
+    LessonCardsView,
+    LessonListView,
+    VocabularyAutocompleteView,
+    VocabularySearchView,
+)
 
 
 urlpatterns = [
     path("courses/", CourseListView.as_view(), name="course-list"),
     path("lessons/", LessonListView.as_view(), name="lesson-list"),
     path("lessons/<slug:lesson_slug>/cards/", LessonCardsView.as_view(), name="lesson-cards"),
+    path("search/", VocabularySearchView.as_view(), name="vocabulary-search"),
+    path("search/autocomplete/", VocabularyAutocompleteView.as_view(), name="vocabulary-autocomplete"),
+    path("content/changes/", ContentChangesView.as_view(), name="content-changes"),
 ]
 
@@ -1,10 +1,26 @@
 from __future__ import annotations
 
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from .models import Course, Lesson
-from .serializers import CourseSerializer, LessonCardSerializer, LessonSerializer
+from apps.core.mixins import StreamingListMixin
+
+from .models import ContentKind, Course, Lesson
+from .serializers import (
+    CONTENT_ROWS,
+    AutocompleteQuerySerializer,
+    ContentChangesQuerySerializer,
+    CourseSerializer,
+    LessonCardSearchResultSerializer,
+    LessonCardSerializer,
+    LessonSerializer,
+    SearchQuerySerializer,
+)
+from .services.content_sync import content_changes
+from .services.search import autocomplete, search_cards
 
 
 class CourseListView(generics.ListAPIView):
@@ -13,16 +29,71 @@ class CourseListView(generics.ListAPIView):
     serializer_class = CourseSerializer
 
 
-class LessonListView(generics.ListAPIView):
+class LessonListView(StreamingListMixin, generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
-    queryset = Lesson.objects.select_related("course").all().order_by("order", "title")
+    queryset = (
+        Lesson.objects.select_related("course").annotate(annotated_card_count=Count("cards")).order_by("order", "title")
+    )
     serializer_class = LessonSerializer
 
 
-class LessonCardsView(generics.ListAPIView):
+class LessonCardsView(StreamingListMixin, generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = LessonCardSerializer
 
     def get_queryset(self):
         lesson = get_object_or_404(Lesson, slug=self.kwargs["lesson_slug"])
         return lesson.cards.all().order_by("order", "english")
+
+
+class VocabularySearchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        serializer = SearchQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data["q"]
+
+        backend, cards = search_cards(query, limit=serializer.validated_data["limit"])
+        return Response(
+            {
+                "query": query,
+                "backend": backend,
+                "results": LessonCardSearchResultSerializer(cards, many=True).data,
+            }
+        )
+
+
+class VocabularyAutocompleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        serializer = AutocompleteQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        suggestions = autocomplete(serializer.validated_data["q"], limit=serializer.validated_data["limit"])
+        return Response({"suggestions": suggestions})
+
+
+class ContentChangesView(APIView):
+    """
+    Courses, lessons and cards added or changed after content version
+    `since`, and the ids of those deleted (`full`: everything, for `since=0`
+    or a version this server never published). Clients keep `version` for
+    their next call.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    keys = {ContentKind.COURSE: "courses", ContentKind.LESSON: "lessons", ContentKind.CARD: "cards"}
+
+    def get(self, request):
+        serializer = ContentChangesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        delta = content_changes(serializer.validated_data["since"])
+
+        context = {"request": request}
+        data = {"version": delta.version, "since": delta.since, "full": delta.full}
+        for kind, key in self.keys.items():
+            rows = CONTENT_ROWS[kind]
+            data[key] = rows.many(rows.values(delta.objects[kind]), context)
+        data["deleted"] = {key: delta.deleted.get(kind, []) for kind, key in self.keys.items()}
+        return Response(data)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from django.contrib import admin
 
-from .models import RevisionSchedule, StudySession
+from .models import RevisionSchedule, StudyDayAggregate, StudySession, StudySessionArchive, StudyStreak
 
 
 @admin.register(StudySession)
@@ -19,3 +19,24 @@ class RevisionScheduleAdmin(admin.ModelAdmin):
     list_filter = ("status", "stage")
     search_fields = ("user__email", "lesson__title", "lesson__slug")
     ordering = ("next_review_at",)
+
+
+@admin.register(StudySessionArchive)
+class StudySessionArchiveAdmin(admin.ModelAdmin):
+    list_display = ("user", "context", "duration_seconds", "started_at", "ended_at", "archived_at")
+    search_fields = ("user__email", "context")
+    ordering = ("-started_at",)
+
+
+@admin.register(StudyDayAggregate)
+class StudyDayAggregateAdmin(admin.ModelAdmin):
+    list_display = ("user", "day", "duration_seconds", "session_count")
+    search_fields = ("user__email",)
+    ordering = ("-day",)
+
+
+@admin.register(StudyStreak)
+class StudyStreakAdmin(admin.ModelAdmin):
+    list_display = ("user", "current_days", "longest_days", "last_active_day")
+    search_fields = ("user__email",)
+    ordering = ("-current_days",)
@@ -5,3 +5,6 @@ class TrackingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.tracking"
     verbose_name = "Tracking"
+
+    def ready(self):
+        from . import signals  # noqa: F401
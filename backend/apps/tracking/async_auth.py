@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+_jwt = JWTAuthentication()
+
+
+def get_user_id_from_token(raw_token: bytes | str | None):
+    """
+    Validate a raw access token and return the user id claim (or None).
+
+    Unlike `JWTAuthentication.authenticate`, this does not load the user row:
+    the hot tracking paths only need the id to scope their queries, so skipping
+    the lookup saves a query per request.
+    """
+
+    if not raw_token:
+        return None
+    try:
+        validated_token = _jwt.get_validated_token(raw_token)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return validated_token.get(api_settings.USER_ID_CLAIM)
+
+
+def get_user_id_from_request(request):
+    header = _jwt.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = _jwt.get_raw_token(header)
+    except AuthenticationFailed:
+        return None
+    return get_user_id_from_token(raw_token)
@@ -0,0 +1,189 @@
+"""
+Native async versions of the study-session hot path (start/ping/stop).
+
+These are plain Django async views rather than DRF `APIView`s: the token is
+decoded and the response returned on the event loop, without DRF's request
+wrapping. The rest of the request (the active-user check, the throttles and
+the write) runs in a single `sync_to_async` call. That call holds a thread
+for the whole write, as a sync view would, but it is the only thread hop:
+Django's async ORM methods each make one per query. The request/response
+shapes match `StudySessionStartView`, `StudySessionPingView` and
+`StudySessionStopView`; `config.settings.TRACKING_ASYNC_VIEWS` selects which
+implementation `apps.tracking.urls` mounts.
+
+Like the DRF views, every request is authenticated (a valid access token for
+a user that is still active) and then throttled by
+`DEFAULT_THROTTLE_CLASSES`, with the same cache keys, so the two
+implementations share each user's rate.
+"""
+
+from __future__ import annotations
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+
+from config.sqlite import serialized_writes
+
+from .async_auth import get_user_id_from_request
+from .models import StudySession
+from .serializers import (
+    STUDY_SESSION_ROWS,
+    StudySessionPingSerializer,
+    StudySessionStartSerializer,
+    StudySessionStopSerializer,
+)
+from .services.ping_pacing import load_monitor, next_ping_after
+from .services.study_time import record_ping
+
+
+User = get_user_model()
+
+
+def _unauthorized() -> JsonResponse:
+    return JsonResponse(
+        {"detail": "Authentication credentials were not provided or are invalid."},
+        status=401,
+        headers={"WWW-Authenticate": 'Bearer realm="api"'},
+    )
+
+
+def _throttled(wait: float | None) -> JsonResponse:
+    exc = Throttled(wait)
+    headers = {} if exc.wait is None else {"Retry-After": str(exc.wait)}
+    return JsonResponse({"detail": str(exc.detail)}, status=429, headers=headers)
+
+
+def _not_found() -> JsonResponse:
+    return JsonResponse({"detail": "No StudySession matches the given query."}, status=404)
+
+
+class _ThrottleUser:
+    """What the throttles read of `request.user`."""
+
+    is_authenticated = True
+
+    def __init__(self, pk):
+        self.pk = self.id = pk
+
+
+def _authorize(request, user_id) -> JsonResponse | None:
+    """
+    An error response unless the token's user is still active and within
+    the throttle rates: DRF's authentication and throttling checks after
+    the token.
+    """
+
+    if not User.objects.filter(pk=user_id, is_active=True).exists():
+        return _unauthorized()
+    request.user = _ThrottleUser(user_id)
+    waits = []
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            waits.append(throttle.wait())
+    if waits:
+        return _throttled(max((wait for wait in waits if wait is not None), default=None))
+    return None
+
+
+def _parse(request, serializer_class):
+    """
+    Returns `(validated_data, None)` or `(None, error_response)`.
+    """
+
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError as exc:
+        return None, JsonResponse({"detail": f"JSON parse error - {exc}"}, status=400)
+
+    serializer = serializer_class(data=data)
+    if not serializer.is_valid():
+        return None, JsonResponse(serializer.errors, status=400)
+    return serializer.validated_data, None
+
+
+@sync_to_async
+def _handle(request, user_id, serializer_class, handler) -> HttpResponse:
+    """
+    Everything after the token in one thread hop: `_authorize`, the body,
+    then `handler(user_id, data)`, which does the write and returns the
+    response.
+    """
+
+    error = _authorize(request, user_id)
+    if error is None:
+        data, error = _parse(request, serializer_class)
+    if error is not None:
+        return error
+    return handler(user_id, data)
+
+
+# Writes happen behind the SQLite write lock (see `config.sqlite`).
+def _start(user_id, data) -> JsonResponse:
+    with serialized_writes():
+        session = StudySession.objects.create(
+            user_id=user_id, context=data.get("context", ""), last_ping_at=timezone.now()
+        )
+    return JsonResponse(STUDY_SESSION_ROWS.instance(session), status=201)
+
+
+def _ping(user_id, data) -> JsonResponse:
+    with load_monitor.track():
+        result = record_ping(
+            user_id=user_id,
+            session_id=data["session_id"],
+            active_seconds=int(data["active_seconds"]),
+            seq=data.get("seq"),
+        )
+    if result is None:
+        return _not_found()
+
+    return JsonResponse(
+        {
+            "duration_seconds": result.duration_seconds,
+            "next_ping_after": next_ping_after(visible=data["visible"]),
+        }
+    )
+
+
+def _stop(user_id, data) -> HttpResponse:
+    now = timezone.now()
+    sessions = StudySession.objects.filter(id=data["session_id"], user_id=user_id, is_active=True)
+    with serialized_writes():
+        stopped = sessions.update(is_active=False, ended_at=now, updated_at=now)
+    return HttpResponse(status=204) if stopped else _not_found()
+
+
+@csrf_exempt
+@require_POST
+async def study_session_start(request):
+    user_id = get_user_id_from_request(request)
+    if user_id is None:
+        return _unauthorized()
+    return await _handle(request, user_id, StudySessionStartSerializer, _start)
+
+
+@csrf_exempt
+@require_POST
+async def study_session_ping(request):
+    user_id = get_user_id_from_request(request)
+    if user_id is None:
+        return _unauthorized()
+    return await _handle(request, user_id, StudySessionPingSerializer, _ping)
+
+
+@csrf_exempt
+@require_POST
+async def study_session_stop(request):
+    user_id = get_user_id_from_request(request)
+    if user_id is None:
+        return _unauthorized()
+    return await _handle(request, user_id, StudySessionStopSerializer, _stop)
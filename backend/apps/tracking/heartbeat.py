@@ -0,0 +1,193 @@
+"""
+WebSocket heartbeat channel for study sessions.
+
+Instead of one HTTP ping (TLS, JWT decode, UPDATE) every 30 seconds per tab,
+the tracker keeps one WebSocket open per study session:
+
+    ws(s)://<host>/api/study-sessions/<session_id>/heartbeat/
+
+Its first frame is `{"token": "<access>"}` (never the URL, which proxies and
+access logs record), sent within `TRACKING_HEARTBEAT_AUTH_TIMEOUT_SECONDS`.
+The server answers `{"authenticated": true}` and the tracker then sends
+`{"active_seconds": n}` frames. Active time is accumulated in memory
+for the life of the connection and written to `duration_seconds` /
+`last_ping_at` at most every `TRACKING_HEARTBEAT_FLUSH_SECONDS`, plus once on
+disconnect.
+
+The socket bypasses the HTTP throttles, so it is paced here: the time credited
+never exceeds the wall time since the last flush (plus one ping interval of
+slack), and a client sending frames faster than the ping interval allows is
+closed. The socket is also closed once its session has been stopped or closed
+as stale. `POST /api/study-sessions/ping/` remains the fallback for clients
+that cannot keep a socket open.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+
+from django.conf import settings
+
+from .async_auth import get_user_id_from_token
+from .models import StudySession
+from .serializers import StudyHeartbeatSerializer
+from .services.study_time import aadd_active_seconds
+
+
+HEARTBEAT_PATH = re.compile(r"^/api/study-sessions/(?P<session_id>[0-9a-fA-F-]{36})/heartbeat/$")
+
+# Application close codes (4000-4999 are reserved for applications).
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+CLOSE_INVALID = 4400
+CLOSE_RATE_LIMITED = 4429
+
+# Frames a client may send beyond one per ping interval (tab visibility
+# changes flush early).
+FRAME_BURST = 5
+
+
+class HeartbeatState:
+    """
+    In-memory accounting for one open heartbeat connection.
+    """
+
+    __slots__ = ("session_id", "user_id", "pending_seconds", "last_flush", "opened_at", "frames")
+
+    def __init__(self, session_id: str, user_id):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.pending_seconds = 0
+        self.last_flush = self.opened_at = time.monotonic()
+        self.frames = 0
+
+    def add(self, seconds: int) -> bool:
+        """
+        Count one frame's active seconds, capped at the wall time since the
+        last flush plus one ping interval. Returns False when the frame comes
+        too soon (more than one per ping interval, past `FRAME_BURST`).
+        """
+
+        now = time.monotonic()
+        interval = settings.TRACKING_PING_INTERVAL_SECONDS
+        self.frames += 1
+        if self.frames > (now - self.opened_at) / interval + FRAME_BURST:
+            return False
+        self.pending_seconds = min(self.pending_seconds + seconds, int(now - self.last_flush) + interval)
+        return True
+
+    def flush_due(self) -> bool:
+        return time.monotonic() - self.last_flush >= settings.TRACKING_HEARTBEAT_FLUSH_SECONDS
+
+    async def flush(self) -> int | None:
+        """
+        Write pending seconds in a single UPDATE, plus the study calendar.
+        Returns the new duration, or None when nothing was pending or the
+        session no longer takes time (stopped, closed as stale, or gone).
+        """
+
+        self.last_flush = time.monotonic()
+        if self.pending_seconds <= 0:
+            return None
+
+        seconds, self.pending_seconds = self.pending_seconds, 0
+        return await aadd_active_seconds(user_id=self.user_id, session_id=self.session_id, seconds=seconds)
+
+
+async def _close(send, code: int) -> None:
+    await send({"type": "websocket.close", "code": code})
+
+
+def _decode(message):
+    """The JSON payload of a `websocket.receive` message (None if it is not JSON)."""
+    try:
+        return json.loads(message.get("text") or message.get("bytes") or b"")
+    except ValueError:
+        return None
+
+
+async def _authenticate(receive):
+    """
+    The user id from the `{"token": ...}` first frame, or None (invalid token,
+    another frame, timeout, or disconnect).
+    """
+
+    try:
+        message = await asyncio.wait_for(receive(), settings.TRACKING_HEARTBEAT_AUTH_TIMEOUT_SECONDS)
+    except TimeoutError:
+        return None
+    if message["type"] != "websocket.receive":
+        return None
+    payload = _decode(message)
+    token = payload.get("token") if isinstance(payload, dict) else None
+    return get_user_id_from_token(token) if isinstance(token, str) else None
+
+
+async def study_heartbeat(scope, receive, send, session_id: str) -> None:
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+
+    await send({"type": "websocket.accept"})
+    user_id = await _authenticate(receive)
+    if user_id is None:
+        await _close(send, CLOSE_UNAUTHORIZED)
+        return
+
+    sessions = StudySession.objects.filter(id=session_id, user_id=user_id, is_active=True, user__is_active=True)
+    if not await sessions.aexists():
+        await _close(send, CLOSE_NOT_FOUND)
+        return
+
+    await send({"type": "websocket.send", "text": json.dumps({"authenticated": True})})
+    state = HeartbeatState(session_id, user_id)
+
+    try:
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message["type"] != "websocket.receive":
+                continue
+
+            serializer = StudyHeartbeatSerializer(data=_decode(message))
+            if not serializer.is_valid():
+                await _close(send, CLOSE_INVALID)
+                break
+
+            if not state.add(int(serializer.validated_data["active_seconds"])):
+                await _close(send, CLOSE_RATE_LIMITED)
+                break
+            if state.flush_due() and state.pending_seconds:
+                duration_seconds = await state.flush()
+                if duration_seconds is None:
+                    # The tracker falls back to HTTP pings, whose 404 starts a new session.
+                    await _close(send, CLOSE_NOT_FOUND)
+                    break
+                await send({"type": "websocket.send", "text": json.dumps({"duration_seconds": duration_seconds})})
+    finally:
+        await state.flush()
+
+
+class HeartbeatRouter:
+    """
+    ASGI entry point: routes heartbeat WebSockets to `study_heartbeat` and
+    everything else to the Django application.
+    """
+
+    def __init__(self, django_application):
+        self.django_application = django_application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "websocket":
+            return await self.django_application(scope, receive, send)
+
+        match = HEARTBEAT_PATH.match(scope["path"])
+        if match is None:
+            await receive()
+            await _close(send, CLOSE_NOT_FOUND)
+            return None
+        return await study_heartbeat(scope, receive, send, match["session_id"])
@@ -0,0 +1,2 @@
+"""Django management commands for tracking app."""
+
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tracking.services.compaction import MIN_COMPACTION_DAYS, compact_study_sessions
+
+
+class Command(BaseCommand):
+    help = "Move closed StudySession rows older than N days into the archive, keeping per-day aggregates."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help=f"Archive closed sessions that started more than this many days ago (min {MIN_COMPACTION_DAYS}).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Sessions moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = compact_study_sessions(older_than_days=options["days"], batch_size=options["batch_size"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {result.sessions} sessions in {result.batches} batches "
+                f"({result.aggregates_created} day aggregates created, {result.aggregates_updated} updated)."
+            )
+        )
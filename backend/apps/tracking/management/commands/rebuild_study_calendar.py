@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.tracking.services.study_calendar import rebuild_study_calendar
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-day study calendar and streaks from sessions and day aggregates."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="user_ids",
+            type=int,
+            help="Only rebuild this user id (repeatable). Default: every user with study time.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Users rebuilt per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        users = rebuild_study_calendar(user_ids=options["user_ids"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the study calendar for {users} users."))
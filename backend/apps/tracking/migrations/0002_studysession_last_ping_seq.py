@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studysession',
+            name='last_ping_seq',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
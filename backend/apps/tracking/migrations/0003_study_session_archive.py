@@ -0,0 +1,92 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+ARCHIVE_TABLE = "tracking_studysessionarchive"
+
+# PostgreSQL: declarative range partitioning on started_at. Monthly partitions
+# are created on demand by `compact_study_sessions`; the DEFAULT partition
+# catches anything outside them. The partition key must be part of the PK.
+POSTGRES_ARCHIVE_DDL = [
+    f"""
+    CREATE TABLE "{ARCHIVE_TABLE}" (
+        "id" uuid NOT NULL,
+        "user_id" bigint NOT NULL REFERENCES "accounts_user" ("id") DEFERRABLE INITIALLY DEFERRED,
+        "context" varchar(255) NOT NULL,
+        "started_at" timestamp with time zone NOT NULL,
+        "ended_at" timestamp with time zone NULL,
+        "last_ping_at" timestamp with time zone NULL,
+        "duration_seconds" integer NOT NULL CHECK ("duration_seconds" >= 0),
+        "archived_at" timestamp with time zone NOT NULL,
+        PRIMARY KEY ("id", "started_at")
+    ) PARTITION BY RANGE ("started_at")
+    """,
+    f'CREATE TABLE "{ARCHIVE_TABLE}_default" PARTITION OF "{ARCHIVE_TABLE}" DEFAULT',
+    f'CREATE INDEX "tracking_st_user_id_4b895b_idx" ON "{ARCHIVE_TABLE}" ("user_id", "started_at")',
+]
+
+
+def create_archive_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for statement in POSTGRES_ARCHIVE_DDL:
+            schema_editor.execute(statement)
+        return
+    schema_editor.create_model(apps.get_model("tracking", "StudySessionArchive"))
+
+
+def drop_archive_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f'DROP TABLE "{ARCHIVE_TABLE}" CASCADE')
+        return
+    schema_editor.delete_model(apps.get_model("tracking", "StudySessionArchive"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0002_studysession_last_ping_seq'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudyDayAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('duration_seconds', models.PositiveIntegerField(default=0)),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='study_day_aggregates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-day'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='uniq_study_day_user_day')],
+            },
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='StudySessionArchive',
+                    fields=[
+                        ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                        ('context', models.CharField(blank=True, max_length=255)),
+                        ('started_at', models.DateTimeField()),
+                        ('ended_at', models.DateTimeField(blank=True, null=True)),
+                        ('last_ping_at', models.DateTimeField(blank=True, null=True)),
+                        ('duration_seconds', models.PositiveIntegerField(default=0)),
+                        ('archived_at', models.DateTimeField()),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_study_sessions', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'ordering': ['-started_at'],
+                        'indexes': [models.Index(fields=['user', 'started_at'], name='tracking_st_user_id_4b895b_idx')],
+                    },
+                ),
+            ],
+            database_operations=[],
+        ),
+        migrations.RunPython(create_archive_table, drop_archive_table),
+    ]
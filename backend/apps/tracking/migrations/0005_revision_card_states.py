@@ -0,0 +1,77 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:40
+
+import struct
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Card state format v1, frozen here (see `apps.tracking.services.card_srs`):
+# this migration must keep writing v1 whatever the service code becomes.
+EPOCH = datetime(2020, 1, 1, tzinfo=UTC)
+
+
+def new_card_states_v1(card_ids, due_at):
+    """`(card_states, cards_next_due_at)` for every card at stage 0, due at `due_at`."""
+    count = len(card_ids)
+    minutes = int((due_at - EPOCH).total_seconds() // 60)
+    blob = b"".join(
+        (
+            struct.pack("<BH", 1, count),
+            b"".join(card_id.bytes for card_id in card_ids),
+            bytes(count),
+            struct.pack(f"<{count}I", *[minutes] * count),
+            bytes(4 * count),
+        )
+    )
+    return blob, EPOCH + timedelta(minutes=minutes) if count else None
+
+
+def backfill_card_states(apps, schema_editor):
+    """Start every card of each pending schedule at stage 0, due with the lesson."""
+    RevisionSchedule = apps.get_model("tracking", "RevisionSchedule")
+    LessonCard = apps.get_model("learning", "LessonCard")
+
+    cards = {}
+    for lesson_id, card_id in LessonCard.objects.order_by("order", "english").values_list("lesson_id", "id").iterator():
+        cards.setdefault(lesson_id, []).append(card_id)
+
+    pending = RevisionSchedule.objects.exclude(status="completed").exclude(next_review_at=None)
+    batch = []
+    for schedule in pending.only("id", "lesson_id", "next_review_at").iterator(chunk_size=1000):
+        schedule.card_states, schedule.cards_next_due_at = new_card_states_v1(
+            cards.get(schedule.lesson_id, []), schedule.next_review_at
+        )
+        batch.append(schedule)
+        if len(batch) >= 1000:
+            RevisionSchedule.objects.bulk_update(batch, ["card_states", "cards_next_due_at"])
+            batch = []
+    RevisionSchedule.objects.bulk_update(batch, ["card_states", "cards_next_due_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0003_lessoncard_search_index'),
+        ('tracking', '0004_study_calendar'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='revisionschedule',
+            name='card_states',
+            field=models.BinaryField(blank=True, default=bytes),
+        ),
+        migrations.AddField(
+            model_name='revisionschedule',
+            name='cards_next_due_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='revisionschedule',
+            index=models.Index(fields=['user', 'cards_next_due_at'], name='tracking_re_user_id_c6760e_idx'),
+        ),
+        migrations.RunPython(backfill_card_states, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 19:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0005_revision_card_states'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='revisionschedule',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
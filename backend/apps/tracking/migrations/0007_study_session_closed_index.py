@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-19 20:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracking', '0006_revision_schedule_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studysession',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['started_at', 'id'], name='tracking_session_closed_idx'),
+        ),
+    ]
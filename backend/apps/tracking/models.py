@@ -21,6 +21,9 @@ class StudySession(models.Model):
     last_ping_at = models.DateTimeField(null=True, blank=True)
 
     duration_seconds = models.PositiveIntegerField(default=0)
+    # Highest client ping sequence number applied; retried pings carry the same
+    # `seq` and are skipped instead of being added twice.
+    last_ping_seq = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -30,6 +33,10 @@ class StudySession(models.Model):
         indexes = [
             models.Index(fields=["user", "started_at"]),
             models.Index(fields=["user", "is_active"]),
+            # `compact_study_sessions` walks closed sessions oldest first.
+            models.Index(
+                fields=["started_at", "id"], condition=models.Q(is_active=False), name="tracking_session_closed_idx"
+            ),
         ]
         ordering = ["-started_at"]
 
@@ -37,6 +44,102 @@ class StudySession(models.Model):
         return f"{self.user_id} - {self.duration_seconds}s"
 
 
+class StudySessionArchive(models.Model):
+    """
+    Closed study sessions moved out of `StudySession` by `compact_study_sessions`.
+
+    On PostgreSQL the table is range-partitioned by month on `started_at`
+    (primary key `(id, started_at)`); elsewhere it is a plain table.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_study_sessions",
+    )
+
+    context = models.CharField(max_length=255, blank=True)
+
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField(null=True, blank=True)
+    last_ping_at = models.DateTimeField(null=True, blank=True)
+
+    duration_seconds = models.PositiveIntegerField(default=0)
+
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "started_at"]),
+        ]
+        ordering = ["-started_at"]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.duration_seconds}s (archived)"
+
+
+class StudyDayAggregate(models.Model):
+    """
+    Per-user, per-day totals for archived sessions, so summaries never have to
+    scan the archive.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="study_day_aggregates",
+    )
+    day = models.DateField()
+
+    duration_seconds = models.PositiveIntegerField(default=0)
+    session_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "day"], name="uniq_study_day_user_day"),
+        ]
+        ordering = ["-day"]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.day} - {self.duration_seconds}s"
+
+
+class StudyYear(models.Model):
+    """
+    A user's active study seconds for every day of one calendar year, packed
+    as 366 little-endian uint32s (index = day of year - 1). Updated by pings
+    and heartbeat flushes, so the heatmap never scans sessions.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="study_years")
+    year = models.PositiveSmallIntegerField()
+    day_seconds = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "year"], name="uniq_study_year_user_year"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.year}"
+
+
+class StudyStreak(models.Model):
+    """
+    Consecutive active days (at least `TRACKING_STREAK_MIN_SECONDS` of study)
+    ending at `last_active_day`, and the longest such run so far.
+    """
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="study_streak")
+    current_days = models.PositiveIntegerField(default=0)
+    longest_days = models.PositiveIntegerField(default=0)
+    last_active_day = models.DateField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.current_days}/{self.longest_days}"
+
+
 class RevisionStatus(models.TextChoices):
     SCHEDULED = "scheduled", "Scheduled"
     DUE = "due", "Due"
@@ -44,6 +147,11 @@ class RevisionStatus(models.TextChoices):
     COMPLETED = "completed", "Completed"
 
 
+# Schedules still in the revision queue. Filtering on these (rather than
+# excluding COMPLETED) lets queries seek the (user, status, next_review_at) index.
+PENDING_STATUSES = (RevisionStatus.SCHEDULED, RevisionStatus.DUE, RevisionStatus.EXPIRED)
+
+
 class RevisionSchedule(models.Model):
     """
     One schedule per user+lesson (MVP). Stage maps to the next interval in the SRS sequence.
@@ -65,6 +173,16 @@ class RevisionSchedule(models.Model):
         default=RevisionStatus.SCHEDULED,
     )
 
+    # Card-level SRS: every card's stage/due/last review packed in one value
+    # (see apps.tracking.services.card_srs), plus the earliest card due time.
+    card_states = models.BinaryField(default=bytes, blank=True, editable=False)
+    cards_next_due_at = models.DateTimeField(null=True, blank=True)
+
+    # Bumped by every lesson-level review/reset; writes are conditional on it
+    # (optimistic concurrency, see services.spaced_repetition.write_with_retry).
+    # Card reviews are conditional on `card_states` instead and leave it alone.
+    version = models.PositiveIntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -75,6 +193,7 @@ class RevisionSchedule(models.Model):
         indexes = [
             models.Index(fields=["user", "status", "next_review_at"]),
             models.Index(fields=["user", "lesson"]),
+            models.Index(fields=["user", "cards_next_due_at"]),
         ]
         ordering = ["next_review_at"]
 
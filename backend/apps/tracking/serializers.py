@@ -2,7 +2,11 @@ from __future__ import annotations
 
 from rest_framework import serializers
 
+from apps.core.row_serializers import RowSerializer
 from apps.learning.models import Lesson
+from apps.learning.serializers import LessonCardSerializer, SearchLessonSerializer
+from apps.learning.services.images import cover_images, cover_images_from_variants
+from apps.learning.services.lesson_registry import lesson_registry
 
 from .models import RevisionSchedule, StudySession
 
@@ -14,6 +18,16 @@ class StudySessionStartSerializer(serializers.Serializer):
 class StudySessionPingSerializer(serializers.Serializer):
     session_id = serializers.UUIDField()
     active_seconds = serializers.IntegerField(min_value=1, max_value=60 * 60)
+    visible = serializers.BooleanField(required=False, default=True)
+    seq = serializers.IntegerField(min_value=1, required=False)
+
+
+class StudyHeartbeatSerializer(serializers.Serializer):
+    active_seconds = serializers.IntegerField(min_value=1, max_value=60 * 60)
+
+
+class StudyHeatmapQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=7, max_value=366, required=False, default=365)
 
 
 class StudySessionStopSerializer(serializers.Serializer):
@@ -25,9 +39,14 @@ class LessonCompleteSerializer(serializers.Serializer):
 
 
 class LessonMiniSerializer(serializers.ModelSerializer):
+    cover_images = serializers.SerializerMethodField()
+
     class Meta:
         model = Lesson
-        fields = ("id", "slug", "title", "cover_image_path")
+        fields = ("id", "slug", "title", "cover_image_path", "cover_images")
+
+    def get_cover_images(self, obj: Lesson):
+        return cover_images(obj, self.context.get("request"))
 
 
 class RevisionScheduleSerializer(serializers.ModelSerializer):
@@ -35,7 +54,54 @@ class RevisionScheduleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = RevisionSchedule
-        fields = ("id", "lesson", "stage", "next_review_at", "status", "lesson_completed_at", "last_reviewed_at")
+        fields = (
+            "id",
+            "lesson",
+            "stage",
+            "next_review_at",
+            "status",
+            "lesson_completed_at",
+            "last_reviewed_at",
+            "version",
+        )
+
+
+class LessonWithCardsSerializer(LessonMiniSerializer):
+    cards = LessonCardSerializer(many=True, read_only=True)
+
+    class Meta(LessonMiniSerializer.Meta):
+        fields = (*LessonMiniSerializer.Meta.fields, "cards")
+
+
+class RevisionSessionScheduleSerializer(RevisionScheduleSerializer):
+    lesson = LessonWithCardsSerializer()
+
+
+class RevisionReviewSerializer(serializers.Serializer):
+    # The schedule version the client reviewed; a stale one is a 409, not a second review.
+    version = serializers.IntegerField(min_value=0, required=False)
+
+
+class DueCardsQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(min_value=1, max_value=200, required=False, default=50)
+
+
+class DueCardSerializer(serializers.Serializer):
+    schedule_id = serializers.UUIDField()
+    stage = serializers.IntegerField()
+    due_at = serializers.DateTimeField()
+    last_reviewed_at = serializers.DateTimeField(allow_null=True)
+    lesson = SearchLessonSerializer(source="card.lesson")
+    card = LessonCardSerializer()
+
+
+class CardResultSerializer(serializers.Serializer):
+    card_id = serializers.UUIDField()
+    correct = serializers.BooleanField()
+
+
+class CardReviewSerializer(serializers.Serializer):
+    results = CardResultSerializer(many=True, allow_empty=False, max_length=500)
 
 
 class StudySessionSerializer(serializers.ModelSerializer):
@@ -43,3 +109,22 @@ class StudySessionSerializer(serializers.ModelSerializer):
         model = StudySession
         fields = ("id", "context", "started_at", "ended_at", "duration_seconds", "is_active")
 
+
+# `.values()`-based equivalents of the serializers above for the dashboard and
+# revision list, which serialize a user's whole queue on every request. Lesson
+# fields come from the in-process registry, so schedule queries skip the join.
+LESSON_MINI_ROWS = RowSerializer(
+    LessonMiniSerializer,
+    methods={
+        "cover_images": (
+            ("cover_image_variants",),
+            lambda variants, context: cover_images_from_variants(variants, context.get("request")),
+        ),
+    },
+)
+REVISION_SCHEDULE_ROWS = RowSerializer(
+    RevisionScheduleSerializer,
+    nested={"lesson": LESSON_MINI_ROWS},
+    in_memory={"lesson": lesson_registry.get_many},
+)
+STUDY_SESSION_ROWS = RowSerializer(StudySessionSerializer)
@@ -0,0 +1,392 @@
+"""
+Card-level spaced repetition, stored alongside the lesson schedule.
+
+A row per user per card would multiply `RevisionSchedule` by the number of
+cards in a lesson. Instead each schedule carries the state of all its
+lesson's cards in one column, `card_states`, laid out column-wise so each
+column decodes/encodes with a single `array` call:
+
+    header   <BH     format version, card count n
+    ids      16n     card UUIDs (bytes), lesson card order at creation
+    stages   n × u8  SRS stage (index into `SRS_INTERVALS`)
+    due      n × u32 due time, minutes since `EPOCH`; `RETIRED` = done
+    last     n × u32 last review, minutes since `EPOCH`; 0 = never
+
+Times have minute precision. All integers are little-endian. About 25 bytes per card, against a full row
+(and index entries) per card for the naive design; see
+`benchmarks/card_srs.py`.
+
+`cards_next_due_at` holds the earliest due time over the schedule's cards
+and is indexed with the user, so "which cards are due" reads only the
+schedules that have at least one due card and decodes their blobs in Python.
+"""
+
+from __future__ import annotations
+
+import random
+import struct
+import sys
+import time
+import uuid
+from array import array
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from django.utils import timezone
+
+from apps.learning.models import LessonCard
+from config.sqlite import serialize_writes
+
+from ..models import RevisionSchedule
+from .spaced_repetition import (
+    MAX_STAGE,
+    SRS_INTERVALS,
+    WRITE_ATTEMPTS,
+    WRITE_BACKOFF_SECONDS,
+    ScheduleConflict,
+)
+
+
+FORMAT_VERSION = 1
+EPOCH = datetime(2020, 1, 1, tzinfo=UTC)
+RETIRED = 2**32 - 1
+
+# A card answered wrong comes back within the same session.
+RELEARN_INTERVAL = timedelta(minutes=10)
+
+_HEADER = struct.Struct("<BH")
+_ID_SIZE = 16
+# id, stage, due, last.
+_CARD_SIZE = _ID_SIZE + 1 + 4 + 4
+_SWAP = sys.byteorder != "little"
+_INTERVAL_MINUTES = [int(interval.total_seconds() // 60) for interval in SRS_INTERVALS]
+_RELEARN_MINUTES = int(RELEARN_INTERVAL.total_seconds() // 60)
+
+
+def to_minutes(value: datetime) -> int:
+    return int((value - EPOCH).total_seconds() // 60)
+
+
+def from_minutes(minutes: int) -> datetime:
+    return EPOCH + timedelta(minutes=minutes)
+
+
+def _column(typecode: str, raw=b"") -> array:
+    """Decode one little-endian column."""
+    column = array(typecode)
+    column.frombytes(raw)
+    if _SWAP and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+
+def _column_bytes(column: array) -> bytes:
+    if _SWAP and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+class CardStates:
+    """The decoded `card_states` of one schedule: parallel columns indexed by position."""
+
+    __slots__ = ("ids", "stages", "due", "last", "_positions")
+
+    def __init__(self, ids: list[bytes], stages: array, due: array, last: array):
+        self.ids = ids
+        self.stages = stages
+        self.due = due
+        self.last = last
+        self._positions = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def new(cls, card_ids, due_at: datetime) -> CardStates:
+        """Every card at stage 0, due at `due_at`."""
+        ids = [card_id.bytes for card_id in card_ids]
+        count = len(ids)
+        return cls(ids, array("B", bytes(count)), array("I", [to_minutes(due_at)] * count), array("I", [0] * count))
+
+    @classmethod
+    def decode(cls, blob) -> CardStates:
+        if not blob:
+            return cls([], array("B"), array("I"), array("I"))
+        blob = memoryview(blob)
+        if len(blob) < _HEADER.size:
+            raise ValueError(f"Truncated card states ({len(blob)} bytes)")
+        version, count = _HEADER.unpack_from(blob)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unknown card state format {version}")
+        if len(blob) != _HEADER.size + _CARD_SIZE * count:
+            raise ValueError(f"Card states of {count} cards cannot be {len(blob)} bytes")
+        offset = _HEADER.size
+        ids_end = offset + _ID_SIZE * count
+        raw_ids = bytes(blob[offset:ids_end])
+        ids = [raw_ids[i : i + _ID_SIZE] for i in range(0, len(raw_ids), _ID_SIZE)]
+        stages_end = ids_end + count
+        due_end = stages_end + 4 * count
+        return cls(
+            ids,
+            _column("B", blob[ids_end:stages_end]),
+            _column("I", blob[stages_end:due_end]),
+            _column("I", blob[due_end : due_end + 4 * count]),
+        )
+
+    def encode(self) -> bytes:
+        return b"".join(
+            (
+                _HEADER.pack(FORMAT_VERSION, len(self.ids)),
+                b"".join(self.ids),
+                self.stages.tobytes(),
+                _column_bytes(self.due),
+                _column_bytes(self.last),
+            )
+        )
+
+    def position(self, card_id: uuid.UUID) -> int | None:
+        if self._positions is None:
+            self._positions = {card_id: index for index, card_id in enumerate(self.ids)}
+        return self._positions.get(card_id.bytes)
+
+    def align(self, card_ids, due_at: datetime) -> bool:
+        """
+        Match the lesson's current cards: drop states of deleted cards and add
+        new cards at stage 0, due at `due_at`. Returns whether anything changed.
+        """
+
+        wanted = [card_id.bytes for card_id in card_ids]
+        wanted_set = set(wanted)
+        keep = [index for index, card_id in enumerate(self.ids) if card_id in wanted_set]
+        known = {self.ids[index] for index in keep}
+        added = [card_id for card_id in wanted if card_id not in known]
+        if len(keep) == len(self.ids) and not added:
+            return False
+
+        if len(keep) != len(self.ids):
+            self.ids = [self.ids[index] for index in keep]
+            self.stages = array("B", (self.stages[index] for index in keep))
+            self.due = array("I", (self.due[index] for index in keep))
+            self.last = array("I", (self.last[index] for index in keep))
+        if added:
+            self.ids.extend(added)
+            self.stages.frombytes(bytes(len(added)))
+            self.due.extend([to_minutes(due_at)] * len(added))
+            self.last.extend([0] * len(added))
+        self._positions = None
+        return True
+
+    def review(self, results: dict[uuid.UUID, bool], reviewed_at: datetime) -> int:
+        """
+        Apply review results (card id → answered correctly). A correct answer
+        moves the card to the next interval (retiring it after the last one);
+        a wrong one resets it to stage 0 and brings it back after
+        `RELEARN_INTERVAL`. Unknown cards are ignored. Returns how many cards
+        were updated.
+        """
+
+        now = to_minutes(reviewed_at)
+        stages, due, last = self.stages, self.due, self.last
+        updated = 0
+        for card_id, correct in results.items():
+            index = self.position(card_id)
+            if index is None:
+                continue
+            updated += 1
+            last[index] = now
+            if not correct:
+                stages[index] = 0
+                due[index] = now + _RELEARN_MINUTES
+            elif due[index] == RETIRED or stages[index] >= MAX_STAGE:
+                due[index] = RETIRED
+            else:
+                stages[index] += 1
+                due[index] = now + _INTERVAL_MINUTES[stages[index]]
+        return updated
+
+    def due_positions(self, now_minutes: int) -> list[int]:
+        return [index for index, minutes in enumerate(self.due) if minutes <= now_minutes]
+
+    def next_due_at(self) -> datetime | None:
+        minutes = min(self.due, default=RETIRED)
+        return None if minutes == RETIRED else from_minutes(minutes)
+
+
+def lesson_card_ids(lesson_ids) -> dict:
+    """Current card ids of each lesson, in lesson card order (one query)."""
+    cards: dict = {lesson_id: [] for lesson_id in lesson_ids}
+    rows = LessonCard.objects.filter(lesson_id__in=cards).order_by("order", "english").values_list("lesson_id", "id")
+    for lesson_id, card_id in rows:
+        cards[lesson_id].append(card_id)
+    return cards
+
+
+def reset_card_states(schedule: RevisionSchedule, card_ids, due_at: datetime) -> None:
+    """Start every card of the schedule over at stage 0, due at `due_at` (not saved)."""
+    states = CardStates.new(card_ids, due_at)
+    schedule.card_states = states.encode()
+    schedule.cards_next_due_at = states.next_due_at()
+
+
+def save_card_states_if_unchanged(schedule: RevisionSchedule, read_states: bytes, now=None) -> bool:
+    """
+    Write `card_states` / `cards_next_due_at` only if the row still has the
+    card states `schedule` was read with. `version` guards the lesson-level
+    review and is left alone, so card reviews never make it stale. Returns
+    whether the write happened.
+    """
+
+    now = now or timezone.now()
+    updated = RevisionSchedule.objects.filter(pk=schedule.pk, card_states=read_states).update(
+        card_states=schedule.card_states, cards_next_due_at=schedule.cards_next_due_at, updated_at=now
+    )
+    if updated:
+        schedule.updated_at = now
+    return bool(updated)
+
+
+def write_card_states_with_retry(schedule: RevisionSchedule, change, *, now=None) -> RevisionSchedule:
+    """
+    Apply `change(schedule)` to the card states and save it conditionally,
+    re-reading and re-applying after a lost race, as `write_with_retry` does
+    for the lesson-level fields. Raises `ScheduleConflict`.
+    """
+
+    for attempt in range(WRITE_ATTEMPTS):
+        read_states = bytes(schedule.card_states)
+        change(schedule)
+        if save_card_states_if_unchanged(schedule, read_states, now=now):
+            return schedule
+        if 0 < attempt < WRITE_ATTEMPTS - 1:
+            time.sleep(random.uniform(0, WRITE_BACKOFF_SECONDS * 2**attempt))
+        schedule.refresh_from_db()
+    raise ScheduleConflict(schedule)
+
+
+@dataclass
+class CardReviewResult:
+    updated: int = 0
+    ignored: int = 0
+    schedules: list[RevisionSchedule] = field(default_factory=list)
+    # Cards of schedules whose write kept losing races (not applied; safe to retry).
+    conflicts: list[uuid.UUID] = field(default_factory=list)
+
+
+@serialize_writes
+def review_cards(*, user, results: dict[uuid.UUID, bool], reviewed_at=None) -> CardReviewResult:
+    """
+    Record a batch of card reviews for `user`. Cards are grouped by lesson;
+    each affected schedule is decoded once, updated for all its cards and
+    written back once, conditionally on its card states (no row locks, and
+    `version` is not bumped; see `write_card_states_with_retry`). Cards of
+    lessons the user has not completed are ignored. Each schedule is written on its own, so a schedule that keeps
+    changing does not hold back (or roll back) the others: its cards are
+    listed in `conflicts` instead.
+    """
+
+    reviewed_at = reviewed_at or timezone.now()
+    lessons = dict(LessonCard.objects.filter(id__in=list(results)).values_list("id", "lesson_id"))
+    result = CardReviewResult(ignored=len(results))
+    if not lessons:
+        return result
+
+    by_lesson: dict = {}
+    for card_id, lesson_id in lessons.items():
+        by_lesson.setdefault(lesson_id, {})[card_id] = results[card_id]
+
+    schedules = list(RevisionSchedule.objects.filter(user=user, lesson_id__in=list(by_lesson)).order_by("id"))
+    current = lesson_card_ids([schedule.lesson_id for schedule in schedules])
+    updated = {}
+
+    def review(schedule: RevisionSchedule) -> None:
+        states = CardStates.decode(schedule.card_states)
+        states.align(current[schedule.lesson_id], due_at=reviewed_at)
+        updated[schedule.pk] = states.review(by_lesson[schedule.lesson_id], reviewed_at)
+        schedule.card_states = states.encode()
+        schedule.cards_next_due_at = states.next_due_at()
+
+    written = []
+    for schedule in schedules:
+        # Each attempt is a single conditional UPDATE in its own transaction,
+        # so the backoff between attempts holds no locks.
+        try:
+            write_card_states_with_retry(schedule, review, now=reviewed_at)
+        except ScheduleConflict:
+            updated.pop(schedule.pk, None)
+            result.conflicts.extend(by_lesson[schedule.lesson_id])
+        else:
+            written.append(schedule)
+
+    result.updated = sum(updated.values())
+    result.ignored = len(results) - result.updated - len(result.conflicts)
+    result.schedules = written
+    return result
+
+
+@dataclass(slots=True)
+class DueCard:
+    schedule_id: uuid.UUID
+    card_id: uuid.UUID
+    stage: int
+    due_at: datetime
+    last_reviewed_at: datetime | None
+    card: LessonCard | None = None
+
+
+def due_cards(*, user, now=None, limit: int = 50) -> list[DueCard]:
+    """
+    The user's `limit` most overdue cards, with their `LessonCard` (and
+    lesson) loaded: one query for the schedules with a due card, one for
+    their lessons' cards. States are aligned with the current cards first, so
+    cards deleted since are skipped and cards added since are due now (see
+    `signals.schedule_added_cards`, which brings their schedules into range).
+    """
+
+    now = now or timezone.now()
+    now_minutes = to_minutes(now)
+    rows = list(
+        RevisionSchedule.objects.filter(user=user, cards_next_due_at__lte=now).values_list(
+            "id", "lesson_id", "lesson_completed_at", "card_states"
+        )
+    )
+    cards = {}
+    current: dict = {}
+    lessons = {lesson_id for _, lesson_id, _, _ in rows}
+    for card in LessonCard.objects.select_related("lesson").filter(lesson_id__in=lessons).order_by("order", "english"):
+        cards[card.id] = card
+        current.setdefault(card.lesson_id, []).append(card.id)
+
+    due = []
+    for schedule_id, lesson_id, lesson_completed_at, blob in rows:
+        states = CardStates.decode(blob)
+        states.align(current.get(lesson_id, []), due_at=now)
+        for index in states.due_positions(now_minutes):
+            # Ties (a lesson's cards share a due time) keep lesson card order.
+            due.append(
+                (
+                    states.due[index],
+                    lesson_completed_at,
+                    index,
+                    states.ids[index],
+                    schedule_id,
+                    states.stages[index],
+                    states.last[index],
+                )
+            )
+    due.sort(key=lambda row: row[:3])
+
+    selected = []
+    for minutes, _, _, raw_id, schedule_id, stage, last in due[:limit]:
+        card = cards[uuid.UUID(bytes=raw_id)]
+        selected.append(
+            DueCard(
+                schedule_id=schedule_id,
+                card_id=card.id,
+                stage=stage,
+                due_at=from_minutes(minutes),
+                last_reviewed_at=from_minutes(last) if last else None,
+                card=card,
+            )
+        )
+    return selected
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import StudyDayAggregate, StudySession, StudySessionArchive
+
+
+# The dashboard's "today" and rolling 7-day totals read only the hot table, so
+# sessions younger than this must never be compacted.
+MIN_COMPACTION_DAYS = 8
+
+ARCHIVE_FIELDS = ("id", "user_id", "context", "started_at", "ended_at", "last_ping_at", "duration_seconds")
+
+
+@dataclass
+class CompactionResult:
+    sessions: int = 0
+    batches: int = 0
+    aggregates_created: int = 0
+    aggregates_updated: int = 0
+
+
+def _month_start(value: datetime) -> date:
+    return value.date().replace(day=1)
+
+
+def _next_month(value: date) -> date:
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def ensure_archive_partitions(started_ats) -> None:
+    """
+    PostgreSQL only: create the monthly archive partitions covering
+    `started_ats` (no-op elsewhere).
+    """
+
+    if connection.vendor != "postgresql":
+        return
+
+    table = StudySessionArchive._meta.db_table
+    with connection.cursor() as cursor:
+        for month in sorted({_month_start(value) for value in started_ats}):
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}_y{month:%Y}m{month:%m}" '
+                f'PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+                [month.isoformat(), _next_month(month).isoformat()],
+            )
+
+
+def _merge_day_aggregates(rows: list[dict], result: CompactionResult) -> None:
+    totals: dict[tuple[int, date], list[int]] = defaultdict(lambda: [0, 0])
+    for row in rows:
+        key = (row["user_id"], timezone.localtime(row["started_at"]).date())
+        totals[key][0] += row["duration_seconds"]
+        totals[key][1] += 1
+
+    existing = {
+        (agg.user_id, agg.day): agg
+        for agg in StudyDayAggregate.objects.filter(
+            user_id__in={user_id for user_id, _ in totals},
+            day__in={day for _, day in totals},
+        )
+    }
+
+    to_update, to_create = [], []
+    for (user_id, day), (seconds, count) in totals.items():
+        agg = existing.get((user_id, day))
+        if agg is None:
+            to_create.append(StudyDayAggregate(user_id=user_id, day=day, duration_seconds=seconds, session_count=count))
+        else:
+            agg.duration_seconds += seconds
+            agg.session_count += count
+            to_update.append(agg)
+
+    if to_create:
+        StudyDayAggregate.objects.bulk_create(to_create, batch_size=500)
+    if to_update:
+        StudyDayAggregate.objects.bulk_update(to_update, ["duration_seconds", "session_count"], batch_size=500)
+    result.aggregates_created += len(to_create)
+    result.aggregates_updated += len(to_update)
+
+
+def compact_study_sessions(*, older_than_days: int, batch_size: int = 1000, now=None) -> CompactionResult:
+    """
+    Move closed sessions that started more than `older_than_days` ago from
+    `StudySession` into `StudySessionArchive`, folding their time into
+    `StudyDayAggregate`. Each batch is its own transaction, so the hot table
+    is never locked for long and an interrupted run can simply be resumed.
+    """
+
+    if older_than_days < MIN_COMPACTION_DAYS:
+        raise ValueError(f"older_than_days must be at least {MIN_COMPACTION_DAYS}.")
+
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=older_than_days)
+    candidates = StudySession.objects.filter(is_active=False, started_at__lt=cutoff).order_by("started_at", "id")
+    result = CompactionResult()
+
+    while True:
+        with transaction.atomic():
+            rows = list(candidates.values(*ARCHIVE_FIELDS)[:batch_size])
+            if not rows:
+                break
+
+            ensure_archive_partitions(row["started_at"] for row in rows)
+            StudySessionArchive.objects.bulk_create(
+                [StudySessionArchive(archived_at=now, **row) for row in rows],
+                batch_size=500,
+            )
+            _merge_day_aggregates(rows, result)
+            StudySession.objects.filter(id__in=[row["id"] for row in rows]).delete()
+
+        result.sessions += len(rows)
+        result.batches += 1
+
+    return result
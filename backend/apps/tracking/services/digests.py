@@ -0,0 +1,130 @@
+"""
+Nightly "reviews due today" digests for every user, in one streaming pass.
+
+A single query over `RevisionSchedule` ⋈ `Lesson` ⋈ `User` returns, per user
+with due reviews, only their `top` most overdue lessons, each row carrying
+the user's total due count (window functions partitioned by user). Rows come
+ordered by user and are read with `.iterator()`, so consecutive rows form one
+user's digest. Emails go to the configured backend in batches over a single
+connection. Memory is bounded by the iterator chunk and the batch size, not
+by the number of users.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from ..models import RevisionSchedule, RevisionStatus
+
+
+DIGEST_FIELDS = ("user_id", "user__email", "user__first_name", "due_count", "lesson__title")
+
+
+@dataclass
+class DigestResult:
+    users: int = 0
+    rows: int = 0
+    sent: int = 0
+    failed: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    due_reviews: int = 0
+    sample: list[EmailMessage] = field(default_factory=list, repr=False)
+
+    @property
+    def users_per_second(self) -> float:
+        return self.users / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+def end_of_today(now=None) -> datetime:
+    """Start of tomorrow in `TIME_ZONE`: everything scheduled before it is due today."""
+    today = timezone.localdate(now or timezone.now())
+    return timezone.make_aware(datetime.combine(today + timedelta(days=1), datetime.min.time()))
+
+
+def digest_rows(*, now=None, top: int = 3):
+    """
+    `(user_id, email, first_name, due_count, lesson_title)` rows
+    for every active user with reviews due today: at most `top` per user
+    (most overdue first), ordered by user.
+    """
+
+    per_user = {"partition_by": [F("user_id")]}
+    return (
+        RevisionSchedule.objects.filter(user__is_active=True, next_review_at__lt=end_of_today(now))
+        .exclude(status=RevisionStatus.COMPLETED)
+        .annotate(
+            due_count=Window(Count("id"), **per_user),
+            position=Window(RowNumber(), order_by=[F("next_review_at").asc(), F("id").asc()], **per_user),
+        )
+        .filter(position__lte=top)
+        .order_by("user_id", "position")
+        .values_list(*DIGEST_FIELDS)
+    )
+
+
+def build_digest(email: str, first_name: str, due_count: int, lessons: list[str]) -> EmailMessage:
+    noun = "review" if due_count == 1 else "reviews"
+    lines = [f"Hi {first_name}," if first_name else "Hi,", "", f"You have {due_count} {noun} due today:", ""]
+    lines += [f"  • {title}" for title in lessons]
+    if due_count > len(lessons):
+        lines.append(f"  … and {due_count - len(lessons)} more")
+    lines += ["", f"Review now: {settings.FRONTEND_URL}/dashboard"]
+    return EmailMessage(subject=f"You have {due_count} {noun} due today", body="\n".join(lines), to=[email])
+
+
+def send_review_digests(
+    *, now=None, top: int = 3, batch_size: int = 500, chunk_size: int = 2000, dry_run: bool = False
+) -> DigestResult:
+    """
+    Build and send one digest per user with reviews due today. With
+    `dry_run`, messages are built but not sent (the first few are kept in
+    `result.sample`).
+    """
+
+    result = DigestResult()
+    started = time.perf_counter()
+    connection = None if dry_run else get_connection(fail_silently=False)
+    batch: list[EmailMessage] = []
+
+    def flush() -> None:
+        if not batch:
+            return
+        result.batches += 1
+        if dry_run:
+            result.sample.extend(batch[: max(0, 5 - len(result.sample))])
+        else:
+            sent = connection.send_messages(batch) or 0
+            result.sent += sent
+            result.failed += len(batch) - sent
+        batch.clear()
+
+    if connection is not None:
+        connection.open()
+    try:
+        rows = digest_rows(now=now, top=top).iterator(chunk_size=chunk_size)
+        for (_, email, first_name, due_count), group in groupby(rows, key=itemgetter(0, 1, 2, 3)):
+            lessons = [row[4] for row in group]
+            result.users += 1
+            result.rows += len(lessons)
+            result.due_reviews += due_count
+            batch.append(build_digest(email, first_name, due_count, lessons))
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        if connection is not None:
+            connection.close()
+
+    result.elapsed_seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+# Requests above this many concurrent pings (per process) count as overload.
+IN_FLIGHT_SOFT_LIMIT = 64
+
+# `active_seconds` is capped at one hour, so the client must ping at least that often.
+MAX_ACTIVE_SECONDS = 60 * 60
+
+
+class PingLoadMonitor:
+    """
+    Per-process view of how loaded the ping endpoint is: the number of pings
+    currently being handled and a rolling window of recent handling times.
+    """
+
+    def __init__(self, window: int = 256):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    @contextmanager
+    def track(self):
+        started = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.in_flight -= 1
+                self._samples.append(elapsed)
+
+    def p95_ms(self) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        return samples[max(0, math.ceil(0.95 * len(samples)) - 1)] * 1000
+
+
+load_monitor = PingLoadMonitor()
+
+
+def next_ping_after(*, visible: bool = True, monitor: PingLoadMonitor = load_monitor) -> int:
+    """
+    Seconds the tracker should wait before its next ping.
+
+    Hidden tabs accrue no active time, so they get the longest interval. For
+    visible tabs the base interval is stretched by how far the recent p95 and
+    the in-flight count exceed their targets. The client sends everything it
+    accumulated in the meantime, so stretching never loses time.
+    """
+
+    base = settings.TRACKING_PING_INTERVAL_SECONDS
+    ceiling = min(settings.TRACKING_PING_MAX_INTERVAL_SECONDS, MAX_ACTIVE_SECONDS)
+
+    if not visible:
+        return ceiling
+
+    pressure = max(
+        1.0,
+        monitor.p95_ms() / settings.TRACKING_PING_TARGET_P95_MS,
+        monitor.in_flight / IN_FLIGHT_SOFT_LIMIT,
+    )
+    return min(ceiling, math.ceil(base * pressure))
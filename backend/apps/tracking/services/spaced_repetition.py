@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import timedelta
 
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from django.utils import timezone
 
-from ..models import RevisionSchedule, RevisionStatus
+from config.sqlite import serialize_writes, serialized_writes
+
+from ..models import PENDING_STATUSES, RevisionSchedule, RevisionStatus
 
 
 SRS_INTERVALS = [
@@ -18,63 +27,218 @@ SRS_INTERVALS = [
 MAX_STAGE = len(SRS_INTERVALS) - 1
 
 
-def sync_schedule_status(schedule: RevisionSchedule, now=None) -> RevisionSchedule:
+def schedule_status(status: str, next_review_at, now) -> str:
     """
-    Keep `status` in sync with time.
+    The status a schedule should have at `now`.
 
     - due: next_review_at <= now and due today
     - expired: due date is before today
     - scheduled: due in the future
     """
 
+    if status == RevisionStatus.COMPLETED:
+        return status
+    if not next_review_at:
+        return RevisionStatus.COMPLETED
+    if next_review_at.date() < now.date():
+        return RevisionStatus.EXPIRED
+    if next_review_at <= now:
+        return RevisionStatus.DUE
+    return RevisionStatus.SCHEDULED
+
+
+def sync_schedule_status(schedule: RevisionSchedule, now=None) -> RevisionSchedule:
+    """Keep `status` in sync with time (see `schedule_status`)."""
+
     now = now or timezone.now()
+    schedule.status = schedule_status(schedule.status, schedule.next_review_at, now)
+    return schedule
 
-    if schedule.status == RevisionStatus.COMPLETED:
-        return schedule
 
-    if not schedule.next_review_at:
-        schedule.status = RevisionStatus.COMPLETED
-        return schedule
+def sync_schedule_rows(rows: list[dict], now=None, *, persist: bool | None = None) -> list[dict]:
+    """
+    `sync_schedule_status` for `.values()` rows (with `id`, `status` and
+    `next_review_at`): fixes `status` in place and, when `persist` (default
+    `settings.TRACKING_SYNC_STATUSES_ON_READ`), saves the changes with one
+    UPDATE per new status.
+    """
 
-    if schedule.next_review_at.date() < now.date():
-        schedule.status = RevisionStatus.EXPIRED
-    elif schedule.next_review_at <= now:
-        schedule.status = RevisionStatus.DUE
-    else:
-        schedule.status = RevisionStatus.SCHEDULED
+    now = now or timezone.now()
+    if persist is None:
+        persist = settings.TRACKING_SYNC_STATUSES_ON_READ
+    changed: dict[str, list] = {}
+    for row in rows:
+        status = schedule_status(row["status"], row["next_review_at"], now)
+        if status != row["status"]:
+            row["status"] = status
+            changed.setdefault(status, []).append(row["id"])
+
+    for status, ids in changed.items() if persist else ():
+        # Only while still true: a review that moved `next_review_at` since the
+        # rows were read must not get its status overwritten.
+        if status == RevisionStatus.COMPLETED:
+            still = {"next_review_at": None}
+        elif status == RevisionStatus.SCHEDULED:
+            still = {"next_review_at__gt": now}
+        else:
+            still = {"next_review_at__lte": now}
+        with serialized_writes():
+            RevisionSchedule.objects.filter(id__in=ids, **still).update(status=status, updated_at=now)
+    return rows
+
+
+@dataclass
+class StatusSweepResult:
+    updated: Counter = field(default_factory=Counter)
+    batches: int = 0
+
+
+def sweep_schedule_statuses(*, batch_size: int = 1000, now=None) -> StatusSweepResult:
+    """
+    Bring every user's stored statuses up to date with time (what reads do
+    for one user with `sync_schedule_rows`), for the periodic
+    `tracking.sync_revision_statuses` job. One UPDATE of at most
+    `batch_size` rows per transaction.
+    """
 
-    return schedule
+    now = now or timezone.now()
+    # `schedule_status` compares `next_review_at.date()` with `now.date()`.
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    pending = RevisionSchedule.objects.filter(status__in=PENDING_STATUSES)
+    stale_by_status = {
+        RevisionStatus.COMPLETED: pending.filter(next_review_at__isnull=True),
+        RevisionStatus.EXPIRED: pending.filter(next_review_at__lt=start_of_day),
+        RevisionStatus.DUE: pending.filter(next_review_at__gte=start_of_day, next_review_at__lte=now),
+        RevisionStatus.SCHEDULED: pending.filter(next_review_at__gt=now),
+    }
+
+    result = StatusSweepResult()
+    for status, stale in stale_by_status.items():
+        stale = stale.exclude(status=status)
+        while True:
+            # The conditions are repeated outside the LIMITed subquery, so a
+            # row a review changed meanwhile is left alone.
+            batch = stale.filter(pk__in=stale.order_by().values("pk")[:batch_size])
+            with serialized_writes(), transaction.atomic():
+                count = batch.update(status=status, updated_at=now)
+            if count:
+                result.updated[status] += count
+                result.batches += 1
+            if count < batch_size:
+                break
+    return result
+
+
+class ScheduleConflict(Exception):
+    """A conditional schedule write kept losing races, or the expected version was stale."""
+
+    def __init__(self, schedule: RevisionSchedule):
+        super().__init__(f"Revision schedule {schedule.pk} changed concurrently (version {schedule.version})")
+        self.schedule = schedule
+
+
+# Schedules are written with `UPDATE ... WHERE version = <read version>`
+# instead of row locks: a write that finds the version moved re-reads the row
+# and re-applies its change, at most WRITE_ATTEMPTS times.
+WRITE_ATTEMPTS = 4
+WRITE_BACKOFF_SECONDS = 0.002
+
+
+def save_if_unchanged(schedule: RevisionSchedule, fields, now=None) -> bool:
+    """
+    Write `fields` and bump `version` only if the row still has the version
+    `schedule` was read at. Returns whether the write happened.
+    """
 
+    now = now or timezone.now()
+    values = {name: getattr(schedule, name) for name in fields}
+    updated = RevisionSchedule.objects.filter(pk=schedule.pk, version=schedule.version).update(
+        **values, version=F("version") + 1, updated_at=now
+    )
+    if updated:
+        schedule.version += 1
+        schedule.updated_at = now
+    return bool(updated)
 
+
+def write_with_retry(schedule: RevisionSchedule, change, *, expected_version=None, now=None) -> RevisionSchedule:
+    """
+    Apply `change(schedule) -> fields` and save it conditionally, re-reading
+    and re-applying after a lost race. With `expected_version` (the version
+    the client acted on), a stale schedule is a conflict rather than retried.
+    Raises `ScheduleConflict`.
+    """
+
+    for attempt in range(WRITE_ATTEMPTS):
+        if expected_version is not None and schedule.version != expected_version:
+            raise ScheduleConflict(schedule)
+        if save_if_unchanged(schedule, change(schedule), now=now):
+            return schedule
+        # The first retry is immediate: the winner has committed, so the
+        # re-read is fresh (and, with serialized SQLite writes, final).
+        if 0 < attempt < WRITE_ATTEMPTS - 1:
+            time.sleep(random.uniform(0, WRITE_BACKOFF_SECONDS * 2**attempt))
+        schedule.refresh_from_db()
+    raise ScheduleConflict(schedule)
+
+
+@serialize_writes
 def create_or_reset_schedule(*, schedule: RevisionSchedule | None, user, lesson, completed_at=None) -> RevisionSchedule:
+    from .card_srs import lesson_card_ids, reset_card_states  # card_srs builds on this module
+
     completed_at = completed_at or timezone.now()
+    card_ids = lesson_card_ids([lesson.pk])[lesson.pk]
+
+    def reset(schedule: RevisionSchedule) -> list[str]:
+        schedule.lesson_completed_at = completed_at
+        schedule.stage = 0
+        schedule.last_reviewed_at = None
+        schedule.next_review_at = completed_at + SRS_INTERVALS[0]
+        schedule.status = RevisionStatus.SCHEDULED
+        reset_card_states(schedule, card_ids, due_at=schedule.next_review_at)
+        return [
+            "lesson_completed_at",
+            "stage",
+            "last_reviewed_at",
+            "next_review_at",
+            "status",
+            "card_states",
+            "cards_next_due_at",
+        ]
 
     if schedule is None:
-        schedule = RevisionSchedule(user=user, lesson=lesson, lesson_completed_at=completed_at)
-
-    schedule.lesson_completed_at = completed_at
-    schedule.stage = 0
-    schedule.last_reviewed_at = None
-    schedule.next_review_at = completed_at + SRS_INTERVALS[0]
-    schedule.status = RevisionStatus.SCHEDULED
-    schedule.save(update_fields=["lesson_completed_at", "stage", "last_reviewed_at", "next_review_at", "status", "updated_at"])
-    return schedule
+        schedule = RevisionSchedule(user=user, lesson=lesson)
+        reset(schedule)
+        try:
+            with transaction.atomic():
+                schedule.save(force_insert=True)
+            return schedule
+        except IntegrityError:
+            # Completed concurrently (another device, a double tap): reset that one.
+            schedule = RevisionSchedule.objects.get(user=user, lesson=lesson)
 
+    return write_with_retry(schedule, reset, now=completed_at)
 
-def mark_reviewed(schedule: RevisionSchedule, reviewed_at=None) -> RevisionSchedule:
-    reviewed_at = reviewed_at or timezone.now()
 
-    schedule.last_reviewed_at = reviewed_at
+@serialize_writes
+def mark_reviewed(schedule: RevisionSchedule, reviewed_at=None, *, expected_version=None) -> RevisionSchedule:
+    """
+    Advance the schedule one stage (completing it after the last). Concurrent
+    reviews each count once; see `write_with_retry` for `expected_version`.
+    """
+
+    reviewed_at = reviewed_at or timezone.now()
 
-    if schedule.stage >= MAX_STAGE:
-        schedule.status = RevisionStatus.COMPLETED
-        schedule.next_review_at = None
-        schedule.save(update_fields=["last_reviewed_at", "status", "next_review_at", "updated_at"])
-        return schedule
+    def review(schedule: RevisionSchedule) -> list[str]:
+        schedule.last_reviewed_at = reviewed_at
+        if schedule.stage >= MAX_STAGE:
+            schedule.status = RevisionStatus.COMPLETED
+            schedule.next_review_at = None
+            return ["last_reviewed_at", "status", "next_review_at"]
 
-    schedule.stage += 1
-    schedule.next_review_at = reviewed_at + SRS_INTERVALS[schedule.stage]
-    schedule.status = RevisionStatus.SCHEDULED
-    schedule.save(update_fields=["last_reviewed_at", "stage", "next_review_at", "status", "updated_at"])
-    return schedule
+        schedule.stage += 1
+        schedule.next_review_at = reviewed_at + SRS_INTERVALS[schedule.stage]
+        schedule.status = RevisionStatus.SCHEDULED
+        return ["last_reviewed_at", "stage", "next_review_at", "status"]
 
+    return write_with_retry(schedule, review, expected_version=expected_version, now=reviewed_at)
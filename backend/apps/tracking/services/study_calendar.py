@@ -0,0 +1,205 @@
+"""
+Per-day study activity for the heatmap and streaks, maintained incrementally.
+
+Each user has one `StudyYear` row per calendar year holding the active
+seconds of every day packed as 366 little-endian uint32s, and one
+`StudyStreak` row. Pings and heartbeat flushes add their seconds to today's
+slot (`record_study_day`); the day a slot first reaches
+`TRACKING_STREAK_MIN_SECONDS` also extends the streak. Reading a year of
+heatmap is then one query for at most two rows, and the streak one query for
+one row, whatever the number of sessions.
+
+Days are calendar days in `TIME_ZONE`. Incremental updates attribute time to
+the day it was reported; `rebuild_study_calendar` (used to backfill) can
+only attribute a session's time to the day it started.
+"""
+
+from __future__ import annotations
+
+import struct
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from config.db_router import read_alias
+from config.sqlite import serialize_writes
+
+from ..models import StudyDayAggregate, StudySession, StudyStreak, StudyYear
+
+
+DAYS_PER_YEAR = 366
+_SLOT = struct.Struct("<I")
+_MAX_SECONDS = 2**32 - 1
+EMPTY_YEAR = bytes(DAYS_PER_YEAR * _SLOT.size)
+
+
+def _slot(day: date) -> int:
+    return (day.timetuple().tm_yday - 1) * _SLOT.size
+
+
+def _unpack(blob, first: date, last: date) -> tuple[int, ...]:
+    """Seconds for `first`..`last` (same year) from a packed year."""
+    count = (last - first).days + 1
+    return struct.unpack_from(f"<{count}I", blob, _slot(first))
+
+
+def _extend_streak(user_id, day: date) -> None:
+    streak, _ = StudyStreak.objects.select_for_update().get_or_create(user_id=user_id)
+    last = streak.last_active_day
+    if last is not None and last >= day:
+        return
+    streak.current_days = streak.current_days + 1 if last == day - timedelta(days=1) else 1
+    streak.longest_days = max(streak.longest_days, streak.current_days)
+    streak.last_active_day = day
+    streak.save(update_fields=["current_days", "longest_days", "last_active_day"])
+
+
+@serialize_writes
+def record_study_day(*, user_id, seconds: int, now=None) -> None:
+    """
+    Add `seconds` of active study to today's slot and, when today just became
+    an active day, extend the streak.
+    """
+
+    if seconds <= 0:
+        return
+
+    day = timezone.localdate(now or timezone.now())
+    years = StudyYear.objects.filter(user_id=user_id, year=day.year)
+    # No savepoint when nested: a failure rolls back the caller's write too (`record_ping`).
+    with transaction.atomic(savepoint=False):
+        # Write before reading: the no-op UPDATE takes the row lock (the
+        # database write lock on SQLite, where a read-then-write transaction
+        # fails instead of waiting when another writer got there first).
+        if not years.update(year=day.year):
+            StudyYear.objects.get_or_create(user_id=user_id, year=day.year, defaults={"day_seconds": EMPTY_YEAR})
+        year = years.select_for_update().get()
+        blob = bytearray(year.day_seconds)
+        offset = _slot(day)
+        (before,) = _SLOT.unpack_from(blob, offset)
+        after = min(before + seconds, _MAX_SECONDS)
+        _SLOT.pack_into(blob, offset, after)
+        StudyYear.objects.filter(pk=year.pk).update(day_seconds=bytes(blob))
+
+        if before < settings.TRACKING_STREAK_MIN_SECONDS <= after:
+            _extend_streak(user_id, day)
+
+
+def study_heatmap(*, user, days: int = 365, now=None) -> dict:
+    """
+    Active seconds for each of the last `days` days (oldest first, ending
+    today), read from at most two `StudyYear` rows.
+    """
+
+    end = timezone.localdate(now or timezone.now())
+    start = end - timedelta(days=days - 1)
+    blobs = dict(
+        StudyYear.objects.using(read_alias())
+        .filter(user=user, year__gte=start.year, year__lte=end.year)
+        .values_list("year", "day_seconds")
+    )
+
+    seconds: list[int] = []
+    for year in range(start.year, end.year + 1):
+        first = max(start, date(year, 1, 1))
+        last = min(end, date(year, 12, 31))
+        blob = blobs.get(year)
+        if blob is None:
+            seconds.extend([0] * ((last - first).days + 1))
+        else:
+            seconds.extend(_unpack(blob, first, last))
+
+    threshold = settings.TRACKING_STREAK_MIN_SECONDS
+    return {
+        "start": start,
+        "end": end,
+        "seconds": seconds,
+        "total_seconds": sum(seconds),
+        "active_days": sum(1 for value in seconds if value >= threshold),
+    }
+
+
+def study_streak(*, user, now=None) -> dict:
+    """
+    Current and longest streak. The current streak survives until the end of
+    the day after the last active one, then reads as 0.
+    """
+
+    today = timezone.localdate(now or timezone.now())
+    row = (
+        StudyStreak.objects.using(read_alias())
+        .filter(user=user)
+        .values_list("current_days", "longest_days", "last_active_day")
+        .first()
+    )
+    current, longest, last = row or (0, 0, None)
+    if last is None or last < today - timedelta(days=1):
+        current = 0
+    return {
+        "current_days": current,
+        "longest_days": longest,
+        "last_active_day": last,
+        "active_today": last == today,
+    }
+
+
+def _day_totals(user_ids) -> dict[int, dict[date, int]]:
+    totals: dict[int, dict[date, int]] = defaultdict(lambda: defaultdict(int))
+    sessions = StudySession.objects.filter(user_id__in=user_ids).values_list("user_id", "started_at", "duration_seconds")
+    for user_id, started_at, seconds in sessions.iterator(chunk_size=2000):
+        totals[user_id][timezone.localtime(started_at).date()] += seconds
+    aggregates = StudyDayAggregate.objects.filter(user_id__in=user_ids).values_list("user_id", "day", "duration_seconds")
+    for user_id, day, seconds in aggregates.iterator(chunk_size=2000):
+        totals[user_id][day] += seconds
+    return totals
+
+
+def _streak_from_days(days: dict[date, int]) -> StudyStreak:
+    threshold = settings.TRACKING_STREAK_MIN_SECONDS
+    streak = StudyStreak()
+    for day in sorted(day for day, seconds in days.items() if seconds >= threshold):
+        last = streak.last_active_day
+        streak.current_days = streak.current_days + 1 if last == day - timedelta(days=1) else 1
+        streak.longest_days = max(streak.longest_days, streak.current_days)
+        streak.last_active_day = day
+    return streak
+
+
+def rebuild_study_calendar(*, user_ids=None, batch_size: int = 500) -> int:
+    """
+    Recompute `StudyYear` and `StudyStreak` from sessions and day aggregates
+    (all users, or `user_ids`), one transaction per batch of users. Returns
+    the number of users rebuilt.
+    """
+
+    if user_ids is None:
+        user_ids = sorted(
+            set(StudySession.objects.values_list("user_id", flat=True).distinct())
+            | set(StudyDayAggregate.objects.values_list("user_id", flat=True).distinct())
+        )
+    user_ids = list(user_ids)
+
+    for index in range(0, len(user_ids), batch_size):
+        batch = user_ids[index : index + batch_size]
+        totals = _day_totals(batch)
+        years, streaks = [], []
+        for user_id, days in totals.items():
+            blobs: dict[int, bytearray] = {}
+            for day, seconds in days.items():
+                blob = blobs.setdefault(day.year, bytearray(EMPTY_YEAR))
+                _SLOT.pack_into(blob, _slot(day), min(seconds, _MAX_SECONDS))
+            years.extend(StudyYear(user_id=user_id, year=year, day_seconds=bytes(blob)) for year, blob in blobs.items())
+            streak = _streak_from_days(days)
+            streak.user_id = user_id
+            streaks.append(streak)
+
+        with transaction.atomic():
+            StudyYear.objects.filter(user_id__in=batch).delete()
+            StudyStreak.objects.filter(user_id__in=batch).delete()
+            StudyYear.objects.bulk_create(years, batch_size=500)
+            StudyStreak.objects.bulk_create(streaks, batch_size=500)
+
+    return len(user_ids)
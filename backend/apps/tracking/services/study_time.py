@@ -1,11 +1,31 @@
 from __future__ import annotations
 
 from datetime import timedelta
+from typing import NamedTuple
 
-from django.db.models import Sum
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from ..models import StudySession
+from config.db_router import read_alias
+from config.sqlite import serialized_writes
+
+from ..models import StudyDayAggregate, StudySession
+from .study_calendar import record_study_day
+
+
+# How long a session's last applied ping `seq` is remembered in the cache.
+PING_SEQ_CACHE_TIMEOUT = 6 * 60 * 60
+
+
+class PingResult(NamedTuple):
+    duration_seconds: int
+    applied: bool
 
 
 def get_study_seconds_summary(*, user, now=None) -> dict[str, int]:
@@ -13,28 +33,168 @@ def get_study_seconds_summary(*, user, now=None) -> dict[str, int]:
     Returns a summary of study time:
     - today_seconds: summed duration for sessions started today
     - week_seconds: last 7 days (rolling window)
-    - total_seconds: all-time
+    - total_seconds: all-time, including sessions compacted into `StudyDayAggregate`
+
+    Served from the read replica unless the user wrote recently.
     """
 
     now = now or timezone.now()
     today = now.date()
     week_start = now - timedelta(days=7)
+    sessions = StudySession.objects.using(read_alias())
 
     today_seconds = (
-        StudySession.objects.filter(user=user, started_at__date=today).aggregate(total=Sum("duration_seconds"))["total"]
+        sessions.filter(user=user, started_at__date=today).aggregate(total=Sum("duration_seconds"))["total"]
         or 0
     )
     week_seconds = (
-        StudySession.objects.filter(user=user, started_at__gte=week_start).aggregate(total=Sum("duration_seconds"))["total"]
+        sessions.filter(user=user, started_at__gte=week_start).aggregate(total=Sum("duration_seconds"))["total"]
         or 0
     )
     total_seconds = (
-        StudySession.objects.filter(user=user).aggregate(total=Sum("duration_seconds"))["total"] or 0
+        sessions.filter(user=user).aggregate(total=Sum("duration_seconds"))["total"] or 0
+    )
+    archived_seconds = (
+        StudyDayAggregate.objects.using(read_alias())
+        .filter(user=user)
+        .aggregate(total=Sum("duration_seconds"))["total"]
+        or 0
     )
 
     return {
         "today_seconds": int(today_seconds),
         "week_seconds": int(week_seconds),
-        "total_seconds": int(total_seconds),
+        "total_seconds": int(total_seconds) + int(archived_seconds),
     }
 
+
+def _ping_seq_cache_key(user_id, session_id) -> str:
+    # Per user, so a cache hit never answers for someone else's session.
+    return f"tracking:ping-seq:{user_id}:{session_id}"
+
+
+def _active_user():
+    # Deactivated accounts (awaiting their purge) stop accruing time, whatever their token says.
+    return Exists(get_user_model().objects.filter(pk=OuterRef("user_id"), is_active=True))
+
+
+def _ping_update(*, user_id, session_id, active_seconds: int, seq: int | None, now):
+    """
+    Returns `(sessions, conditional, updates)` for a ping: `conditional` only
+    matches when the ping has not been applied yet.
+    """
+
+    sessions = StudySession.objects.filter(id=session_id, user_id=user_id)
+    conditional = sessions.filter(_active_user(), is_active=True)
+    updates = {
+        "duration_seconds": F("duration_seconds") + active_seconds,
+        "last_ping_at": now,
+        "updated_at": now,
+    }
+    if seq is not None:
+        conditional = conditional.filter(last_ping_seq__lt=seq)
+        updates["last_ping_seq"] = seq
+    return sessions, conditional, updates
+
+
+def _ping_result(row, applied: bool) -> PingResult | None:
+    if row is None:
+        return None
+    duration_seconds, _, is_active = row
+    if not applied and not is_active:
+        return None
+    return PingResult(duration_seconds=duration_seconds, applied=applied)
+
+
+def _apply_ping(*, user_id, session_id, active_seconds: int, seq: int | None, now):
+    """
+    The ping's writes and read-back behind the SQLite write lock, as
+    `(row, applied)`. The session and the calendar are updated in one transaction, so a failed
+    ping changes neither and its retry (same `seq`) is applied in full.
+    """
+
+    sessions, conditional, updates = _ping_update(
+        user_id=user_id, session_id=session_id, active_seconds=active_seconds, seq=seq, now=now
+    )
+    with serialized_writes(), transaction.atomic():
+        applied = bool(conditional.update(**updates))
+        if applied:
+            record_study_day(user_id=user_id, seconds=active_seconds, now=now)
+        row = sessions.values_list("duration_seconds", "last_ping_seq", "is_active").first()
+    return row, applied
+
+
+def record_ping(*, user_id, session_id, active_seconds: int, seq: int | None = None, now=None) -> PingResult | None:
+    """
+    Add `active_seconds` to an active session in one conditional UPDATE, and
+    to the user's study calendar when applied.
+
+    With a client `seq`, retries are idempotent: a ping whose `seq` is not
+    greater than the last applied one is rejected from the cache without
+    touching the database (cached per user and session), and otherwise by
+    the `last_ping_seq < seq` guard.
+    Returns None when the session does not exist, is not the user's, or has
+    been stopped.
+    """
+
+    if seq is not None:
+        cached = cache.get(_ping_seq_cache_key(user_id, session_id))
+        if cached is not None and cached[0] >= seq:
+            return PingResult(duration_seconds=cached[1], applied=False)
+
+    row, applied = _apply_ping(
+        user_id=user_id, session_id=session_id, active_seconds=active_seconds, seq=seq, now=now or timezone.now()
+    )
+
+    if seq is not None and row is not None:
+        cache.set(_ping_seq_cache_key(user_id, session_id), (row[1], row[0]), PING_SEQ_CACHE_TIMEOUT)
+    return _ping_result(row, applied)
+
+
+def add_active_seconds(*, user_id, session_id, seconds: int, now=None) -> int | None:
+    """
+    Add `seconds` to a session and the study calendar without ping
+    bookkeeping (heartbeat flushes). Returns the new duration, or None when
+    the session does not exist, is not the user's, has been stopped or closed
+    as stale, or the user is inactive.
+    """
+
+    now = now or timezone.now()
+    sessions = StudySession.objects.filter(id=session_id, user_id=user_id)
+    with serialized_writes(), transaction.atomic():
+        updated = sessions.filter(_active_user(), is_active=True).update(
+            duration_seconds=F("duration_seconds") + seconds, last_ping_at=now, updated_at=now
+        )
+        if not updated:
+            return None
+        record_study_day(user_id=user_id, seconds=seconds, now=now)
+        return sessions.values_list("duration_seconds", flat=True).first()
+
+
+aadd_active_seconds = sync_to_async(add_active_seconds)
+
+
+def close_stale_sessions(*, idle_seconds: int | None = None, batch_size: int = 1000, now=None) -> int:
+    """
+    Close sessions that were never stopped (tab closed, tracker gone) once
+    they have had no ping for `idle_seconds` (default
+    `settings.TRACKING_STALE_SESSION_SECONDS`). They end at their last ping,
+    and compaction can then archive them. Returns how many were closed.
+    """
+
+    now = now or timezone.now()
+    idle = settings.TRACKING_STALE_SESSION_SECONDS if idle_seconds is None else idle_seconds
+    cutoff = now - timedelta(seconds=idle)
+    stale = StudySession.objects.filter(
+        Q(last_ping_at__lt=cutoff) | Q(last_ping_at__isnull=True, started_at__lt=cutoff),
+        is_active=True,
+    )
+    closed = 0
+    while True:
+        with serialized_writes():
+            count = stale.filter(pk__in=stale.order_by().values("pk")[:batch_size]).update(
+                is_active=False, ended_at=Coalesce("last_ping_at", "started_at"), updated_at=now
+            )
+        closed += count
+        if count < batch_size:
+            return closed
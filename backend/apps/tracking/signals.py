@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.learning.models import ContentKind, LessonCard
+from apps.learning.services.content_sync import content_published
+
+from .models import RevisionSchedule, RevisionStatus
+from .services.card_srs import CardStates
+
+
+@receiver(content_published)
+def schedule_added_cards(sender, changes, using, **kwargs):
+    """
+    Cards added to a lesson are due now for everyone revising it. Their
+    states are added when the schedule is next read (`due_cards` aligns it),
+    but `due_cards` only reads schedules with a due card: bring these forward.
+    """
+
+    card_ids = [object_id for kind, object_id in changes if kind == ContentKind.CARD]
+    if not card_ids:
+        return
+    cards = LessonCard.objects.using(using).filter(id__in=card_ids).values_list("lesson_id", "id")
+    added: dict = {}
+    for lesson_id, card_id in cards:
+        added.setdefault(lesson_id, set()).add(card_id.bytes)
+    if not added:
+        return
+
+    now = timezone.now()
+    schedules = (
+        RevisionSchedule.objects.using(using)
+        .filter(lesson_id__in=list(added))
+        .exclude(status=RevisionStatus.COMPLETED)
+        .exclude(cards_next_due_at__lte=now)
+        .values_list("id", "lesson_id", "card_states")
+    )
+    stale = [
+        schedule_id
+        for schedule_id, lesson_id, blob in schedules.iterator(chunk_size=1000)
+        if not added[lesson_id] <= set(CardStates.decode(blob).ids)
+    ]
+    if stale:
+        # Still inside `publish()`, which holds the SQLite write lock.
+        RevisionSchedule.objects.using(using).filter(id__in=stale).update(cards_next_due_at=now)
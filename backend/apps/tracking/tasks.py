@@ -0,0 +1,24 @@
+"""Tracking maintenance run by the job worker (scheduled in `settings.JOBS_SCHEDULE`)."""
+
+from __future__ import annotations
+
+from apps.jobs.registry import task
+
+from .services.compaction import compact_study_sessions as compact
+from .services.spaced_repetition import sweep_schedule_statuses
+from .services.study_time import close_stale_sessions as close_stale
+
+
+@task("tracking.sync_revision_statuses")
+def sync_revision_statuses(batch_size: int = 1000):
+    return sweep_schedule_statuses(batch_size=batch_size)
+
+
+@task("tracking.close_stale_sessions")
+def close_stale_sessions(batch_size: int = 1000) -> dict:
+    return {"closed": close_stale(batch_size=batch_size)}
+
+
+@task("tracking.compact_study_sessions", max_attempts=2, lease_seconds=3 * 3600)
+def compact_study_sessions(older_than_days: int = 30, batch_size: int = 1000):
+    return compact(older_than_days=older_than_days, batch_size=batch_size)
@@ -1,3 +1,859 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import shutil
+import tempfile
+import uuid
+from datetime import UTC, datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import ThreadSensitiveContext, async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework import renderers
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.core.renderers import JSONRenderer
+from apps.core.row_serializers import RowSerializer
+from apps.core.testing import QueryBudgetMixin
+from config import db_router
+from apps.jobs.models import Job
+from apps.jobs.services.queue import enqueue
+from apps.jobs.services.worker import Worker
+from apps.learning.models import Course, Lesson, LessonCard
+from apps.learning.services.content_sync import VERSION_CACHE_KEY
+from apps.learning.services.lesson_registry import lesson_registry
+
+from . import async_views, heartbeat
+from .heartbeat import (
+    CLOSE_NOT_FOUND,
+    CLOSE_RATE_LIMITED,
+    CLOSE_UNAUTHORIZED,
+    HeartbeatRouter,
+    HeartbeatState,
+)
+from .models import RevisionSchedule, RevisionStatus, StudySession, StudyStreak, StudyYear
+from .serializers import (
+    LESSON_MINI_ROWS,
+    STUDY_SESSION_ROWS,
+    RevisionScheduleSerializer,
+    StudySessionSerializer,
+)
+from .services import card_srs
+from .services.card_srs import CardStates, to_minutes
+from .services.compaction import compact_study_sessions
+from .services.spaced_repetition import (
+    create_or_reset_schedule,
+    mark_reviewed,
+    schedule_status,
+    sweep_schedule_statuses,
+)
+from .services.study_calendar import rebuild_study_calendar, record_study_day, study_heatmap, study_streak
+from .services.study_time import close_stale_sessions, record_ping
+
+
+class TrackingTestCase(QueryBudgetMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email="learner@example.com", password="x" * 12)
+        cls.course = Course.objects.create(title="English", slug="english")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.now = timezone.now()
+
+    def add_lesson(self, index: int, cards: int = 3) -> Lesson:
+        lesson = Lesson.objects.create(course=self.course, title=f"Lesson {index}", slug=f"lesson-{index}", order=index)
+        LessonCard.objects.bulk_create(
+            LessonCard(lesson=lesson, order=j, english=f"word {index} {j}", uzbek=f"so‘z {j}") for j in range(cards)
+        )
+        return lesson
+
+    def add_history(self, size: int) -> None:
+        """Up to `size` lessons with a revision schedule each (mixed statuses), and `size` study sessions."""
+        for i in range(RevisionSchedule.objects.filter(user=self.user).count(), size):
+            lesson = self.add_lesson(i)
+            due_at = self.now + timedelta(days=(i % 5) - 3)
+            completed = i % 7 == 6
+            card_ids = list(lesson.cards.values_list("id", flat=True))
+            states = CardStates.new(card_ids, due_at=due_at)
+            RevisionSchedule.objects.create(
+                user=self.user,
+                lesson=lesson,
+                lesson_completed_at=self.now - timedelta(days=10),
+                stage=i % 5,
+                # Already in sync, so reads do not also write statuses.
+                status=RevisionStatus.COMPLETED if completed else schedule_status("scheduled", due_at, self.now),
+                next_review_at=None if completed else due_at,
+                card_states=states.encode(),
+                cards_next_due_at=states.next_due_at(),
+            )
+        for i in range(StudySession.objects.filter(user=self.user).count(), size):
+            StudySession.objects.create(
+                user=self.user, is_active=False, duration_seconds=60 * (i + 1), last_ping_at=self.now
+            )
+            record_study_day(user_id=self.user.pk, seconds=60 * (i + 1), now=self.now - timedelta(days=i))
+
+
+class TrackingQueryBudgetTests(TrackingTestCase):
+    # Lesson fields come from the in-process registry, loaded by the warm-up call.
+    def test_dashboard(self):
+        self.assertQueryBudget(6, lambda: self.client.get("/api/dashboard/"), grow=self.add_history, warm_up=True)
+
+    def test_revisions_due(self):
+        self.assertQueryBudget(2, lambda: self.client.get("/api/revisions/due/"), grow=self.add_history, warm_up=True)
+
+    def test_revision_session(self):
+        self.assertQueryBudget(4, lambda: self.client.get("/api/revisions/session/"), grow=self.add_history)
+
+    def test_due_cards(self):
+        self.assertQueryBudget(2, lambda: self.client.get("/api/revisions/cards/due/"), grow=self.add_history)
+
+    def test_card_review(self):
+        lesson = self.add_lesson(0, cards=0)
+        schedule = RevisionSchedule.objects.create(
+            user=self.user, lesson=lesson, lesson_completed_at=self.now, next_review_at=self.now
+        )
+        payload = {}
+
+        def grow(size: int) -> None:
+            LessonCard.objects.bulk_create(
+                LessonCard(lesson=lesson, order=j, english=f"card {j}", uzbek="so‘z")
+                for j in range(lesson.cards.count(), size)
+            )
+            card_ids = list(lesson.cards.values_list("id", flat=True))
+            states = CardStates.new(card_ids, due_at=self.now)
+            RevisionSchedule.objects.filter(pk=schedule.pk).update(card_states=states.encode())
+            payload["results"] = [{"card_id": str(card_id), "correct": True} for card_id in card_ids]
+
+        self.assertQueryBudget(
+            4, lambda: self.client.post("/api/revisions/cards/review/", payload, format="json"), grow=grow
+        )
+
+    def test_revision_review(self):
+        self.add_history(3)
+        schedule = RevisionSchedule.objects.filter(user=self.user).exclude(status=RevisionStatus.COMPLETED).first()
+        self.assertQueryBudget(3, lambda: self.client.post(f"/api/revisions/{schedule.pk}/review/"), warm_up=True)
+
+    def test_lesson_complete(self):
+        lessons = []
+
+        def grow(size: int) -> None:
+            self.add_history(size)
+            lessons.append(self.add_lesson(1000 + size))
+
+        self.assertQueryBudget(6, lambda: self.client.post(f"/api/lessons/{lessons[-1].slug}/complete/"), grow=grow)
+
+    def test_study_session_start(self):
+        payload = {"context": "lesson-0"}
+        self.assertQueryBudget(
+            1, lambda: self.client.post("/api/study-sessions/start/", payload, format="json"), grow=self.add_history
+        )
+
+    def test_study_session_ping(self):
+        self.add_history(1)
+        session = StudySession.objects.create(user=self.user, last_ping_at=self.now)
+        seq = iter(range(1, 100))
+
+        def ping():
+            payload = {"session_id": str(session.pk), "active_seconds": 5, "seq": next(seq)}
+            return self.client.post("/api/study-sessions/ping/", payload, format="json")
+
+        self.assertQueryBudget(7, ping, grow=self.add_history)
+
+    def test_study_session_stop(self):
+        sessions = []
+
+        def grow(size: int) -> None:
+            self.add_history(size)
+            sessions.append(StudySession.objects.create(user=self.user, last_ping_at=self.now))
+
+        self.assertQueryBudget(
+            2,
+            lambda: self.client.post("/api/study-sessions/stop/", {"session_id": str(sessions[-1].pk)}, format="json"),
+            grow=grow,
+        )
+
+    def test_study_heatmap(self):
+        self.assertQueryBudget(1, lambda: self.client.get("/api/study-calendar/heatmap/"), grow=self.add_history)
+
+    def test_study_streak(self):
+        self.assertQueryBudget(1, lambda: self.client.get("/api/study-calendar/streak/"), grow=self.add_history)
+
+
+class TrackingIndexUsageTests(TrackingTestCase):
+    """The hot tracking queries, as the views issue them, must use the indexes declared for them."""
+
+    def setUp(self):
+        super().setUp()
+        self.add_history(20)
+
+    def test_due_revisions_use_status_index(self):
+        for path in ("/api/revisions/due/", "/api/revisions/session/"):
+            with self.subTest(path=path):
+                _, queries = self.capture_queries(lambda: self.client.get(path))
+                sql = self.find_query(queries, RevisionSchedule._meta.db_table)
+                self.assertUsesIndex(sql, RevisionSchedule, ["user", "status", "next_review_at"])
+
+    def test_schedule_reads_skip_the_lesson_join(self):
+        for path in ("/api/revisions/due/", "/api/dashboard/"):
+            with self.subTest(path=path):
+                _, queries = self.capture_queries(lambda: self.client.get(path))
+                sql = self.find_query(queries, RevisionSchedule._meta.db_table)
+                self.assertNotIn(Lesson._meta.db_table, sql)
+
+    def test_schedules_of_unknown_lessons_render_a_null_lesson(self):
+        rows = RowSerializer(
+            RevisionScheduleSerializer, nested={"lesson": LESSON_MINI_ROWS}, in_memory={"lesson": lambda ids: {}}
+        )
+        data = rows.many(rows.values(RevisionSchedule.objects.filter(user=self.user)))
+        self.assertTrue(data)
+        self.assertEqual({schedule["lesson"] for schedule in data}, {None})
+
+    def test_lesson_edits_reach_schedule_reads(self):
+        self.client.get("/api/revisions/due/")
+        lesson = Lesson.objects.get(slug="lesson-0")
+        lesson.title = "Renamed"
+        # The committed content version invalidates the registry.
+        self.addCleanup(cache.delete, VERSION_CACHE_KEY)
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson.save()
+
+        queue = self.client.get("/api/dashboard/").json()["revision_queue"]
+        self.assertIn("Renamed", [schedule["lesson"]["title"] for schedule in queue])
+
+    def test_due_cards_use_card_due_index(self):
+        _, queries = self.capture_queries(lambda: self.client.get("/api/revisions/cards/due/"))
+        sql = self.find_query(queries, RevisionSchedule._meta.db_table)
+        self.assertUsesIndex(sql, RevisionSchedule, ["user", "cards_next_due_at"])
+
+    def test_dashboard_week_uses_started_at_index(self):
+        _, queries = self.capture_queries(lambda: self.client.get("/api/dashboard/"))
+        sql = self.find_query(queries, StudySession._meta.db_table, contains='"started_at" >=')
+        self.assertUsesIndex(sql, StudySession, ["user", "started_at"])
+
+    def test_compaction_uses_closed_session_index(self):
+        self.add_history(3)
+        _, queries = self.capture_queries(lambda: compact_study_sessions(older_than_days=30))
+        sql = self.find_query(queries, StudySession._meta.db_table)
+        self.assertUsesIndex(sql, StudySession, ["started_at", "id"])
+
+
+class RowSerializerParityTests(TrackingTestCase):
+    """The `.values()` row serializers render the same bytes as the DRF serializers they wrap."""
+
+    renderers = (JSONRenderer(), renderers.JSONRenderer())
+
+    def assertSameBytes(self, drf_data, row_data):
+        for renderer in self.renderers:
+            with self.subTest(renderer=type(renderer).__module__):
+                self.assertEqual(renderer.render(row_data), renderer.render(drf_data))
+
+    def test_revision_schedules(self):
+        covered, plain, missing = (self.add_lesson(i, cards=0) for i in range(3))
+        Lesson.objects.filter(pk=covered.pk).update(
+            cover_image_path="/picture/o‘zbek.png",
+            cover_image_variants={"width": 160, "height": 90, "variants": {"jpeg": [[160, "o‘zbek.jpg"]]}},
+        )
+        at = datetime(2026, 3, 4, 5, 6, 7, 891234, tzinfo=UTC)
+        for lesson, last_reviewed_at in ((covered, at), (plain, None), (missing, at)):
+            RevisionSchedule.objects.create(
+                user=self.user,
+                lesson=lesson,
+                lesson_completed_at=at,
+                next_review_at=at + timedelta(days=1),
+                last_reviewed_at=last_reviewed_at,
+            )
+        schedules = RevisionSchedule.objects.filter(user=self.user).order_by("lesson__order")
+        context = {"request": APIRequestFactory().get("/api/dashboard/")}
+
+        instances = list(schedules.select_related("lesson"))
+        # A lesson the registry does not have renders as null.
+        instances[-1].lesson = None
+        drf_data = RevisionScheduleSerializer(instances, many=True, context=context).data
+
+        def load(ids):
+            return {pk: lesson for pk, lesson in lesson_registry.get_many(ids).items() if pk != missing.pk}
+
+        rows = RowSerializer(
+            RevisionScheduleSerializer, nested={"lesson": LESSON_MINI_ROWS}, in_memory={"lesson": load}
+        )
+        row_data = rows.many(rows.values(schedules), context)
+
+        self.assertEqual(row_data[-1]["lesson"], None)
+        self.assertIsNotNone(row_data[0]["lesson"]["cover_images"])
+        self.assertSameBytes(drf_data, row_data)
+
+    def test_study_sessions(self):
+        at = datetime(2026, 3, 4, 5, 6, 7, 891234, tzinfo=UTC)
+        StudySession.objects.create(user=self.user, context="lesson", duration_seconds=90)
+        StudySession.objects.create(
+            user=self.user, context="o‘zbekcha", is_active=False, ended_at=at + timedelta(minutes=5)
+        )
+        sessions = StudySession.objects.filter(user=self.user).order_by("context")
+        # `started_at` is auto_now_add.
+        sessions.update(started_at=at)
+
+        drf_data = StudySessionSerializer(sessions, many=True).data
+        row_data = STUDY_SESSION_ROWS.many(STUDY_SESSION_ROWS.values(sessions))
+
+        self.assertSameBytes(drf_data, row_data)
+        self.assertEqual(STUDY_SESSION_ROWS.instance(sessions[0]), StudySessionSerializer(sessions[0]).data)
+
+
+class TrackingMaintenanceTests(TrackingTestCase):
+    def test_status_sweep_matches_schedule_status(self):
+        self.add_history(20)
+        # Stale statuses, as left by time passing.
+        RevisionSchedule.objects.update(status=RevisionStatus.SCHEDULED)
+        RevisionSchedule.objects.filter(next_review_at__isnull=True).update(status=RevisionStatus.DUE)
+
+        result = sweep_schedule_statuses(batch_size=3, now=self.now)
+
+        self.assertGreater(result.batches, 1)
+        for schedule in RevisionSchedule.objects.all():
+            self.assertEqual(schedule.status, schedule_status("scheduled", schedule.next_review_at, self.now))
+        self.assertEqual(sweep_schedule_statuses(now=self.now).updated, {})
+
+    def test_close_stale_sessions(self):
+        idle = StudySession.objects.create(user=self.user, last_ping_at=self.now - timedelta(hours=2))
+        live = StudySession.objects.create(user=self.user, last_ping_at=self.now - timedelta(minutes=5))
+
+        self.assertEqual(close_stale_sessions(idle_seconds=3600, now=self.now), 1)
+
+        idle.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual((idle.is_active, idle.ended_at), (False, idle.last_ping_at))
+        self.assertTrue(live.is_active)
+
+    def test_reads_skip_status_writes_when_the_sweep_runs(self):
+        self.add_history(5)
+        RevisionSchedule.objects.update(status=RevisionStatus.SCHEDULED)
+
+        with self.settings(TRACKING_SYNC_STATUSES_ON_READ=False):
+            _, queries = self.capture_queries(lambda: self.client.get("/api/dashboard/"))
+            response = self.client.get("/api/revisions/due/")
+
+        self.assertFalse([sql for sql in queries if sql.startswith("UPDATE")])
+        self.assertIn(RevisionStatus.EXPIRED, {row["status"] for row in response.data})
+        self.assertFalse(RevisionSchedule.objects.exclude(status=RevisionStatus.SCHEDULED).exists())
+
+    def test_review_digests_run_without_resource(self):
+        self.add_history(5)
+        out = io.StringIO()
+        # As on Windows, which has no `resource` module.
+        with mock.patch("apps.tracking.management.commands.send_review_digests.resource", None):
+            call_command("send_review_digests", dry_run=True, stdout=out)
+
+        summary = out.getvalue().splitlines()[-1]
+        self.assertIn("Built 1 digests", summary)
+        self.assertNotIn("peak RSS", summary)
+
+    @override_settings(JOBS_SCHEDULE={})
+    def test_maintenance_tasks_run_as_jobs(self):
+        for name in ("tracking.sync_revision_statuses", "tracking.close_stale_sessions"):
+            enqueue(name)
+        enqueue("tracking.compact_study_sessions", {"older_than_days": 30})
+
+        self.assertEqual(Worker(poll_seconds=0).run(once=True).succeeded, 3)
+        self.assertEqual(Job.objects.get(name="tracking.close_stale_sessions").result, {"closed": 0})
+
+
+class RevisionScheduleWriteTests(TrackingTestCase):
+    """Versioned schedule writes: stale clients, lost races and concurrent first completions."""
+
+    def add_schedule(self, lesson=None, **fields) -> RevisionSchedule:
+        lesson = lesson or self.add_lesson(0)
+        states = CardStates.new(list(lesson.cards.values_list("id", flat=True)), due_at=self.now)
+        return RevisionSchedule.objects.create(
+            user=self.user,
+            lesson=lesson,
+            lesson_completed_at=self.now,
+            next_review_at=self.now,
+            card_states=states.encode(),
+            cards_next_due_at=states.next_due_at(),
+            **fields,
+        )
+
+    def test_a_stale_version_is_a_conflict(self):
+        schedule = self.add_schedule()
+        self.client.post(f"/api/revisions/{schedule.pk}/review/", {"version": 0}, format="json")
+
+        # A second device still showing version 0.
+        response = self.client.post(f"/api/revisions/{schedule.pk}/review/", {"version": 0}, format="json")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["version"], 1)
+        schedule.refresh_from_db()
+        self.assertEqual((schedule.stage, schedule.version), (1, 1))
+
+    def test_a_lost_race_is_reapplied_to_a_fresh_read(self):
+        schedule = self.add_schedule()
+        stale = RevisionSchedule.objects.get(pk=schedule.pk)
+        # Another review lands between this one's read and its write.
+        mark_reviewed(RevisionSchedule.objects.get(pk=schedule.pk))
+
+        mark_reviewed(stale)
+
+        schedule.refresh_from_db()
+        self.assertEqual((schedule.stage, schedule.version), (2, 2))
+        self.assertEqual(stale.version, 2)
+
+    def test_a_concurrent_first_completion_resets_the_existing_schedule(self):
+        lesson = self.add_lesson(0)
+        existing = self.add_schedule(lesson, stage=3)
+
+        # The caller saw no schedule: another device completed the lesson first.
+        schedule = create_or_reset_schedule(schedule=None, user=self.user, lesson=lesson, completed_at=self.now)
+
+        self.assertEqual(schedule.pk, existing.pk)
+        existing.refresh_from_db()
+        self.assertEqual((existing.stage, existing.version), (0, 1))
+        self.assertEqual(RevisionSchedule.objects.filter(user=self.user, lesson=lesson).count(), 1)
+
+    @mock.patch("apps.tracking.services.card_srs.time.sleep")
+    def test_card_reviews_keep_the_schedules_that_were_written(self, _):
+        contended, calm = self.add_schedule(self.add_lesson(0)), self.add_schedule(self.add_lesson(1))
+        contended_cards = [str(card_id) for card_id in contended.lesson.cards.values_list("id", flat=True)]
+        calm_cards = [str(card_id) for card_id in calm.lesson.cards.values_list("id", flat=True)]
+        initial = {schedule.pk: bytes(schedule.card_states) for schedule in (contended, calm)}
+        save_card_states_if_unchanged = card_srs.save_card_states_if_unchanged
+
+        def save(schedule, read_states, now=None):
+            # Every write to `contended` loses its race.
+            return schedule.pk != contended.pk and save_card_states_if_unchanged(schedule, read_states, now=now)
+
+        payload = {"results": [{"card_id": card_id, "correct": True} for card_id in contended_cards + calm_cards]}
+        with mock.patch.object(card_srs, "save_card_states_if_unchanged", save):
+            response = self.client.post("/api/revisions/cards/review/", payload, format="json")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(sorted(map(str, response.data["conflicts"])), sorted(contended_cards))
+        self.assertEqual(response.data["updated"], len(calm_cards))
+        calm.refresh_from_db()
+        self.assertNotEqual(bytes(calm.card_states), initial[calm.pk])
+        contended.refresh_from_db()
+        self.assertEqual(bytes(contended.card_states), initial[contended.pk])
+
+    def test_card_reviews_leave_the_lesson_review_version_alone(self):
+        schedule = self.add_schedule()
+        cards = [str(card_id) for card_id in schedule.lesson.cards.values_list("id", flat=True)]
+        payload = {"results": [{"card_id": card_id, "correct": True} for card_id in cards]}
+        self.assertEqual(self.client.post("/api/revisions/cards/review/", payload, format="json").status_code, 200)
+
+        # The dashboard still holds version 0.
+        response = self.client.post(f"/api/revisions/{schedule.pk}/review/", {"version": 0}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        schedule.refresh_from_db()
+        self.assertEqual((schedule.stage, schedule.version), (1, 1))
+
+    def test_a_card_review_reapplies_after_a_concurrent_reset(self):
+        schedule = self.add_schedule()
+        card = schedule.lesson.cards.first()
+        stale = RevisionSchedule.objects.get(pk=schedule.pk)
+        # The lesson is completed again (a reset) between this review's read and its write.
+        create_or_reset_schedule(schedule=schedule, user=self.user, lesson=schedule.lesson, completed_at=self.now)
+
+        def review(schedule):
+            states = CardStates.decode(schedule.card_states)
+            states.review({card.id: True}, self.now)
+            schedule.card_states = states.encode()
+            schedule.cards_next_due_at = states.next_due_at()
+
+        card_srs.write_card_states_with_retry(stale, review, now=self.now)
+
+        schedule.refresh_from_db()
+        self.assertEqual(bytes(schedule.card_states), bytes(stale.card_states))
+        self.assertEqual(schedule.version, 1)
+
+
+class CardStatesTests(TrackingTestCase):
+    """The packed `card_states` codec, and keeping it in step with the lesson's cards."""
+
+    def test_round_trip(self):
+        card_ids = [uuid.uuid4() for _ in range(3)]
+        states = CardStates.new(card_ids, due_at=self.now)
+        states.review({card_ids[0]: True, card_ids[1]: False}, reviewed_at=self.now)
+
+        decoded = CardStates.decode(states.encode())
+
+        self.assertEqual(decoded.ids, [card_id.bytes for card_id in card_ids])
+        self.assertEqual(list(decoded.stages), [1, 0, 0])
+        self.assertEqual(list(decoded.due), list(states.due))
+        self.assertEqual(list(decoded.last), list(states.last))
+        self.assertEqual(decoded.encode(), states.encode())
+
+    def test_empty_blob(self):
+        for blob in (b"", CardStates.new([], due_at=self.now).encode()):
+            states = CardStates.decode(blob)
+            self.assertEqual(len(states), 0)
+            self.assertIsNone(states.next_due_at())
+
+    def test_decode_rejects_a_wrong_length(self):
+        blob = CardStates.new([uuid.uuid4(), uuid.uuid4()], due_at=self.now).encode()
+        for bad in (blob[:2], blob[:-1], blob + b"\0"):
+            with self.assertRaises(ValueError):
+                CardStates.decode(bad)
+
+    def test_align_with_added_and_removed_cards(self):
+        kept, removed, added = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        states = CardStates.new([kept, removed], due_at=self.now)
+        states.review({kept: True}, reviewed_at=self.now)
+        later = self.now + timedelta(days=1)
+
+        self.assertTrue(states.align([kept, added], due_at=later))
+
+        self.assertEqual(states.ids, [kept.bytes, added.bytes])
+        self.assertEqual(list(states.stages), [1, 0])
+        self.assertEqual(states.due[1], to_minutes(later))
+        self.assertEqual(states.position(added), 1)
+        self.assertIsNone(states.position(removed))
+        self.assertFalse(states.align([kept, added], due_at=later))
+
+    def test_added_cards_are_due_now(self):
+        lesson = self.add_lesson(0, cards=2)
+        states = CardStates.new(list(lesson.cards.values_list("id", flat=True)), due_at=self.now + timedelta(days=3))
+        RevisionSchedule.objects.create(
+            user=self.user,
+            lesson=lesson,
+            lesson_completed_at=self.now,
+            next_review_at=self.now + timedelta(days=3),
+            card_states=states.encode(),
+            cards_next_due_at=states.next_due_at(),
+        )
+        self.assertEqual(self.client.get("/api/revisions/cards/due/").json(), [])
+
+        card = LessonCard.objects.create(lesson=lesson, order=9, english="new word", uzbek="yangi so‘z")
+
+        due = self.client.get("/api/revisions/cards/due/").json()
+        self.assertEqual([item["card"]["id"] for item in due], [str(card.id)])
+
+
+class AsyncPingConcurrencyTests(TransactionTestCase):
+    """Async pings racing each other and threaded writes, each on its own thread as under ASGI."""
+
+    def test_concurrent_async_pings(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite write queueing")
+        user = get_user_model().objects.create_user(email="learner@example.com", password="x" * 12)
+        session = StudySession.objects.create(user=user, last_ping_at=timezone.now())
+        pings = 50
+
+        # As the async ping view runs it: one `sync_to_async` call per request.
+        apply_ping = sync_to_async(record_ping)
+
+        async def ping(seq: int):
+            async with ThreadSensitiveContext():
+                return await apply_ping(user_id=user.pk, session_id=session.pk, active_seconds=1, seq=seq)
+
+        # Threaded writers (sync views, workers) at the same time.
+        threaded = sync_to_async(record_study_day, thread_sensitive=False)
+
+        async def run():
+            return await asyncio.gather(
+                *(ping(seq) for seq in range(1, pings + 1)),
+                *(threaded(user_id=user.pk, seconds=1) for _ in range(20)),
+            )
+
+        results = async_to_sync(run)()[:pings]
+
+        self.assertTrue(all(result is not None for result in results))
+        session.refresh_from_db()
+        # Out-of-order seqs are rejected, not lost; what was applied is counted once everywhere.
+        applied = sum(result.applied for result in results)
+        self.assertGreater(applied, 0)
+        self.assertEqual(session.duration_seconds, applied)
+        self.assertEqual(study_heatmap(user=user, days=7)["seconds"][-1], applied + 20)
+
+
+@override_settings(TRACKING_STREAK_MIN_SECONDS=60)
+class StudyCalendarTests(TrackingTestCase):
+    def at(self, year: int, month: int, day: int):
+        return timezone.make_aware(datetime(year, month, day, 12))
+
+    def test_year_rollover(self):
+        record_study_day(user_id=self.user.pk, seconds=90, now=self.at(2025, 12, 31))
+        record_study_day(user_id=self.user.pk, seconds=120, now=self.at(2026, 1, 1))
+
+        self.assertEqual(StudyYear.objects.filter(user=self.user).count(), 2)
+        heatmap = study_heatmap(user=self.user, days=3, now=self.at(2026, 1, 1))
+        self.assertEqual(heatmap["seconds"], [0, 90, 120])
+        self.assertEqual(heatmap["active_days"], 2)
+        # 2024 is a leap year: 31 December is its 366th slot.
+        record_study_day(user_id=self.user.pk, seconds=30, now=self.at(2024, 12, 31))
+        self.assertEqual(study_heatmap(user=self.user, days=1, now=self.at(2024, 12, 31))["seconds"], [30])
+
+    def test_streak_extends_across_years(self):
+        for day in (self.at(2025, 12, 30), self.at(2025, 12, 31), self.at(2026, 1, 1)):
+            record_study_day(user_id=self.user.pk, seconds=60, now=day)
+
+        streak = study_streak(user=self.user, now=self.at(2026, 1, 1))
+        self.assertEqual((streak["current_days"], streak["longest_days"], streak["active_today"]), (3, 3, True))
+
+    def test_streak_counts_a_day_once_it_reaches_the_minimum(self):
+        now = self.at(2026, 3, 1)
+        record_study_day(user_id=self.user.pk, seconds=59, now=now)
+        self.assertEqual(study_streak(user=self.user, now=now)["current_days"], 0)
+
+        record_study_day(user_id=self.user.pk, seconds=1, now=now)
+        record_study_day(user_id=self.user.pk, seconds=600, now=now)
+        self.assertEqual(StudyStreak.objects.get(user=self.user).current_days, 1)
+
+    def test_streak_resets_after_a_missed_day(self):
+        for day in (1, 2, 3, 5):
+            record_study_day(user_id=self.user.pk, seconds=60, now=self.at(2026, 3, day))
+
+        streak = study_streak(user=self.user, now=self.at(2026, 3, 6))
+        self.assertEqual((streak["current_days"], streak["longest_days"]), (1, 3))
+        # Still current the day after the last active one, gone the day after that.
+        self.assertEqual(study_streak(user=self.user, now=self.at(2026, 3, 7))["current_days"], 0)
+
+    def test_rebuild_matches_incremental_updates(self):
+        for day in (1, 2, 4):
+            start = self.at(2026, 3, day)
+            session = StudySession.objects.create(user=self.user, last_ping_at=start, duration_seconds=60)
+            # `started_at` is set on insert.
+            StudySession.objects.filter(pk=session.pk).update(started_at=start)
+            record_study_day(user_id=self.user.pk, seconds=60, now=start)
+        incremental = study_streak(user=self.user, now=self.at(2026, 3, 4))
+        days = study_heatmap(user=self.user, days=7, now=self.at(2026, 3, 4))["seconds"]
+
+        rebuild_study_calendar(user_ids=[self.user.pk])
+
+        self.assertEqual(study_streak(user=self.user, now=self.at(2026, 3, 4)), incremental)
+        self.assertEqual(study_heatmap(user=self.user, days=7, now=self.at(2026, 3, 4))["seconds"], days)
+
+    def test_ping_and_calendar_commit_together(self):
+        session = StudySession.objects.create(user=self.user, last_ping_at=self.now)
+
+        with mock.patch("apps.tracking.services.study_time.record_study_day", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                record_ping(user_id=self.user.pk, session_id=session.pk, active_seconds=30, seq=1)
+        session.refresh_from_db()
+        self.assertEqual((session.duration_seconds, session.last_ping_seq), (0, 0))
+
+        # The retry is applied in full.
+        self.assertTrue(record_ping(user_id=self.user.pk, session_id=session.pk, active_seconds=30, seq=1).applied)
+        self.assertEqual(study_heatmap(user=self.user, days=1)["seconds"], [30])
+
+
+class AsyncStudySessionViewTests(TestCase):
+    """The async start/ping/stop views, called directly (`TRACKING_ASYNC_VIEWS` picks them at URL load)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email="learner@example.com", password="x" * 12)
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.token = str(AccessToken.for_user(self.user))
+        cache.delete(f"throttle_user_{self.user.pk}")
+
+    async def call(self, view, payload: dict):
+        request = self.factory.post(
+            "/", data=payload, content_type="application/json", headers={"authorization": f"Bearer {self.token}"}
+        )
+        response = await view(request)
+        return response.status_code, json.loads(response.content or b"null")
+
+    async def test_start_ping_stop(self):
+        status, session = await self.call(async_views.study_session_start, {"context": "lesson"})
+        self.assertEqual(status, 201)
+
+        status, data = await self.call(
+            async_views.study_session_ping, {"session_id": session["id"], "active_seconds": 30, "seq": 1}
+        )
+        self.assertEqual((status, data["duration_seconds"]), (200, 30))
+
+        status, _ = await self.call(async_views.study_session_stop, {"session_id": session["id"]})
+        self.assertEqual(status, 204)
+        status, _ = await self.call(async_views.study_session_ping, {"session_id": session["id"], "active_seconds": 5})
+        self.assertEqual(status, 404)
+
+    async def test_deactivated_user_is_rejected(self):
+        session = await StudySession.objects.acreate(user=self.user, last_ping_at=timezone.now())
+        await get_user_model().objects.filter(pk=self.user.pk).aupdate(is_active=False)
+
+        for view, payload in (
+            (async_views.study_session_ping, {"session_id": str(session.pk), "active_seconds": 30}),
+            (async_views.study_session_stop, {"session_id": str(session.pk)}),
+        ):
+            with self.subTest(view=view.__name__):
+                status, _ = await self.call(view, payload)
+                self.assertEqual(status, 401)
+        await session.arefresh_from_db()
+        self.assertEqual((session.duration_seconds, session.is_active), (0, True))
+        self.assertFalse(await StudyYear.objects.filter(user=self.user).aexists())
+
+    async def test_user_throttle_applies(self):
+        with mock.patch.object(UserRateThrottle, "rate", "2/min", create=True):
+            statuses = [(await self.call(async_views.study_session_start, {}))[0] for _ in range(3)]
+        self.assertEqual(statuses, [201, 201, 429])
+
+    def test_a_replayed_seq_is_answered_for_the_owner_only(self):
+        session = StudySession.objects.create(user=self.user, last_ping_at=timezone.now())
+        record_ping(user_id=self.user.pk, session_id=session.pk, active_seconds=30, seq=1)
+        other = get_user_model().objects.create_user(email="other@example.com", password="x" * 12)
+
+        self.assertIsNone(record_ping(user_id=other.pk, session_id=session.pk, active_seconds=30, seq=1))
+        replay = record_ping(user_id=self.user.pk, session_id=session.pk, active_seconds=30, seq=1)
+        self.assertEqual((replay.duration_seconds, replay.applied), (30, False))
+
+    def test_deactivation_between_check_and_write_stops_the_ping(self):
+        session = StudySession.objects.create(user=self.user, last_ping_at=timezone.now())
+        get_user_model().objects.filter(pk=self.user.pk).update(is_active=False)
+
+        result = record_ping(user_id=self.user.pk, session_id=session.pk, active_seconds=30, seq=1)
+
+        self.assertFalse(result.applied)
+        self.assertFalse(StudyYear.objects.filter(user=self.user).exists())
+
+
+class StudyHeartbeatTests(TestCase):
+    """The heartbeat WebSocket: the access token comes in the first frame, not the URL."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email="learner@example.com", password="x" * 12)
+        cls.session = StudySession.objects.create(user=cls.user, last_ping_at=timezone.now())
+
+    async def connect(self, query_string: bytes = b""):
+        path = f"/api/study-sessions/{self.session.pk}/heartbeat/"
+        scope = {"type": "websocket", "path": path, "query_string": query_string}
+        communicator = ApplicationCommunicator(HeartbeatRouter(None), scope)
+        await communicator.send_input({"type": "websocket.connect"})
+        self.assertEqual((await communicator.receive_output())["type"], "websocket.accept")
+        return communicator
+
+    async def test_token_in_the_first_frame(self):
+        communicator = await self.connect()
+        token = str(AccessToken.for_user(self.user))
+        await communicator.send_input({"type": "websocket.receive", "text": json.dumps({"token": token})})
+        self.assertEqual(json.loads((await communicator.receive_output())["text"]), {"authenticated": True})
+
+        await communicator.send_input({"type": "websocket.receive", "text": json.dumps({"active_seconds": 30})})
+        await communicator.send_input({"type": "websocket.disconnect", "code": 1000})
+        await communicator.wait()
+
+        await self.session.arefresh_from_db()
+        self.assertEqual(self.session.duration_seconds, 30)
+
+    async def test_a_token_in_the_url_is_not_accepted(self):
+        token = str(AccessToken.for_user(self.user))
+        communicator = await self.connect(f"token={token}".encode())
+        await communicator.send_input({"type": "websocket.receive", "text": json.dumps({"active_seconds": 30})})
+
+        self.assertEqual(await communicator.receive_output(), {"type": "websocket.close", "code": CLOSE_UNAUTHORIZED})
+
+    @override_settings(TRACKING_HEARTBEAT_AUTH_TIMEOUT_SECONDS=0)
+    async def test_a_silent_client_is_closed(self):
+        communicator = await self.connect()
+
+        self.assertEqual(await communicator.receive_output(), {"type": "websocket.close", "code": CLOSE_UNAUTHORIZED})
+
+    async def authenticated(self):
+        communicator = await self.connect()
+        token = str(AccessToken.for_user(self.user))
+        await communicator.send_input({"type": "websocket.receive", "text": json.dumps({"token": token})})
+        await communicator.receive_output()
+        return communicator
+
+    async def send_seconds(self, communicator, seconds: int) -> None:
+        await communicator.send_input({"type": "websocket.receive", "text": json.dumps({"active_seconds": seconds})})
+
+    def test_credit_is_capped_at_wall_time(self):
+        with mock.patch.object(heartbeat, "time") as clock:
+            clock.monotonic.return_value = 1000.0
+            state = HeartbeatState(str(self.session.pk), self.user.pk)
+            clock.monotonic.return_value = 1060.0
+            self.assertTrue(state.add(3600))
+
+        # A minute connected, plus one ping interval of slack.
+        self.assertEqual(state.pending_seconds, 60 + settings.TRACKING_PING_INTERVAL_SECONDS)
+
+    async def test_a_frame_flood_is_closed(self):
+        communicator = await self.authenticated()
+        for _ in range(heartbeat.FRAME_BURST + 1):
+            await self.send_seconds(communicator, 1)
+
+        self.assertEqual(await communicator.receive_output(), {"type": "websocket.close", "code": CLOSE_RATE_LIMITED})
+        await communicator.wait()
+        await self.session.arefresh_from_db()
+        self.assertEqual(self.session.duration_seconds, heartbeat.FRAME_BURST)
+
+    @override_settings(TRACKING_HEARTBEAT_FLUSH_SECONDS=0)
+    async def test_a_stopped_session_takes_no_more_time(self):
+        communicator = await self.authenticated()
+        await self.send_seconds(communicator, 10)
+        self.assertEqual(json.loads((await communicator.receive_output())["text"]), {"duration_seconds": 10})
+
+        await StudySession.objects.filter(pk=self.session.pk).aupdate(is_active=False)
+        await self.send_seconds(communicator, 10)
+
+        self.assertEqual(await communicator.receive_output(), {"type": "websocket.close", "code": CLOSE_NOT_FOUND})
+        await self.session.arefresh_from_db()
+        self.assertEqual(self.session.duration_seconds, 10)
+
+
+SHARED_CACHE = {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": ""}
+
+
+@mock.patch.object(db_router, "replica_enabled", return_value=True)
+class ReplicaPinningTests(TestCase):
+    """`config.db_router`: the read-your-writes pin, and the shared cache it needs."""
+
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        settings = override_settings(
+            CACHES={"default": {**SHARED_CACHE, "LOCATION": location}}, DATABASE_REPLICA_STICKY_SECONDS=10
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(email="learner@example.com", password="x" * 12)
+        self.auth = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def _alias_seen(self, method="get", write=False, **extra):
+        seen = []
+
+        def view(request):
+            if write:
+                db_router.pin_to_primary()
+            seen.append(db_router.read_alias())
+            return None
+
+        db_router.ReplicaPinningMiddleware(view)(getattr(self.factory, method)("/api/", **extra))
+        return seen[0]
+
+    def test_reads_go_to_the_replica(self, _):
+        self.assertEqual(self._alias_seen(**self.auth), db_router.REPLICA_ALIAS)
+        self.assertEqual(self._alias_seen(), db_router.REPLICA_ALIAS)
+
+    def test_unsafe_requests_are_pinned(self, _):
+        self.assertEqual(self._alias_seen("post", **self.auth), "default")
+
+    def test_a_write_pins_the_users_next_reads(self, _):
+        self.assertEqual(self._alias_seen(write=True, **self.auth), "default")
+
+        self.assertEqual(self._alias_seen(**self.auth), "default")
+        # Other users (and anonymous requests) still read from the replica.
+        self.assertEqual(self._alias_seen(), db_router.REPLICA_ALIAS)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_a_per_process_cache_fails_at_startup(self, _):
+        with self.assertRaisesMessage(ImproperlyConfigured, "DATABASE_REPLICA_STICKY_SECONDS"):
+            db_router.ReplicaPinningMiddleware(lambda request: None)
+
+        with override_settings(DATABASE_REPLICA_STICKY_SECONDS=0):
+            db_router.ReplicaPinningMiddleware(lambda request: None)
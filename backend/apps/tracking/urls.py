@@ -1,23 +1,46 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
+    CardReviewView,
     DashboardStatsView,
+    DueCardListView,
     LessonCompleteView,
     RevisionDueListView,
     RevisionReviewView,
+    RevisionSessionView,
+    StudyHeatmapView,
     StudySessionPingView,
     StudySessionStartView,
     StudySessionStopView,
+    StudyStreakView,
 )
 
 
+if settings.TRACKING_ASYNC_VIEWS:
+    from . import async_views
+
+    study_session_start = async_views.study_session_start
+    study_session_ping = async_views.study_session_ping
+    study_session_stop = async_views.study_session_stop
+else:
+    study_session_start = StudySessionStartView.as_view()
+    study_session_ping = StudySessionPingView.as_view()
+    study_session_stop = StudySessionStopView.as_view()
+
+
 urlpatterns = [
     path("dashboard/", DashboardStatsView.as_view(), name="dashboard-stats"),
-    path("study-sessions/start/", StudySessionStartView.as_view(), name="study-session-start"),
-    path("study-sessions/ping/", StudySessionPingView.as_view(), name="study-session-ping"),
-    path("study-sessions/stop/", StudySessionStopView.as_view(), name="study-session-stop"),
+    path("study-sessions/start/", study_session_start, name="study-session-start"),
+    path("study-sessions/ping/", study_session_ping, name="study-session-ping"),
+    path("study-sessions/stop/", study_session_stop, name="study-session-stop"),
+    path("study-calendar/heatmap/", StudyHeatmapView.as_view(), name="study-heatmap"),
+    path("study-calendar/streak/", StudyStreakView.as_view(), name="study-streak"),
     path("lessons/<slug:lesson_slug>/complete/", LessonCompleteView.as_view(), name="lesson-complete"),
     path("revisions/due/", RevisionDueListView.as_view(), name="revision-due"),
+    path("revisions/session/", RevisionSessionView.as_view(), name="revision-session"),
+    path("revisions/cards/due/", DueCardListView.as_view(), name="revision-cards-due"),
+    path("revisions/cards/review/", CardReviewView.as_view(), name="revision-cards-review"),
     path("revisions/<uuid:schedule_id>/review/", RevisionReviewView.as_view(), name="revision-review"),
 ]
 
@@ -1,23 +1,43 @@
 from __future__ import annotations
 
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.learning.models import Lesson
+from apps.learning.models import Lesson, LessonCard
+from config.sqlite import serialized_writes
 
-from .models import RevisionSchedule, StudySession
+from .models import PENDING_STATUSES, RevisionSchedule, StudySession
 from .serializers import (
+    REVISION_SCHEDULE_ROWS,
+    STUDY_SESSION_ROWS,
+    CardReviewSerializer,
+    DueCardSerializer,
+    DueCardsQuerySerializer,
+    RevisionReviewSerializer,
     RevisionScheduleSerializer,
+    RevisionSessionScheduleSerializer,
+    StudyHeatmapQuerySerializer,
     StudySessionPingSerializer,
-    StudySessionSerializer,
     StudySessionStartSerializer,
     StudySessionStopSerializer,
 )
-from .services.spaced_repetition import create_or_reset_schedule, mark_reviewed, sync_schedule_status
-from .services.study_time import get_study_seconds_summary
+from .services.card_srs import due_cards, review_cards
+from .services.ping_pacing import load_monitor, next_ping_after
+from .services.spaced_repetition import (
+    ScheduleConflict,
+    create_or_reset_schedule,
+    mark_reviewed,
+    sync_schedule_rows,
+    sync_schedule_status,
+)
+from .services.study_calendar import study_heatmap, study_streak
+from .services.study_time import get_study_seconds_summary, record_ping
 
 
 class DashboardStatsView(APIView):
@@ -26,26 +46,23 @@ class DashboardStatsView(APIView):
     def get(self, request):
         now = timezone.now()
 
-        # Sync statuses (MVP: done on-demand; consider a periodic job in production)
-        schedules = list(RevisionSchedule.objects.select_related("lesson").filter(user=request.user))
-        dirty = []
-        for schedule in schedules:
-            before = schedule.status
-            sync_schedule_status(schedule, now=now)
-            if schedule.status != before:
-                schedule.updated_at = now
-                dirty.append(schedule)
-
-        if dirty:
-            RevisionSchedule.objects.bulk_update(dirty, ["status", "updated_at"])
+        # Statuses time has changed are fixed here; they are only saved without
+        # the `tracking.sync_revision_statuses` job (TRACKING_SYNC_STATUSES_ON_READ).
+        schedules = sync_schedule_rows(
+            list(REVISION_SCHEDULE_ROWS.values(RevisionSchedule.objects.filter(user=request.user))),
+            now=now,
+        )
 
-        queue = [s for s in schedules if s.status != "completed" and s.next_review_at]
-        queue_sorted = sorted(queue, key=lambda s: (s.next_review_at or now))
+        queue = [s for s in schedules if s["status"] != "completed" and s["next_review_at"]]
+        queue_sorted = sorted(queue, key=lambda s: (s["next_review_at"] or now))
 
         due_today = [
-            s for s in schedules if s.status in ("due", "expired") or (s.next_review_at and s.next_review_at.date() <= now.date())
+            s
+            for s in schedules
+            if s["status"] in ("due", "expired") or (s["next_review_at"] and s["next_review_at"].date() <= now.date())
         ]
-        due_today_sorted = sorted(due_today, key=lambda s: (s.next_review_at or now))
+        due_today_sorted = sorted(due_today, key=lambda s: (s["next_review_at"] or now))
+        context = {"request": request}
 
         return Response(
             {
@@ -55,8 +72,8 @@ class DashboardStatsView(APIView):
                     "email": request.user.email,
                 },
                 "study_time": get_study_seconds_summary(user=request.user, now=now),
-                "revision_topics": RevisionScheduleSerializer(due_today_sorted, many=True).data,
-                "revision_queue": RevisionScheduleSerializer(queue_sorted, many=True).data,
+                "revision_topics": REVISION_SCHEDULE_ROWS.many(due_today_sorted, context),
+                "revision_queue": REVISION_SCHEDULE_ROWS.many(queue_sorted, context),
             }
         )
 
@@ -68,12 +85,13 @@ class StudySessionStartView(APIView):
         serializer = StudySessionStartSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        session = StudySession.objects.create(
-            user=request.user,
-            context=serializer.validated_data.get("context", ""),
-            last_ping_at=timezone.now(),
-        )
-        return Response(StudySessionSerializer(session).data, status=status.HTTP_201_CREATED)
+        with serialized_writes():
+            session = StudySession.objects.create(
+                user=request.user,
+                context=serializer.validated_data.get("context", ""),
+                last_ping_at=timezone.now(),
+            )
+        return Response(STUDY_SESSION_ROWS.instance(session), status=status.HTTP_201_CREATED)
 
 
 class StudySessionPingView(APIView):
@@ -82,17 +100,24 @@ class StudySessionPingView(APIView):
     def post(self, request):
         serializer = StudySessionPingSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        with load_monitor.track():
+            result = record_ping(
+                user_id=request.user.id,
+                session_id=data["session_id"],
+                active_seconds=int(data["active_seconds"]),
+                seq=data.get("seq"),
+            )
+        if result is None:
+            raise Http404("No StudySession matches the given query.")
 
-        session = get_object_or_404(
-            StudySession,
-            id=serializer.validated_data["session_id"],
-            user=request.user,
-            is_active=True,
+        return Response(
+            {
+                "duration_seconds": result.duration_seconds,
+                "next_ping_after": next_ping_after(visible=data["visible"]),
+            }
         )
-        session.duration_seconds += int(serializer.validated_data["active_seconds"])
-        session.last_ping_at = timezone.now()
-        session.save(update_fields=["duration_seconds", "last_ping_at", "updated_at"])
-        return Response({"duration_seconds": session.duration_seconds})
 
 
 class StudySessionStopView(APIView):
@@ -110,10 +135,27 @@ class StudySessionStopView(APIView):
         )
         session.is_active = False
         session.ended_at = timezone.now()
-        session.save(update_fields=["is_active", "ended_at", "updated_at"])
+        with serialized_writes():
+            session.save(update_fields=["is_active", "ended_at", "updated_at"])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class StudyHeatmapView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        serializer = StudyHeatmapQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(study_heatmap(user=request.user, days=serializer.validated_data["days"]))
+
+
+class StudyStreakView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(study_streak(user=request.user))
+
+
 class LessonCompleteView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -121,7 +163,10 @@ class LessonCompleteView(APIView):
         lesson = get_object_or_404(Lesson, slug=lesson_slug)
         existing = RevisionSchedule.objects.filter(user=request.user, lesson=lesson).first()
         schedule = create_or_reset_schedule(schedule=existing, user=request.user, lesson=lesson)
-        return Response(RevisionScheduleSerializer(schedule).data, status=status.HTTP_201_CREATED)
+        return Response(
+            RevisionScheduleSerializer(schedule, context={"request": request}).data,
+            status=status.HTTP_201_CREATED,
+        )
 
 
 class RevisionDueListView(generics.ListAPIView):
@@ -129,32 +174,97 @@ class RevisionDueListView(generics.ListAPIView):
     serializer_class = RevisionScheduleSerializer
 
     def get_queryset(self):
+        return RevisionSchedule.objects.filter(user=self.request.user, status__in=PENDING_STATUSES)
+
+    def list(self, request, *args, **kwargs):
         now = timezone.now()
-        qs = RevisionSchedule.objects.select_related("lesson").filter(user=self.request.user).exclude(status="completed")
-        schedules = list(qs)
-        dirty = []
-        for schedule in schedules:
-            before = schedule.status
-            sync_schedule_status(schedule, now=now)
-            if schedule.status != before:
-                schedule.updated_at = now
-                dirty.append(schedule)
+        schedules = sync_schedule_rows(list(REVISION_SCHEDULE_ROWS.values(self.get_queryset())), now=now)
+
+        # `next_review_at__date` compares in the current time zone.
+        due = [
+            s for s in schedules if s["next_review_at"] and timezone.localtime(s["next_review_at"]).date() <= now.date()
+        ]
+        due.sort(key=lambda s: s["next_review_at"])
+        return Response(REVISION_SCHEDULE_ROWS.many(due, self.get_serializer_context()))
 
-        if dirty:
-            RevisionSchedule.objects.bulk_update(dirty, ["status", "updated_at"])
 
-        return qs.filter(next_review_at__date__lte=now.date()).order_by("next_review_at")
+class RevisionSessionView(generics.ListAPIView):
+    """
+    Everything needed to start revising in one response: the due schedules
+    (as `/revisions/due/`) with each lesson's cards. Statuses are synced
+    (unless the status sweep job does it), then one query loads schedules +
+    lessons and one loads all their cards.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = RevisionSessionScheduleSerializer
+
+    def get_queryset(self):
+        now = timezone.now()
+        pending = RevisionSchedule.objects.filter(user=self.request.user, status__in=PENDING_STATUSES)
+        if settings.TRACKING_SYNC_STATUSES_ON_READ:
+            sync_schedule_rows(list(pending.values("id", "status", "next_review_at")), now=now, persist=True)
+
+        cards = LessonCard.objects.order_by("order", "english")
+        return (
+            pending.filter(next_review_at__date__lte=now.date())
+            .select_related("lesson")
+            .prefetch_related(Prefetch("lesson__cards", queryset=cards))
+            .order_by("next_review_at")
+        )
 
 
 class RevisionReviewView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, schedule_id):
-        schedule = get_object_or_404(
-            RevisionSchedule.objects.select_related("lesson"),
-            id=schedule_id,
-            user=request.user,
-        )
-        mark_reviewed(schedule)
+        schedule = get_object_or_404(RevisionSchedule, id=schedule_id, user=request.user)
+        serializer = RevisionReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        context = {"request": request}
+        try:
+            mark_reviewed(schedule, expected_version=serializer.validated_data.get("version"))
+        except ScheduleConflict as exc:
+            sync_schedule_status(exc.schedule)
+            return Response(REVISION_SCHEDULE_ROWS.instance(exc.schedule, context), status=status.HTTP_409_CONFLICT)
         sync_schedule_status(schedule)
-        return Response(RevisionScheduleSerializer(schedule).data)
+        return Response(REVISION_SCHEDULE_ROWS.instance(schedule, context))
+
+
+class DueCardListView(APIView):
+    """The most overdue cards across all of the user's lessons (card-level SRS)."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        query = DueCardsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        cards = due_cards(user=request.user, limit=query.validated_data["limit"])
+        return Response(DueCardSerializer(cards, many=True).data)
+
+
+class CardReviewView(APIView):
+    """Record a batch of card answers; each lesson's card states are rewritten once."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = CardReviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # The last answer for a card wins.
+        results = {item["card_id"]: item["correct"] for item in serializer.validated_data["results"]}
+        result = review_cards(user=request.user, results=results)
+        body = {
+            "updated": result.updated,
+            "ignored": result.ignored,
+            "schedules": [
+                {"schedule_id": schedule.id, "cards_next_due_at": schedule.cards_next_due_at}
+                for schedule in result.schedules
+            ],
+        }
+        if result.conflicts:
+            # The other cards were recorded; only these should be sent again.
+            body["detail"] = "Revision schedule changed concurrently; retry the conflicting cards."
+            body["conflicts"] = result.conflicts
+            return Response(body, status=status.HTTP_409_CONFLICT)
+        return Response(body)
@@ -0,0 +1,10 @@
+"""
+Performance benchmarks for the Usolve backend.
+
+Each module is runnable on its own from `backend/`, e.g.::
+
+    python -m benchmarks.tracking_asgi
+
+Benchmarks use `benchmarks.settings`, which points Django at a throwaway
+SQLite database (override with `BENCH_DATABASE_URL` to measure PostgreSQL).
+"""
@@ -0,0 +1,252 @@
+"""
+Card-level SRS: packed per-schedule card states vs a naive row per user per card.
+
+    python -m benchmarks.card_srs --users 200 --lessons 20 --cards 30 --repeat 200
+
+Storage is measured per table including its indexes (SQLite `dbstat`,
+PostgreSQL `pg_total_relation_size`): the schedule table with empty card
+states, the same table with every card's state packed in, and a naive
+`(user, card, stage, due_at, last_reviewed_at)` table created for the run.
+
+Latency, per operation over random users: listing the 50 most overdue cards
+(with their `LessonCard` and lesson) and recording a 20-card review of one
+lesson, for both designs; plus decode+encode of one lesson's state blob.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from datetime import timedelta
+
+from .harness import LatencyStats, print_table, setup_django
+
+
+NAIVE_TABLE = "bench_naive_card_state"
+
+
+def _naive_model():
+    from django.conf import settings
+    from django.db import models
+
+    class NaiveCardState(models.Model):
+        user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+        card = models.ForeignKey("learning.LessonCard", on_delete=models.CASCADE, related_name="+")
+        stage = models.PositiveSmallIntegerField(default=0)
+        due_at = models.DateTimeField(null=True)
+        last_reviewed_at = models.DateTimeField(null=True)
+
+        class Meta:
+            app_label = "tracking"
+            db_table = NAIVE_TABLE
+            constraints = [models.UniqueConstraint(fields=["user", "card"], name="bench_naive_user_card")]
+            indexes = [models.Index(fields=["user", "due_at"], name="bench_naive_user_due")]
+
+    return NaiveCardState
+
+
+def _table_bytes(table: str) -> int:
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT pg_total_relation_size(%s)", [table])
+        else:
+            cursor.execute(
+                "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat "
+                "WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = %s)",
+                [table],
+            )
+        return cursor.fetchone()[0]
+
+
+def _seed(users: int, lessons: int, cards: int, now):
+    from django.contrib.auth import get_user_model
+
+    from apps.learning.models import Course, Lesson, LessonCard
+    from apps.tracking.models import RevisionSchedule
+
+    course = Course.objects.create(title="Bench", slug="bench")
+    lesson_objs = Lesson.objects.bulk_create(
+        Lesson(course=course, title=f"Lesson {i}", slug=f"bench-{i}", order=i) for i in range(lessons)
+    )
+    LessonCard.objects.bulk_create(
+        (
+            LessonCard(lesson=lesson, order=j, english=f"{lesson.slug} word {j}", uzbek=f"so‘z {j}")
+            for lesson in lesson_objs
+            for j in range(cards)
+        ),
+        batch_size=1000,
+    )
+    user_objs = get_user_model().objects.bulk_create(
+        get_user_model()(email=f"bench-srs-{i}@example.com", password="!") for i in range(users)
+    )
+    RevisionSchedule.objects.bulk_create(
+        (
+            RevisionSchedule(
+                user=user,
+                lesson=lesson,
+                lesson_completed_at=now - timedelta(days=2),
+                next_review_at=now - timedelta(days=1),
+            )
+            for user in user_objs
+            for lesson in lesson_objs
+        ),
+        batch_size=1000,
+    )
+    return user_objs
+
+
+def _fill_packed(now) -> None:
+    from apps.tracking.models import RevisionSchedule
+    from apps.tracking.services.card_srs import lesson_card_ids, reset_card_states
+
+    cards = lesson_card_ids(RevisionSchedule.objects.values_list("lesson_id", flat=True).distinct())
+    batch = []
+    for schedule in RevisionSchedule.objects.only("id", "lesson_id").iterator(chunk_size=1000):
+        # Spread due times so the "most overdue" ordering has work to do.
+        reset_card_states(schedule, cards[schedule.lesson_id], due_at=now - timedelta(minutes=random.randrange(1, 2880)))
+        batch.append(schedule)
+        if len(batch) >= 1000:
+            RevisionSchedule.objects.bulk_update(batch, ["card_states", "cards_next_due_at"])
+            batch = []
+    RevisionSchedule.objects.bulk_update(batch, ["card_states", "cards_next_due_at"])
+
+
+def _fill_naive(model, now) -> int:
+    from django.db import connection
+
+    from apps.tracking.models import RevisionSchedule
+    from apps.tracking.services.card_srs import lesson_card_ids
+
+    with connection.schema_editor() as editor:
+        editor.create_model(model)
+
+    cards = lesson_card_ids(RevisionSchedule.objects.values_list("lesson_id", flat=True).distinct())
+    rows = 0
+    batch = []
+    for user_id, lesson_id in RevisionSchedule.objects.values_list("user_id", "lesson_id").iterator(chunk_size=1000):
+        due_at = now - timedelta(minutes=random.randrange(1, 2880))
+        batch.extend(model(user_id=user_id, card_id=card_id, due_at=due_at) for card_id in cards[lesson_id])
+        if len(batch) >= 5000:
+            model.objects.bulk_create(batch)
+            rows += len(batch)
+            batch = []
+    model.objects.bulk_create(batch)
+    return rows + len(batch)
+
+
+def _naive_due(model, user, now, limit: int = 50) -> list:
+    return list(
+        model.objects.filter(user=user, due_at__lte=now).select_related("card__lesson").order_by("due_at")[:limit]
+    )
+
+
+def _naive_review(model, user, results: dict, reviewed_at) -> int:
+    from django.db import transaction
+
+    from apps.tracking.services.card_srs import RELEARN_INTERVAL
+    from apps.tracking.services.spaced_repetition import MAX_STAGE, SRS_INTERVALS
+
+    with transaction.atomic():
+        rows = list(model.objects.select_for_update().filter(user=user, card_id__in=list(results)))
+        for row in rows:
+            row.last_reviewed_at = reviewed_at
+            if not results[row.card_id]:
+                row.stage = 0
+                row.due_at = reviewed_at + RELEARN_INTERVAL
+            elif row.due_at is None or row.stage >= MAX_STAGE:
+                row.due_at = None
+            else:
+                row.stage += 1
+                row.due_at = reviewed_at + SRS_INTERVALS[row.stage]
+        model.objects.bulk_update(rows, ["stage", "due_at", "last_reviewed_at"])
+    return len(rows)
+
+
+def _time(name: str, fn, repeat: int) -> dict:
+    stats = LatencyStats(name=name)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        begun = time.perf_counter()
+        fn()
+        stats.record(time.perf_counter() - begun, ok=True)
+    stats.elapsed_seconds = time.perf_counter() - started
+    return stats.summary()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--lessons", type=int, default=20, help="Completed lessons per user.")
+    parser.add_argument("--cards", type=int, default=30, help="Cards per lesson.")
+    parser.add_argument("--repeat", type=int, default=200, help="Operations timed per design.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of tables.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    random.seed(args.seed)
+
+    from django.utils import timezone
+
+    from apps.learning.models import LessonCard
+    from apps.tracking.models import RevisionSchedule
+    from apps.tracking.services.card_srs import CardStates, due_cards, review_cards
+
+    now = timezone.now()
+    users = _seed(args.users, args.lessons, args.cards, now)
+    schedule_table = RevisionSchedule._meta.db_table
+    baseline = _table_bytes(schedule_table)
+    _fill_packed(now)
+    packed = _table_bytes(schedule_table) - baseline
+    naive = _naive_model()
+    naive_rows = _fill_naive(naive, now)
+    naive_bytes = _table_bytes(NAIVE_TABLE)
+
+    card_states = args.users * args.lessons * args.cards
+    storage = [
+        {"name": "packed", "rows": RevisionSchedule.objects.count(), "mb": round(packed / 2**20, 2),
+         "bytes_per_card": round(packed / card_states, 1)},
+        {"name": "row-per-card", "rows": naive_rows, "mb": round(naive_bytes / 2**20, 2),
+         "bytes_per_card": round(naive_bytes / card_states, 1)},
+    ]
+
+    lesson_cards = {}
+    for lesson_id, card_id in LessonCard.objects.values_list("lesson_id", "id"):
+        lesson_cards.setdefault(lesson_id, []).append(card_id)
+    lesson_ids = list(lesson_cards)
+
+    def review_batch() -> dict:
+        cards = random.sample(lesson_cards[random.choice(lesson_ids)], min(20, args.cards))
+        return {card_id: random.random() < 0.8 for card_id in cards}
+
+    blob = RevisionSchedule.objects.values_list("card_states", flat=True).first()
+    latency = [
+        {"op": "due", **_time("packed", lambda: due_cards(user=random.choice(users), now=now), args.repeat)},
+        {"op": "due", **_time("row-per-card", lambda: _naive_due(naive, random.choice(users), now), args.repeat)},
+        {
+            "op": "review",
+            **_time("packed", lambda: review_cards(user=random.choice(users), results=review_batch(), reviewed_at=now),
+                    args.repeat),
+        },
+        {
+            "op": "review",
+            **_time("row-per-card", lambda: _naive_review(naive, random.choice(users), review_batch(), now),
+                    args.repeat),
+        },
+        {"op": "codec", **_time("packed", lambda: CardStates.decode(blob).encode(), args.repeat * 10)},
+    ]
+
+    if args.json:
+        print(json.dumps({"storage": storage, "latency": latency}, indent=2))
+    else:
+        print_table(storage, ["name", "rows", "mb", "bytes_per_card"])
+        print()
+        print_table(latency, ["op", "name", "requests", "rps", "p50_ms", "p95_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
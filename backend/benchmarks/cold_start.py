@@ -0,0 +1,211 @@
+"""
+Worker cold-start benchmark: how long a fresh process takes to import the
+WSGI/ASGI application and serve its first request, and which packages that
+time goes to.
+
+    python -m benchmarks.cold_start                  # table
+    python -m benchmarks.cold_start --breakdown 15   # + top packages by import time
+    python -m benchmarks.cold_start --check          # fail if over budget
+    python -m benchmarks.cold_start --write-budget   # re-baseline the budget file
+
+Each measurement runs in its own `python -X importtime` subprocess, so nothing
+is warm. Timings are the best of `--repeat` runs. The budget
+(`cold_start_budget.json`) caps total time and the number of modules loaded,
+and lists modules (with their submodules) that must stay off the cold path;
+module counts and forbidden modules are deterministic, so they catch
+regressions even on noisy machines. Re-baseline on the machine that runs
+`--check`. Environment variables are passed through to the measured process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+
+TARGETS = ("config.wsgi", "config.asgi")
+
+BUDGET_FILE = Path(__file__).with_name("cold_start_budget.json")
+
+# `--write-budget` headroom over the measured values.
+TIME_HEADROOM = 1.5
+MODULE_HEADROOM = 1.05
+
+MARKER = "cold-start:"
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _mark(phase: str) -> None:
+    print(f"{MARKER} {phase}", file=sys.stderr, flush=True)
+
+
+def run_child(target: str, path: str) -> None:
+    _mark("import")
+    started = time.perf_counter()
+    application = importlib.import_module(target).application
+    imported = time.perf_counter()
+
+    _mark("request")
+    from .harness import asgi_request, wsgi_request
+
+    if target.endswith("asgi"):
+        import asyncio
+
+        status, _ = asyncio.run(asgi_request(application, "GET", path))
+    else:
+        status, _ = wsgi_request(application, "GET", path)
+    finished = time.perf_counter()
+    _mark("end")
+
+    print(
+        json.dumps(
+            {
+                "status": status,
+                "import_ms": round((imported - started) * 1000, 1),
+                "first_request_ms": round((finished - imported) * 1000, 1),
+            }
+        )
+    )
+
+
+def parse_importtime(stderr: str) -> dict[str, list[tuple[str, int]]]:
+    """
+    Split `-X importtime` output by phase marker. Returns
+    `{phase: [(module, self_us), ...]}`.
+    """
+
+    phases: dict[str, list[tuple[str, int]]] = {}
+    current = None
+    for line in stderr.splitlines():
+        if line.startswith(MARKER):
+            current = line[len(MARKER) :].strip()
+            phases.setdefault(current, [])
+            continue
+        match = IMPORTTIME_LINE.match(line)
+        if match and current is not None:
+            phases[current].append((match[4], int(match[1])))
+    return phases
+
+
+def package_breakdown(modules: list[tuple[str, int]]) -> list[tuple[str, float]]:
+    """
+    Self import time (ms) per top-level package, largest first.
+    """
+
+    totals: Counter[str] = Counter()
+    for name, self_us in modules:
+        totals[name.split(".", 1)[0]] += self_us
+    return [(name, round(us / 1000, 1)) for name, us in totals.most_common()]
+
+
+def measure(target: str, path: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "benchmarks.cold_start", "--child", target, "--path", path],
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "benchmarks.settings"},
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    phases = parse_importtime(proc.stderr)
+    modules = phases.get("import", []) + phases.get("request", [])
+    result["total_ms"] = round(result["import_ms"] + result["first_request_ms"], 1)
+    result["modules"] = len(modules)
+    result["loaded"] = sorted({name for name, _ in modules})
+    result["breakdown"] = package_breakdown(modules)
+    return result
+
+
+def measure_best(target: str, path: str, repeat: int) -> dict:
+    runs = [measure(target, path) for _ in range(repeat)]
+    best = min(runs, key=lambda run: run["total_ms"])
+    return {
+        "target": target,
+        **best,
+        "import_ms": min(run["import_ms"] for run in runs),
+        "first_request_ms": min(run["first_request_ms"] for run in runs),
+    }
+
+
+def check_budget(results: list[dict], budget: dict) -> list[str]:
+    failures = []
+    for result in results:
+        limits = budget.get(result["target"])
+        if limits is None:
+            continue
+        target = result["target"]
+        if result["total_ms"] > limits["total_ms"]:
+            failures.append(f"{target}: cold start {result['total_ms']} ms > budget {limits['total_ms']} ms")
+        if result["modules"] > limits["modules"]:
+            failures.append(f"{target}: {result['modules']} modules loaded > budget {limits['modules']}")
+        for name in limits.get("forbidden", []):
+            if any(module == name or module.startswith(f"{name}.") for module in result["loaded"]):
+                failures.append(f"{target}: {name} is imported before the first request is served")
+    return failures
+
+
+def write_budget(results: list[dict], budget: dict) -> None:
+    for result in results:
+        limits = budget.setdefault(result["target"], {})
+        limits["total_ms"] = round(result["total_ms"] * TIME_HEADROOM)
+        limits["modules"] = round(result["modules"] * MODULE_HEADROOM)
+        limits.setdefault("forbidden", [])
+    BUDGET_FILE.write_text(json.dumps(budget, indent=2) + "\n")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=TARGETS, action="append", help="Entry point(s) to measure (default: all).")
+    parser.add_argument("--path", default="/api/lessons/", help="URL of the first request.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per target; the best is reported.")
+    parser.add_argument("--breakdown", type=int, default=0, metavar="N", help="Show the N slowest packages.")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if over budget.")
+    parser.add_argument("--write-budget", action="store_true", help="Rewrite the budget from this run.")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table.")
+    parser.add_argument("--child", metavar="TARGET", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child, args.path)
+        return
+
+    from .harness import print_table, setup_django
+
+    setup_django()
+    results = [measure_best(target, args.path, args.repeat) for target in args.target or TARGETS]
+
+    if args.json:
+        print(json.dumps([{k: v for k, v in row.items() if k != "loaded"} for row in results], indent=2))
+    else:
+        print_table(results, ["target", "status", "import_ms", "first_request_ms", "total_ms", "modules"])
+        for result in results if args.breakdown else []:
+            print(f"\n{result['target']}: self import time by package")
+            print_table(
+                [{"package": name, "ms": ms} for name, ms in result["breakdown"][: args.breakdown]],
+                ["package", "ms"],
+            )
+
+    budget = json.loads(BUDGET_FILE.read_text()) if BUDGET_FILE.exists() else {}
+    if args.write_budget:
+        write_budget(results, budget)
+        print(f"\nWrote {BUDGET_FILE.name}")
+    if args.check:
+        failures = check_budget(results, budget)
+        for failure in failures:
+            print(f"FAIL {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+        print("\nCold start within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Deterministic synthetic data for benchmarks.
+
+    python manage.py generate_benchmark_data --users 500 --lessons 60 --sessions 50
+
+Given the same parameters, seed and anchor time, `generate` writes exactly
+the same rows (UUIDs included): one course of `lessons` lessons with
+`cards` cards each; `users` learners, each with `sessions` closed study
+sessions over the 90 days before the anchor; a revision schedule for a
+random subset of lessons per user, with stages drawn from `STAGE_WEIGHTS`
+and due times spread around the anchor (so dashboards have due, expired and
+upcoming reviews); and the study calendars rebuilt from the sessions.
+
+Generated rows are recognisable by `EMAIL_PREFIX` and `COURSE_SLUG`, and
+`clear` removes them.
+"""
+
+from __future__ import annotations
+
+import random
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+
+EMAIL_PREFIX = "bench-user-"
+COURSE_SLUG = "bench-course"
+LESSON_SLUG_PREFIX = "bench-lesson-"
+
+# Relative share of schedules at each SRS stage (0..4) and completed.
+STAGE_WEIGHTS = (30, 25, 20, 12, 8)
+COMPLETED_WEIGHT = 5
+
+BATCH_SIZE = 2000
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int = 100
+    lessons: int = 30
+    cards: int = 20
+    sessions: int = 20
+    lessons_per_user: int = 15
+    seed: int = 1
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+SCALES = {
+    "small": Scale(users=50, lessons=20, cards=15, sessions=10, lessons_per_user=10),
+    "medium": Scale(users=500, lessons=60, cards=20, sessions=40, lessons_per_user=30),
+    "large": Scale(users=2000, lessons=120, cards=25, sessions=100, lessons_per_user=60),
+}
+
+
+def email_for(index: int) -> str:
+    return f"{EMAIL_PREFIX}{index}@example.com"
+
+
+def lesson_slug(index: int) -> str:
+    return f"{LESSON_SLUG_PREFIX}{index}"
+
+
+def default_anchor() -> datetime:
+    """Midnight UTC today: stable within a day, and "now"-relative enough for due queues."""
+    from django.utils import timezone
+
+    return timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@contextmanager
+def _explicit_timestamps(*fields):
+    """Let bulk_create keep the `auto_now`/`auto_now_add` values we set."""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def clear() -> None:
+    """Delete everything `generate` created (users cascade to their tracking rows)."""
+    from django.contrib.auth import get_user_model
+
+    from apps.learning.models import Course
+
+    get_user_model().objects.filter(email__startswith=EMAIL_PREFIX).delete()
+    Course.objects.filter(slug=COURSE_SLUG).delete()
+
+
+def generate(scale: Scale, *, anchor: datetime | None = None) -> dict:
+    """Write the data set for `scale`. Returns row counts per model."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+
+    from apps.learning.models import Course, Lesson, LessonCard
+    from apps.tracking.models import RevisionSchedule, StudySession
+    from apps.tracking.services.card_srs import CardStates
+    from apps.tracking.services.spaced_repetition import SRS_INTERVALS, schedule_status
+    from apps.tracking.services.study_calendar import rebuild_study_calendar
+
+    anchor = anchor or default_anchor()
+    rng = random.Random(scale.seed)
+
+    def next_uuid() -> uuid.UUID:
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    User = get_user_model()
+    with transaction.atomic():
+        course = Course.objects.create(
+            id=next_uuid(), title="Benchmark course", slug=COURSE_SLUG, description="Synthetic data"
+        )
+        lessons = Lesson.objects.bulk_create(
+            Lesson(
+                id=next_uuid(),
+                course=course,
+                title=f"Lesson {i}",
+                slug=lesson_slug(i),
+                order=i,
+                cover_image_path=f"/picture/lesson-{i % 40}.png",
+            )
+            for i in range(scale.lessons)
+        )
+        cards = [
+            LessonCard(
+                id=next_uuid(),
+                lesson=lesson,
+                order=j,
+                english=f"word {i}-{j}",
+                uzbek=f"so‘z {i}-{j}",
+                pronunciation=f"[wɜːd {j}]",
+                mnemonic_example=f"Example sentence {j} for lesson {i}.",
+                translation=f"Tarjima {j}.",
+            )
+            for i, lesson in enumerate(lessons)
+            for j in range(scale.cards)
+        ]
+        LessonCard.objects.bulk_create(cards, batch_size=BATCH_SIZE)
+        card_ids = {lesson.id: [] for lesson in lessons}
+        for card in cards:
+            card_ids[card.lesson_id].append(card.id)
+
+        password = make_password(None)
+        users = User.objects.bulk_create(
+            (
+                User(email=email_for(i), first_name=f"Learner {i}", password=password, date_joined=anchor)
+                for i in range(scale.users)
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        if users and users[0].pk is None:
+            users = list(User.objects.filter(email__startswith=EMAIL_PREFIX).order_by("id"))
+
+        session_fields = [StudySession._meta.get_field(name) for name in ("started_at", "created_at", "updated_at")]
+        schedule_fields = [RevisionSchedule._meta.get_field(name) for name in ("created_at", "updated_at")]
+        sessions = schedules = 0
+        stages = list(range(len(STAGE_WEIGHTS))) + [None]
+        weights = [*STAGE_WEIGHTS, COMPLETED_WEIGHT]
+
+        with _explicit_timestamps(*session_fields, *schedule_fields):
+            batch = []
+            for user in users:
+                for _ in range(scale.sessions):
+                    started_at = anchor - timedelta(seconds=rng.randrange(1, 90 * 86400))
+                    duration = rng.randrange(60, 45 * 60)
+                    ended_at = started_at + timedelta(seconds=duration)
+                    batch.append(
+                        StudySession(
+                            id=next_uuid(),
+                            user=user,
+                            context="bench",
+                            started_at=started_at,
+                            ended_at=ended_at,
+                            last_ping_at=ended_at,
+                            duration_seconds=duration,
+                            is_active=False,
+                            created_at=started_at,
+                            updated_at=ended_at,
+                        )
+                    )
+                if len(batch) >= BATCH_SIZE:
+                    StudySession.objects.bulk_create(batch)
+                    sessions += len(batch)
+                    batch = []
+            StudySession.objects.bulk_create(batch)
+            sessions += len(batch)
+
+            batch = []
+            for user in users:
+                for lesson in rng.sample(lessons, min(scale.lessons_per_user, len(lessons))):
+                    stage = rng.choices(stages, weights)[0]
+                    completed_at = anchor - timedelta(days=rng.randrange(1, 120), seconds=rng.randrange(86400))
+                    if stage is None:
+                        stage, next_review_at, last_reviewed_at = len(STAGE_WEIGHTS) - 1, None, completed_at
+                    else:
+                        # Due anywhere from 3 days ago to one full interval ahead.
+                        next_review_at = anchor + timedelta(
+                            seconds=rng.randrange(-3 * 86400, int(SRS_INTERVALS[stage].total_seconds()))
+                        )
+                        last_reviewed_at = next_review_at - SRS_INTERVALS[stage] if stage else None
+                    lesson_cards = card_ids[lesson.id] if next_review_at else []
+                    states = CardStates.new(lesson_cards, due_at=next_review_at or anchor)
+                    batch.append(
+                        RevisionSchedule(
+                            id=next_uuid(),
+                            user=user,
+                            lesson=lesson,
+                            lesson_completed_at=completed_at,
+                            stage=stage,
+                            next_review_at=next_review_at,
+                            last_reviewed_at=last_reviewed_at,
+                            status=schedule_status("scheduled", next_review_at, anchor),
+                            card_states=states.encode(),
+                            cards_next_due_at=states.next_due_at(),
+                            created_at=completed_at,
+                            updated_at=last_reviewed_at or completed_at,
+                        )
+                    )
+                if len(batch) >= BATCH_SIZE:
+                    RevisionSchedule.objects.bulk_create(batch)
+                    schedules += len(batch)
+                    batch = []
+            RevisionSchedule.objects.bulk_create(batch)
+            schedules += len(batch)
+
+    rebuild_study_calendar(user_ids=[user.pk for user in users])
+    return {
+        "courses": 1,
+        "lessons": len(lessons),
+        "cards": len(cards),
+        "users": len(users),
+        "study_sessions": sessions,
+        "revision_schedules": schedules,
+    }
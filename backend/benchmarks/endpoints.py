@@ -0,0 +1,313 @@
+"""
+Tracking and learning endpoints over synthetic data at several scales: wall
+time, query count and peak Python memory per request, plus `seed_content`.
+
+    python -m benchmarks.endpoints --scales small,medium --requests 200
+    python -m benchmarks.endpoints --scales small --baseline bench-results/endpoints-<earlier>.json
+
+For every scale (`benchmarks.datagen.SCALES`) the database is rebuilt with
+`generate`, then each endpoint is driven through the WSGI app as randomly
+picked generated users (same `--seed`, same users): a timed pass, then one
+request each with a query counter and under `tracemalloc` (kept apart so
+neither skews the timings). `seed_content` runs against a synthetic seed
+file of the scale's lessons and cards, once from empty and once again over
+its own output.
+
+Results are written as JSON (`--output`, default
+`bench-results/endpoints-<timestamp>.json`) together with the git commit,
+Python/Django versions, database vendor and scale parameters, so runs can be
+compared over time; `--baseline` prints the p50 and query-count change
+against an earlier file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from .harness import LatencyStats, access_token_for, print_table, setup_django, wsgi_request
+
+
+RESULTS_DIR = Path("bench-results")
+SEED_COURSE_SLUG = "bench-seed-course"
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _reset_database() -> None:
+    from django.core.management import call_command
+    from django.db import DEFAULT_DB_ALIAS
+
+    from apps.learning.services.search import refresh_search_index
+
+    call_command("flush", verbosity=0, interactive=False)
+    refresh_search_index(DEFAULT_DB_ALIAS)
+
+
+@contextmanager
+def _count_queries():
+    """
+    Count queries on the default connection. Unlike `CaptureQueriesContext`
+    this survives the `reset_queries` Django runs at the start of a request.
+    """
+    from django.db import connection
+
+    counter = {"queries": 0}
+
+    def wrapper(execute, sql, params, many, context):
+        counter["queries"] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield counter
+
+
+def _peak_kib(func) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def _clients(count: int, seed: int) -> list[dict]:
+    """Tokens and an open study session for `count` random generated users."""
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from apps.tracking.models import StudySession
+
+    from .datagen import EMAIL_PREFIX
+
+    users = list(get_user_model().objects.filter(email__startswith=EMAIL_PREFIX).order_by("email"))
+    chosen = random.Random(seed).sample(users, min(count, len(users)))
+    now = timezone.now()
+    sessions = StudySession.objects.bulk_create(
+        StudySession(user=user, context="bench", last_ping_at=now) for user in chosen
+    )
+    return [
+        {"token": access_token_for(user), "session_id": str(session.id), "seq": 0}
+        for user, session in zip(chosen, sessions)
+    ]
+
+
+def _endpoints(lesson_slug: str) -> dict:
+    """name -> (method, path, payload factory)."""
+
+    def ping(client):
+        client["seq"] += 1
+        return {"session_id": client["session_id"], "active_seconds": 5, "seq": client["seq"]}
+
+    return {
+        "dashboard": ("GET", "/api/dashboard/", None),
+        "revisions_due": ("GET", "/api/revisions/due/", None),
+        "study_session_ping": ("POST", "/api/study-sessions/ping/", ping),
+        "lesson_list": ("GET", "/api/lessons/", None),
+        "lesson_cards": ("GET", f"/api/lessons/{lesson_slug}/cards/", None),
+    }
+
+
+def _measure_endpoint(application, name: str, endpoint, clients: list[dict], requests: int, rng) -> dict:
+    method, path, payload_for = endpoint
+
+    def call(client) -> int:
+        payload = payload_for(client) if payload_for else None
+        status, _ = wsgi_request(application, method, path, payload=payload, token=client["token"], keep_body=False)
+        return status
+
+    call(clients[0])  # warm up URL resolution, serializers and caches
+
+    stats = LatencyStats(name=name)
+    started = time.perf_counter()
+    for _ in range(requests):
+        client = rng.choice(clients)
+        begun = time.perf_counter()
+        status = call(client)
+        stats.record(time.perf_counter() - begun, ok=status < 400)
+    stats.elapsed_seconds = time.perf_counter() - started
+
+    with _count_queries() as counter:
+        call(rng.choice(clients))
+    peak_kib = _peak_kib(lambda: call(rng.choice(clients)))
+
+    return {**stats.summary(), "queries": counter["queries"], "peak_kib": peak_kib}
+
+
+def _seed_file(directory: Path, lessons: int, cards: int) -> Path:
+    path = directory / "seed.json"
+    seed = {
+        "course": {"slug": SEED_COURSE_SLUG, "title": "Seed benchmark", "description": "Synthetic seed"},
+        "lessons": [
+            {
+                "slug": f"bench-seed-lesson-{i}",
+                "title": f"Seed lesson {i}",
+                "order": i,
+                "cards": [
+                    {
+                        "english": f"seed word {i}-{j}",
+                        "uzbek": f"so‘z {i}-{j}",
+                        "pronunciation": f"[siːd {j}]",
+                        "mnemonic_example": f"Example sentence {j}.",
+                        "translation": f"Tarjima {j}.",
+                    }
+                    for j in range(cards)
+                ],
+            }
+            for i in range(lessons)
+        ],
+    }
+    path.write_text(json.dumps(seed, ensure_ascii=False), encoding="utf8")
+    return path
+
+
+def _measure_seed_content(lessons: int, cards: int) -> list[dict]:
+    from django.core.management import call_command
+
+    from apps.learning.models import Course
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = _seed_file(Path(directory), lessons, cards)
+
+        def seed() -> None:
+            call_command("seed_content", path=str(path), stdout=io.StringIO())
+
+        def from_empty() -> None:
+            Course.objects.filter(slug=SEED_COURSE_SLUG).delete()
+
+        # Each phase runs twice from the same starting state: once timed and
+        # counted, once under tracemalloc.
+        for name, prepare in (("seed_content_initial", from_empty), ("seed_content_rerun", seed)):
+            prepare()
+            with _count_queries() as counter:
+                begun = time.perf_counter()
+                seed()
+                elapsed = time.perf_counter() - begun
+            prepare()
+            peak_kib = _peak_kib(seed)
+
+            stats = LatencyStats(name=name, elapsed_seconds=elapsed)
+            stats.record(elapsed, ok=True)
+            rows.append({**stats.summary(), "queries": counter["queries"], "peak_kib": peak_kib})
+    return rows
+
+
+def run_scale(name: str, *, requests: int, clients: int, seed: int) -> dict:
+    from config.wsgi import application
+
+    from .datagen import SCALES, generate, lesson_slug
+
+    scale = SCALES[name]
+    _reset_database()
+    begun = time.perf_counter()
+    counts = generate(scale)
+    generate_seconds = round(time.perf_counter() - begun, 2)
+
+    pool = _clients(clients, seed)
+    rng = random.Random(seed)
+    rows = [
+        _measure_endpoint(application, endpoint_name, endpoint, pool, requests, rng)
+        for endpoint_name, endpoint in _endpoints(lesson_slug(0)).items()
+    ]
+    rows.extend(_measure_seed_content(scale.lessons, scale.cards))
+    return {
+        "scale": name,
+        "params": scale.as_dict(),
+        "rows": counts,
+        "generate_seconds": generate_seconds,
+        "results": [{"scale": name, **row} for row in rows],
+    }
+
+
+def _metadata(args) -> dict:
+    import django
+    from django.db import connection
+
+    return {
+        "benchmark": "endpoints",
+        "timestamp": datetime.now(dt_timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "requests": args.requests,
+        "clients": args.clients,
+        "seed": args.seed,
+    }
+
+
+def _compare(results: list[dict], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf8"))
+    previous = {(row["scale"], row["name"]): row for run in baseline["scales"] for row in run["results"]}
+    for row in results:
+        before = previous.get((row["scale"], row["name"]))
+        if before is None:
+            row["p50_change"] = row["queries_change"] = "-"
+            continue
+        row["p50_change"] = f"{(row['p50_ms'] / before['p50_ms'] - 1) * 100:+.0f}%" if before["p50_ms"] else "-"
+        row["queries_change"] = f"{row['queries'] - before['queries']:+d}"
+    commit = (baseline["metadata"].get("git_commit") or "?")[:10]
+    print(f"compared with {baseline_path} (commit {commit}, {baseline['metadata']['timestamp']})")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="small,medium", help="Comma-separated names from datagen.SCALES.")
+    parser.add_argument("--requests", type=int, default=200, help="Timed requests per endpoint.")
+    parser.add_argument("--clients", type=int, default=20, help="Generated users the requests are spread over.")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for picking users.")
+    parser.add_argument("--output", type=Path, default=None, help="Where to write the JSON results.")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier results file to compare against.")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table.")
+    args = parser.parse_args(argv)
+
+    from .datagen import SCALES
+
+    names = [name.strip() for name in args.scales.split(",") if name.strip()]
+    unknown = sorted(set(names) - set(SCALES))
+    if unknown:
+        raise SystemExit(f"unknown scale(s): {', '.join(unknown)}; choose from {', '.join(SCALES)}")
+
+    setup_django()
+    report = {
+        "metadata": _metadata(args),
+        "scales": [run_scale(name, requests=args.requests, clients=args.clients, seed=args.seed) for name in names],
+    }
+
+    output = args.output or RESULTS_DIR / f"endpoints-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf8")
+
+    results = [row for run in report["scales"] for row in run["results"]]
+    columns = ["scale", "name", "requests", "errors", "p50_ms", "p95_ms", "p99_ms", "queries", "peak_kib"]
+    if args.baseline:
+        _compare(results, args.baseline)
+        columns += ["p50_change", "queries_change"]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(results, columns)
+        print(f"\nwrote {output}")
+
+
+if __name__ == "__main__":
+    main()
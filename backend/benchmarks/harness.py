@@ -0,0 +1,185 @@
+"""
+Shared helpers for the benchmark scripts: Django bootstrap, in-process WSGI/ASGI
+request drivers and latency statistics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import math
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+
+def setup_django(*, fresh_db: bool = True) -> None:
+    """
+    Configure Django with `benchmarks.settings` and migrate a clean database.
+    """
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+    from django.conf import settings
+
+    db = settings.DATABASES["default"]
+    if fresh_db and db["ENGINE"].endswith("sqlite3") and db["NAME"] != ":memory:":
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db['NAME']}{suffix}").unlink(missing_ok=True)
+
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0, interactive=False)
+    if fresh_db and not db["ENGINE"].endswith("sqlite3"):
+        call_command("flush", verbosity=0, interactive=False)
+
+
+def access_token_for(user) -> str:
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    return str(AccessToken.for_user(user))
+
+
+def _header_items(token: str | None, body: bytes) -> list[tuple[bytes, bytes]]:
+    headers = [
+        (b"host", b"testserver"),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return headers
+
+
+async def asgi_request(app, method: str, path: str, *, payload=None, token: str | None = None):
+    """
+    Drive an ASGI application in-process. Returns `(status, body_bytes)`.
+    """
+
+    body = json.dumps(payload).encode() if payload is not None else b""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": _header_items(token, body),
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {"status": None, "body": []}
+
+    async def receive():
+        if pending:
+            return pending.pop(0)
+        # Django listens for `http.disconnect` while the view runs; never send it.
+        await asyncio.Future()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], b"".join(response["body"])
+
+
+def wsgi_request(app, method: str, path: str, *, payload=None, token: str | None = None, keep_body: bool = True):
+    """
+    Drive a WSGI application in-process. Returns `(status, body_bytes)`, or
+    `(status, body_length)` with `keep_body=False` (the body is consumed chunk
+    by chunk and dropped, as a server writing it to a socket would).
+    """
+
+    body = json.dumps(payload).encode() if payload is not None else b""
+    path, _, query = path.partition("?")
+    environ = {
+        "REQUEST_METHOD": method,
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "HTTP_HOST": "testserver",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if token:
+        environ["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+
+    status_holder = {}
+
+    def start_response(status, headers, exc_info=None):
+        status_holder["status"] = int(status.split(" ", 1)[0])
+
+    chunks = app(environ, start_response)
+    try:
+        content = b"".join(chunks) if keep_body else sum(len(chunk) for chunk in chunks)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return status_holder["status"], content
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile; `samples` need not be sorted.
+    """
+
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class LatencyStats:
+    name: str
+    requests: int = 0
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+    latencies_ms: list[float] = field(default_factory=list, repr=False)
+
+    def record(self, latency_seconds: float, ok: bool) -> None:
+        self.requests += 1
+        self.latencies_ms.append(latency_seconds * 1000)
+        if not ok:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        data = asdict(self)
+        data.pop("latencies_ms")
+        data["rps"] = round(self.requests / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0
+        for pct in (50, 95, 99):
+            data[f"p{pct}_ms"] = round(percentile(self.latencies_ms, pct), 2)
+        return data
+
+
+def print_table(rows: list[dict], columns: list[str]) -> None:
+    widths = {col: max(len(col), *(len(str(row.get(col, ""))) for row in rows)) for col in columns}
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print("  ".join(str(row.get(col, "")).ljust(widths[col]) for col in columns))
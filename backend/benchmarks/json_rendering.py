@@ -0,0 +1,145 @@
+"""
+JSON rendering of large list endpoints: DRF's stdlib renderer vs the orjson
+renderer vs the orjson renderer streaming the list, end to end through WSGI.
+
+    python -m benchmarks.json_rendering --lessons 500 --cards 5000 --requests 50
+
+For each endpoint and mode: throughput and latency, peak traced memory per
+request (tracemalloc, measured in a separate pass since tracing slows
+everything down), and the time spent encoding the already-serialized list
+alone. Bodies are checked to be byte-identical across modes (these endpoints
+have no float fields, whose rare differences `apps.core.renderers` lists).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from .harness import LatencyStats, access_token_for, print_table, setup_django, wsgi_request
+
+
+def _seed(lessons: int, cards: int) -> str:
+    from apps.learning.models import Course, Lesson, LessonCard
+
+    course = Course.objects.create(title="Bench", slug="bench")
+    created = Lesson.objects.bulk_create(
+        Lesson(course=course, title=f"Lesson {i}", slug=f"bench-{i}", order=i, cover_image_path=f"/picture/{i}.png")
+        for i in range(lessons)
+    )
+    big = created[0]
+    LessonCard.objects.bulk_create(
+        (
+            LessonCard(
+                lesson=big,
+                order=i,
+                english=f"word {i}",
+                uzbek=f"so‘z {i}",
+                pronunciation=f"[wɜːd {i}]",
+                mnemonic_example="Example sentence — with “quotes” and ümlauts. " * 3,
+                translation=f"tarjima {i}",
+            )
+            for i in range(cards)
+        ),
+        batch_size=1000,
+    )
+    return big.slug
+
+
+MODES = ("drf", "orjson", "orjson+stream")
+
+
+def _configure(mode: str) -> None:
+    from rest_framework.renderers import JSONRenderer as StdlibJSONRenderer
+
+    from apps.core.renderers import JSONRenderer
+    from apps.learning.views import LessonCardsView, LessonListView
+
+    for view in (LessonListView, LessonCardsView):
+        view.renderer_classes = [StdlibJSONRenderer if mode == "drf" else JSONRenderer]
+        view.stream_lists = mode == "orjson+stream"
+
+
+def _encode_ms(data: list, mode: str, repeat: int = 20) -> float:
+    from rest_framework.renderers import JSONRenderer as StdlibJSONRenderer
+
+    from apps.core.renderers import JSONRenderer
+
+    renderer = StdlibJSONRenderer() if mode == "drf" else JSONRenderer()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        if mode == "orjson+stream":
+            for _chunk in renderer.render_list_stream(iter(data), "application/json"):
+                pass
+        else:
+            renderer.render(data, "application/json")
+    return round((time.perf_counter() - started) / repeat * 1000, 2)
+
+
+def _run(application, token: str, path: str, mode: str, requests: int) -> dict:
+    stats = LatencyStats(name=mode)
+    started = time.perf_counter()
+    size = 0
+    for _ in range(requests):
+        begun = time.perf_counter()
+        status, size = wsgi_request(application, "GET", path, token=token, keep_body=False)
+        stats.record(time.perf_counter() - begun, ok=status == 200)
+    stats.elapsed_seconds = time.perf_counter() - started
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(max(3, requests // 10)):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        wsgi_request(application, "GET", path, token=token, keep_body=False)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return {**stats.summary(), "body_kb": round(size / 1024, 1), "peak_kb": round(max(peaks) / 1024, 1)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lessons", type=int, default=500, help="Lessons listed by /api/lessons/.")
+    parser.add_argument("--cards", type=int, default=5000, help="Cards in the lesson behind /api/lessons/<slug>/cards/.")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint and mode.")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+
+    from config.wsgi import application
+
+    slug = _seed(args.lessons, args.cards)
+    token = access_token_for(get_user_model().objects.create(email="bench-json@example.com", password="!"))
+    endpoints = {"lessons": "/api/lessons/", "cards": f"/api/lessons/{slug}/cards/"}
+
+    rows = []
+    for endpoint, path in endpoints.items():
+        bodies = set()
+        for mode in MODES:
+            _configure(mode)
+            body = wsgi_request(application, "GET", path, token=token)[1]
+            bodies.add(body)
+            rows.append(
+                {
+                    "endpoint": endpoint,
+                    **_run(application, token, path, mode, args.requests),
+                    "encode_ms": _encode_ms(json.loads(body), mode),
+                }
+            )
+        if len(bodies) != 1:
+            raise SystemExit(f"{path}: response bodies differ between modes")
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows, ["endpoint", "name", "requests", "errors", "rps", "p50_ms", "p95_ms", "encode_ms", "body_kb", "peak_kb"])
+
+
+if __name__ == "__main__":
+    main()
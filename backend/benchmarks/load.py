@@ -0,0 +1,345 @@
+"""
+End-to-end load from simulated learners: the whole traffic mix at once
+instead of one endpoint at a time.
+
+    python -m benchmarks.load --learners 200 --duration 60
+    python -m benchmarks.load --url http://127.0.0.1:8000 --learners 50 --duration 60
+
+Each learner is an asyncio task walking the state machine in `TRANSITIONS`:
+the dashboard (stats + due revisions), browsing lessons, a study session
+(start, cards, a ping every `PING_INTERVAL` from the open tab, maybe
+completing the lesson, stop), revising (a whole due lesson, or a batch from
+the card-level queue) or away. Think times are real-world seconds multiplied
+by `--time-scale`, and access tokens are refreshed through `/api/auth/refresh/`
+(rotating the refresh token) once they reach the configured access token
+lifetime on that same scaled clock, or on a 401.
+
+By default the requests go to `config.asgi.application` in-process. With
+`--url` they go over HTTP to a server started with the same settings, e.g.
+`DJANGO_SETTINGS_MODULE=benchmarks.settings uvicorn config.asgi:application`
+(the learners are generated into its database first).
+
+Reported per endpoint: throughput, p50/p95/p99 latency and, in-process,
+database queries per request and per second. Queries are attributed to the
+endpoint through a context variable that follows the request into Django's
+sync threads.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextvars
+import http.client
+import json
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from urllib.parse import urlsplit
+
+from .harness import LatencyStats, asgi_request, print_table, setup_django
+
+
+PING_INTERVAL = 30
+THINK_SECONDS = (2, 10)
+AWAY_SECONDS = (120, 900)
+PINGS_PER_SESSION = (3, 12)
+COMPLETE_CHANCE = 0.6
+CORRECT_CHANCE = 0.8
+
+# state -> [(next state, weight)]
+TRANSITIONS = {
+    "dashboard": [("study", 45), ("revise", 30), ("browse", 15), ("away", 10)],
+    "browse": [("study", 60), ("dashboard", 40)],
+    "study": [("dashboard", 60), ("revise", 20), ("away", 20)],
+    "revise": [("dashboard", 55), ("study", 30), ("away", 15)],
+    "away": [("dashboard", 100)],
+}
+
+_endpoint = contextvars.ContextVar("benchmark_endpoint", default=None)
+
+
+class QueryCounter:
+    """
+    Counts queries per endpoint on every database connection, including the
+    ones Django opens later in its sync threads (`connection_created`).
+    """
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        name = _endpoint.get()
+        if name is not None:
+            with self._lock:
+                self.counts[name] += 1
+        return execute(sql, params, many, context)
+
+    def _attach(self, sender, connection, **kwargs) -> None:
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def install(self) -> None:
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        connection_created.connect(self._attach, weak=False)
+        for connection in connections.all():
+            self._attach(None, connection)
+
+
+class AsgiTransport:
+    def __init__(self):
+        from config.asgi import application
+
+        self.application = application
+
+    async def request(self, method: str, path: str, payload=None, token: str | None = None):
+        return await asgi_request(self.application, method, path, payload=payload, token=token)
+
+
+class HttpTransport:
+    """Blocking `http.client` calls on a thread pool, one connection per call."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+
+    def _request(self, method: str, path: str, payload, token):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    async def request(self, method: str, path: str, payload=None, token: str | None = None):
+        return await asyncio.to_thread(self._request, method, path, payload, token)
+
+
+class Learner:
+    def __init__(self, run: "LoadRun", user, lesson_slugs: list[str], seed: int):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        refresh = RefreshToken.for_user(user)
+        self.run = run
+        self.access, self.refresh = str(refresh.access_token), str(refresh)
+        self.issued_at = 0.0
+        self.lesson_slugs = lesson_slugs
+        self.rng = random.Random(seed)
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds * self.run.time_scale)
+
+    async def think(self) -> None:
+        await self.sleep(self.rng.uniform(*THINK_SECONDS))
+
+    async def call(self, name: str, method: str, path: str, payload=None):
+        if self.run.clock() - self.issued_at >= self.run.access_lifetime:
+            await self.refresh_tokens()
+        status, body = await self.run.send(name, method, path, payload, self.access)
+        if status == 401:
+            await self.refresh_tokens()
+            status, body = await self.run.send(name, method, path, payload, self.access)
+        return status, body
+
+    async def refresh_tokens(self) -> None:
+        status, body = await self.run.send("auth_refresh", "POST", "/api/auth/refresh/", {"refresh": self.refresh})
+        if status == 200:
+            data = json.loads(body)
+            self.access, self.refresh = data["access"], data.get("refresh", self.refresh)
+            self.issued_at = self.run.clock()
+
+    async def dashboard(self) -> None:
+        await self.call("dashboard", "GET", "/api/dashboard/")
+        await self.call("revisions_due", "GET", "/api/revisions/due/")
+
+    async def browse(self) -> None:
+        await self.call("lesson_list", "GET", "/api/lessons/")
+        await self.think()
+        await self.call("lesson_cards", "GET", f"/api/lessons/{self.rng.choice(self.lesson_slugs)}/cards/")
+
+    async def study(self) -> None:
+        slug = self.rng.choice(self.lesson_slugs)
+        status, body = await self.call("study_session_start", "POST", "/api/study-sessions/start/", {"context": slug})
+        if status != 201:
+            return
+        session_id = json.loads(body)["id"]
+        await self.call("lesson_cards", "GET", f"/api/lessons/{slug}/cards/")
+        for seq in range(1, self.rng.randint(*PINGS_PER_SESSION) + 1):
+            await self.sleep(PING_INTERVAL)
+            payload = {"session_id": session_id, "active_seconds": PING_INTERVAL, "seq": seq}
+            await self.call("study_session_ping", "POST", "/api/study-sessions/ping/", payload)
+        if self.rng.random() < COMPLETE_CHANCE:
+            await self.call("lesson_complete", "POST", f"/api/lessons/{slug}/complete/")
+        await self.call("study_session_stop", "POST", "/api/study-sessions/stop/", {"session_id": session_id})
+
+    async def revise(self) -> None:
+        """Half the time a whole lesson (flashcards, then the schedule), otherwise the card-level queue."""
+        if self.rng.random() < 0.5:
+            status, body = await self.call("revision_session", "GET", "/api/revisions/session/")
+            schedules = json.loads(body) if status == 200 else []
+            if schedules:
+                await self.think()
+                path = f"/api/revisions/{schedules[0]['id']}/review/"
+                await self.call("revision_review", "POST", path, {"version": schedules[0]["version"]})
+                return
+
+        status, body = await self.call("revision_cards_due", "GET", "/api/revisions/cards/due/?limit=20")
+        cards = json.loads(body) if status == 200 else []
+        if cards:
+            await self.think()
+            results = [{"card_id": due["card"]["id"], "correct": self.rng.random() < CORRECT_CHANCE} for due in cards]
+            await self.call("revision_cards_review", "POST", "/api/revisions/cards/review/", {"results": results})
+
+    async def away(self) -> None:
+        await self.sleep(self.rng.uniform(*AWAY_SECONDS))
+
+    async def live(self, deadline: float) -> None:
+        await self.sleep(self.rng.uniform(0, self.run.ramp_seconds))
+        state = "dashboard"
+        while time.perf_counter() < deadline:
+            await getattr(self, state)()
+            await self.think()
+            targets, weights = zip(*TRANSITIONS[state])
+            state = self.rng.choices(targets, weights)[0]
+
+
+class LoadRun:
+    def __init__(self, transport, *, time_scale: float, ramp_seconds: float, access_lifetime: float, queries=None):
+        self.transport = transport
+        self.time_scale = time_scale
+        self.ramp_seconds = ramp_seconds
+        # Token age is measured on the scaled clock, like the think times.
+        self.access_lifetime = access_lifetime
+        self.queries = queries
+        self.stats: dict[str, LatencyStats] = {}
+        self.started = time.perf_counter()
+
+    def clock(self) -> float:
+        """Simulated seconds since the start of the run."""
+        return (time.perf_counter() - self.started) / self.time_scale
+
+    async def send(self, name: str, method: str, path: str, payload, token: str | None = None):
+        stats = self.stats.setdefault(name, LatencyStats(name=name))
+        _endpoint.set(name)
+        begun = time.perf_counter()
+        try:
+            status, body = await self.transport.request(method, path, payload=payload, token=token)
+        except OSError:
+            status, body = 599, b""
+        finally:
+            _endpoint.set(None)
+        stats.record(time.perf_counter() - begun, ok=status < 400)
+        return status, body
+
+    def rows(self, elapsed: float) -> list[dict]:
+        rows = []
+        for name, stats in sorted(self.stats.items()):
+            stats.elapsed_seconds = elapsed
+            row = stats.summary()
+            if self.queries is not None:
+                queries = self.queries.counts[name]
+                row["queries_per_request"] = round(queries / stats.requests, 1)
+                row["queries_per_second"] = round(queries / elapsed, 1)
+            rows.append(row)
+
+        total = LatencyStats(name="all", elapsed_seconds=elapsed)
+        for stats in self.stats.values():
+            total.requests += stats.requests
+            total.errors += stats.errors
+            total.latencies_ms.extend(stats.latencies_ms)
+        row = total.summary()
+        if self.queries is not None:
+            queries = sum(self.queries.counts.values())
+            row["queries_per_request"] = round(queries / total.requests, 1) if total.requests else 0.0
+            row["queries_per_second"] = round(queries / elapsed, 1)
+        rows.append(row)
+        return rows
+
+
+def _prepare(learners: int, scale_name: str, fresh_db: bool) -> tuple[list, list[str]]:
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    from .datagen import EMAIL_PREFIX, SCALES, clear, generate, lesson_slug
+
+    scale = replace(SCALES[scale_name], users=learners)
+    if not fresh_db:
+        clear()
+    generate(scale)
+    users = list(get_user_model().objects.filter(email__startswith=EMAIL_PREFIX).order_by("email"))
+    connection.close()
+    return users, [lesson_slug(i) for i in range(scale.lessons)]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--learners", type=int, default=100, help="Simulated learners (one asyncio task each).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Wall-clock seconds to run.")
+    parser.add_argument(
+        "--time-scale", type=float, default=0.01, help="Multiplier for think times (0.01: a 30 s ping every 0.3 s)."
+    )
+    parser.add_argument("--scale", default="small", help="datagen preset for lessons, cards and history.")
+    parser.add_argument("--url", default=None, help="Base URL of a running server instead of the in-process app.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table.")
+    args = parser.parse_args(argv)
+
+    # A server may have the database open: keep the file and replace only generated rows.
+    setup_django(fresh_db=args.url is None)
+
+    from django.conf import settings
+    from django.db import connection
+
+    users, lesson_slugs = _prepare(args.learners, args.scale, fresh_db=args.url is None)
+
+    queries = None
+    if args.url:
+        transport = HttpTransport(args.url)
+    else:
+        transport = AsgiTransport()
+        queries = QueryCounter()
+        queries.install()
+
+    run = LoadRun(
+        transport,
+        time_scale=args.time_scale,
+        ramp_seconds=args.duration / 10 / args.time_scale,
+        access_lifetime=settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds(),
+        queries=queries,
+    )
+    rng = random.Random(args.seed)
+    learners = [Learner(run, user, lesson_slugs, seed=rng.getrandbits(32)) for user in users]
+    connection.close()
+
+    async def drive() -> float:
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max(4, args.learners)))
+        run.started = time.perf_counter()
+        deadline = run.started + args.duration
+        await asyncio.gather(*(learner.live(deadline) for learner in learners))
+        return time.perf_counter() - run.started
+
+    elapsed = asyncio.run(drive())
+    rows = run.rows(elapsed)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        columns = ["name", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"]
+        if queries is not None:
+            columns += ["queries_per_request", "queries_per_second"]
+        print_table(rows, columns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Account deletion: Django's `user.delete()` cascade vs the batched `purge_user`.
+
+    python -m benchmarks.purge --sessions 20000 --lessons 60 --batch-size 1000
+
+Two generated users get the same history (`--sessions` study sessions, a
+revision schedule for each of `--lessons` lessons, their study calendar and
+a few refresh tokens). One is deleted with `user.delete()`, the other with
+`purge_user`; for each the wall time, query count, peak Python memory
+(`tracemalloc`) and the longest single write transaction are reported. The
+last one is how long other writers may be kept waiting on the database lock.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from .harness import print_table, setup_django
+
+
+def _measure(run) -> dict:
+    """Time, queries, peak memory and longest transaction of `run()`."""
+    from django.db import connection
+
+    queries = 0
+    transaction = {"start": None, "longest": 0.0}
+
+    def wrapper(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    original_commit = connection.commit
+    original_set_autocommit = connection.set_autocommit
+
+    def set_autocommit(autocommit, *args, **kwargs):
+        if not autocommit:
+            transaction["start"] = time.perf_counter()
+        return original_set_autocommit(autocommit, *args, **kwargs)
+
+    def commit():
+        result = original_commit()
+        if transaction["start"] is not None:
+            transaction["longest"] = max(transaction["longest"], time.perf_counter() - transaction["start"])
+            transaction["start"] = None
+        return result
+
+    connection.set_autocommit, connection.commit = set_autocommit, commit
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(wrapper):
+            run()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        connection.set_autocommit, connection.commit = original_set_autocommit, original_commit
+    return {
+        "seconds": round(elapsed, 3),
+        "queries": queries,
+        "peak_kib": round(peak / 1024),
+        "longest_txn_ms": round(transaction["longest"] * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--lessons", type=int, default=60)
+    parser.add_argument("--cards", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from apps.accounts.services.purge import count_user_rows, purge_user
+
+    from .datagen import Scale, email_for, generate
+
+    scale = Scale(
+        users=2, lessons=args.lessons, cards=args.cards, sessions=args.sessions, lessons_per_user=args.lessons
+    )
+    generate(scale)
+    users = [get_user_model().objects.get(email=email_for(i)) for i in range(2)]
+    for user in users:
+        for _ in range(5):
+            RefreshToken.for_user(user)
+    rows = sum(count_user_rows(users[0].pk).values())
+
+    results = [
+        {"method": "user.delete()", "rows": rows, **_measure(users[0].delete)},
+        {
+            "method": f"purge_user (batch {args.batch_size})",
+            "rows": rows,
+            **_measure(lambda: purge_user(users[1].pk, batch_size=args.batch_size)),
+        },
+    ]
+    left = count_user_rows(users[1].pk)
+    if left:
+        raise SystemExit(f"rows left behind by purge_user: {dict(left)}")
+
+    if args.json:
+        print(json.dumps({"scale": scale.as_dict(), "results": results}, indent=2))
+    else:
+        print_table(results, ["method", "rows", "seconds", "queries", "peak_kib", "longest_txn_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Concurrent revision writes: versioned conditional UPDATEs vs the unguarded
+read-modify-write they replace.
+
+    python -m benchmarks.revision_contention --threads 8 --schedules 4 --reviews 50
+
+Each thread repeatedly loads a random schedule (out of `--schedules`, so
+fewer schedules means more contention), "works" for `--think-ms`, then
+reviews it. Stages are uncapped for the run (every interval is a day), so
+afterwards every schedule's stage must equal the number of reviews that
+succeeded on it. The unguarded mode shows the lost updates; the versioned
+mode must have none, and reports how many writes had to retry or gave up
+with a conflict.
+
+A second phase has all threads complete the same lesson for the same user
+at once, which must leave exactly one schedule.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+
+from .harness import LatencyStats, print_table, setup_django
+
+
+def _seed(schedules: int):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from apps.learning.models import Course, Lesson, LessonCard
+    from apps.tracking.models import RevisionSchedule
+
+    course = Course.objects.create(title="Bench", slug="bench")
+    lessons = Lesson.objects.bulk_create(
+        Lesson(course=course, title=f"Lesson {i}", slug=f"bench-{i}", order=i) for i in range(schedules + 1)
+    )
+    LessonCard.objects.bulk_create(
+        LessonCard(lesson=lesson, order=j, english=f"word {j}", uzbek="so‘z") for lesson in lessons for j in range(10)
+    )
+    user = get_user_model().objects.create(email="bench-contention@example.com", password="!")
+    now = timezone.now()
+    created = RevisionSchedule.objects.bulk_create(
+        RevisionSchedule(user=user, lesson=lesson, lesson_completed_at=now, next_review_at=now)
+        for lesson in lessons[:-1]
+    )
+    return user, lessons[-1], [schedule.pk for schedule in created]
+
+
+class _DailyIntervals:
+    def __getitem__(self, stage: int) -> timedelta:
+        return timedelta(days=1)
+
+
+@contextmanager
+def _uncapped_stages():
+    from apps.tracking.services import spaced_repetition
+
+    saved = spaced_repetition.MAX_STAGE, spaced_repetition.SRS_INTERVALS
+    spaced_repetition.MAX_STAGE, spaced_repetition.SRS_INTERVALS = 32767, _DailyIntervals()
+    try:
+        yield
+    finally:
+        spaced_repetition.MAX_STAGE, spaced_repetition.SRS_INTERVALS = saved
+
+
+def _unguarded_review(schedule, reviewed_at) -> None:
+    """The pre-versioning `mark_reviewed`: plain save of whatever was read."""
+    from apps.tracking.models import RevisionStatus
+    from apps.tracking.services import spaced_repetition
+
+    schedule.last_reviewed_at = reviewed_at
+    if schedule.stage >= spaced_repetition.MAX_STAGE:
+        schedule.status = RevisionStatus.COMPLETED
+        schedule.next_review_at = None
+    else:
+        schedule.stage += 1
+        schedule.next_review_at = reviewed_at + spaced_repetition.SRS_INTERVALS[schedule.stage]
+        schedule.status = RevisionStatus.SCHEDULED
+    schedule.save(update_fields=["last_reviewed_at", "stage", "next_review_at", "status", "updated_at"])
+
+
+def _reset(schedule_ids) -> None:
+    from django.utils import timezone
+
+    from apps.tracking.models import RevisionSchedule, RevisionStatus
+
+    RevisionSchedule.objects.filter(pk__in=schedule_ids).update(
+        stage=0, status=RevisionStatus.SCHEDULED, next_review_at=timezone.now(), last_reviewed_at=None, version=0
+    )
+
+
+def _run_reviews(mode: str, schedule_ids, threads: int, reviews: int, think_ms: float) -> dict:
+    from django.db import connection
+    from django.utils import timezone
+
+    from apps.tracking.models import RevisionSchedule
+    from apps.tracking.services import spaced_repetition
+    from apps.tracking.services.spaced_repetition import ScheduleConflict
+
+    _reset(schedule_ids)
+    stats = LatencyStats(name=mode)
+    applied: Counter = Counter()
+    outcomes: Counter = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    # Count the conditional writes that lost a race.
+    original = spaced_repetition.save_if_unchanged
+
+    def counting_save(*args, **kwargs):
+        saved = original(*args, **kwargs)
+        if not saved:
+            with lock:
+                outcomes["retried"] += 1
+        return saved
+
+    spaced_repetition.save_if_unchanged = counting_save
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        barrier.wait()
+        try:
+            for _ in range(reviews):
+                schedule_id = rng.choice(schedule_ids)
+                begun = time.perf_counter()
+                ok = True
+                try:
+                    schedule = RevisionSchedule.objects.get(pk=schedule_id)
+                    time.sleep(think_ms / 1000)
+                    if mode == "versioned":
+                        spaced_repetition.mark_reviewed(schedule, reviewed_at=timezone.now())
+                    else:
+                        _unguarded_review(schedule, timezone.now())
+                except ScheduleConflict:
+                    ok = False
+                    with lock:
+                        outcomes["conflicts"] += 1
+                except Exception:
+                    ok = False
+                    with lock:
+                        outcomes["errors"] += 1
+                with lock:
+                    stats.record(time.perf_counter() - begun, ok=ok)
+                    if ok:
+                        applied[schedule_id] += 1
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    stats.elapsed_seconds = time.perf_counter() - started
+    spaced_repetition.save_if_unchanged = original
+
+    stages = dict(RevisionSchedule.objects.filter(pk__in=schedule_ids).values_list("pk", "stage"))
+    lost = sum(applied[pk] - stage for pk, stage in stages.items())
+    return {
+        **stats.summary(),
+        "retried": outcomes["retried"] if mode == "versioned" else "-",
+        "conflicts": outcomes["conflicts"],
+        "lost_updates": lost,
+    }
+
+
+def _run_completions(user, lesson, threads: int) -> dict:
+    from django.db import connection
+
+    from apps.tracking.models import RevisionSchedule
+    from apps.tracking.services.spaced_repetition import create_or_reset_schedule
+
+    errors = Counter()
+    barrier = threading.Barrier(threads)
+
+    def worker() -> None:
+        barrier.wait()
+        try:
+            create_or_reset_schedule(schedule=None, user=user, lesson=lesson)
+        except Exception as exc:
+            errors[type(exc).__name__] += 1
+        finally:
+            connection.close()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    schedules = RevisionSchedule.objects.filter(user=user, lesson=lesson).count()
+    return {"threads": threads, "schedules": schedules, "errors": dict(errors)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--schedules", type=int, default=4, help="Schedules the threads compete for.")
+    parser.add_argument("--reviews", type=int, default=50, help="Reviews per thread.")
+    parser.add_argument("--think-ms", type=float, default=1.0, help="Pause between reading and writing a schedule.")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of tables.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    user, spare_lesson, schedule_ids = _seed(args.schedules)
+
+    with _uncapped_stages():
+        rows = [
+            _run_reviews(mode, schedule_ids, args.threads, args.reviews, args.think_ms)
+            for mode in ("unguarded", "versioned")
+        ]
+    completions = _run_completions(user, spare_lesson, args.threads)
+
+    if args.json:
+        print(json.dumps({"reviews": rows, "completions": completions}, indent=2))
+    else:
+        columns = ["name", "requests", "errors", "rps", "p50_ms", "p95_ms", "retried", "conflicts", "lost_updates"]
+        print_table(rows, columns)
+        print()
+        print(f"concurrent completions: {completions}")
+
+    if rows[1]["lost_updates"] or completions["schedules"] != 1 or completions["errors"]:
+        raise SystemExit("versioned writes lost updates or concurrent completion failed")
+
+
+if __name__ == "__main__":
+    main()
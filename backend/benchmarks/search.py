@@ -0,0 +1,124 @@
+"""
+Vocabulary search latency: autocomplete (in-process trie) and full-text search
+(database index vs trie fallback), end to end through the WSGI app.
+
+    python -m benchmarks.search --copies 20 --requests 500
+
+`--copies` multiplies the seeded vocabulary (each copy is a new lesson) to
+see how the indexes scale. Autocomplete must stay under 10 ms at p95.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from .harness import LatencyStats, access_token_for, print_table, setup_django, wsgi_request
+
+
+AUTOCOMPLETE_BUDGET_MS = 10.0
+
+
+def _seed(copies: int) -> list[str]:
+    from django.core.management import call_command
+
+    from apps.learning.models import Lesson, LessonCard
+    from apps.learning.services.search import refresh_search_index
+
+    call_command("seed_content", verbosity=0)
+    originals = list(LessonCard.objects.select_related("lesson").order_by("lesson__order", "order"))
+    for copy in range(1, copies):
+        lessons = {}
+        cards = []
+        for card in originals:
+            lesson = lessons.get(card.lesson_id)
+            if lesson is None:
+                lesson = lessons[card.lesson_id] = Lesson.objects.create(
+                    course_id=card.lesson.course_id,
+                    title=f"{card.lesson.title} {copy}",
+                    slug=f"{card.lesson.slug}-{copy}",
+                    order=card.lesson.order + copy * 100,
+                )
+            cards.append(
+                LessonCard(
+                    lesson=lesson,
+                    order=card.order,
+                    english=card.english,
+                    uzbek=card.uzbek,
+                    pronunciation=card.pronunciation,
+                    translation=card.translation,
+                )
+            )
+        LessonCard.objects.bulk_create(cards, batch_size=500)
+    refresh_search_index("default")
+
+    words = sorted({word for card in originals for word in (card.english.split() + card.uzbek.split()) if len(word) > 2})
+    return words
+
+
+def _run(application, token: str, path_for, words: list[str], requests: int, name: str) -> dict:
+    rng = random.Random(7)
+    stats = LatencyStats(name=name)
+    started = time.perf_counter()
+    for _ in range(requests):
+        word = rng.choice(words)
+        begun = time.perf_counter()
+        status, _ = wsgi_request(application, "GET", path_for(word), token=token)
+        stats.record(time.perf_counter() - begun, ok=status == 200)
+    stats.elapsed_seconds = time.perf_counter() - started
+    return stats.summary()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=10, help="Copies of the seeded vocabulary.")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario.")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from urllib.parse import quote
+
+    from django.contrib.auth import get_user_model
+
+    from apps.learning.models import LessonCard
+    from apps.learning.services import search
+    from config.wsgi import application
+
+    words = _seed(args.copies)
+    token = access_token_for(get_user_model().objects.create(email="bench-search@example.com", password="!"))
+    backend = search.search_backend()
+
+    rows = [
+        {
+            "cards": LessonCard.objects.count(),
+            **_run(application, token, lambda w: f"/api/search/autocomplete/?q={quote(w[:2])}", words, args.requests, "autocomplete"),
+        },
+        {
+            "cards": LessonCard.objects.count(),
+            **_run(application, token, lambda w: f"/api/search/?q={quote(w[:4])}", words, args.requests, f"search ({backend})"),
+        },
+    ]
+
+    # Same queries against the trie fallback.
+    search.search_backend = lambda alias=None: "trie"
+    rows.append(
+        {
+            "cards": LessonCard.objects.count(),
+            **_run(application, token, lambda w: f"/api/search/?q={quote(w[:4])}", words, args.requests, "search (trie)"),
+        }
+    )
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows, ["name", "cards", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"])
+    if rows[0]["p95_ms"] > AUTOCOMPLETE_BUDGET_MS:
+        print(f"\nAutocomplete p95 {rows[0]['p95_ms']} ms exceeds {AUTOCOMPLETE_BUDGET_MS} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+DRF `RevisionScheduleSerializer` vs the `.values()`-based `REVISION_SCHEDULE_ROWS`
+for a user's revision queue, at several queue sizes.
+
+    python -m benchmarks.serializers --sizes 10 100 1000 --repeat 50
+
+For each size: the query + serialize + render time of both paths, the
+serialize-only time, and a check that both render byte-identical JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from .harness import print_table, setup_django
+
+
+def _seed(size: int):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from apps.learning.models import Course, Lesson
+    from apps.tracking.models import RevisionSchedule, RevisionStatus
+
+    course = Course.objects.create(title=f"Bench {size}", slug=f"bench-{size}")
+    lessons = Lesson.objects.bulk_create(
+        Lesson(
+            course=course,
+            title=f"Lesson {i}",
+            slug=f"bench-{size}-{i}",
+            order=i,
+            cover_image_path=f"/picture/lesson-{i}.png",
+        )
+        for i in range(size)
+    )
+    # Every other lesson has generated cover variants, as after build_lesson_images.
+    variants = {
+        "source": "x",
+        "width": 350,
+        "height": 199,
+        "variants": {ext: [[160, f"l-160w.abc.{ext}"], [350, f"l-350w.def.{ext}"]] for ext in ("avif", "webp", "jpeg")},
+    }
+    Lesson.objects.filter(id__in=[lesson.id for lesson in lessons[::2]]).update(cover_image_variants=variants)
+
+    user = get_user_model().objects.create(email=f"bench-serializers-{size}@example.com", password="!")
+    now = timezone.now()
+    RevisionSchedule.objects.bulk_create(
+        RevisionSchedule(
+            user=user,
+            lesson=lesson,
+            lesson_completed_at=now - timedelta(days=i % 30, microseconds=i),
+            stage=i % 5,
+            next_review_at=None if i % 7 == 0 else now + timedelta(hours=i - size // 2, microseconds=i),
+            last_reviewed_at=None if i % 3 == 0 else now - timedelta(hours=i),
+            status=RevisionStatus.COMPLETED if i % 7 == 0 else RevisionStatus.SCHEDULED,
+        )
+        for i, lesson in enumerate(lessons)
+    )
+    return user
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def _compare(user, request, repeat: int) -> dict:
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.tracking.models import RevisionSchedule
+    from apps.tracking.serializers import REVISION_SCHEDULE_ROWS, RevisionScheduleSerializer
+
+    renderer = JSONRenderer()
+    context = {"request": request}
+    queryset = RevisionSchedule.objects.filter(user=user)
+
+    def drf():
+        return renderer.render(RevisionScheduleSerializer(list(queryset.select_related("lesson")), many=True, context=context).data)
+
+    def rows():
+        return renderer.render(REVISION_SCHEDULE_ROWS.many(REVISION_SCHEDULE_ROWS.values(queryset), context))
+
+    if drf() != rows():
+        raise SystemExit(f"Output differs at {queryset.count()} rows")
+
+    instances = list(queryset.select_related("lesson"))
+    values = list(REVISION_SCHEDULE_ROWS.values(queryset))
+    drf_ms = _time(drf, repeat)
+    rows_ms = _time(rows, repeat)
+    drf_serialize_ms = _time(lambda: RevisionScheduleSerializer(instances, many=True, context=context).data, repeat)
+    rows_serialize_ms = _time(lambda: REVISION_SCHEDULE_ROWS.many(values, context), repeat)
+    return {
+        "rows": len(values),
+        "drf_ms": round(drf_ms, 3),
+        "values_ms": round(rows_ms, 3),
+        "speedup": round(drf_ms / rows_ms, 1),
+        "drf_serialize_ms": round(drf_serialize_ms, 3),
+        "values_serialize_ms": round(rows_serialize_ms, 3),
+        "serialize_speedup": round(drf_serialize_ms / rows_serialize_ms, 1),
+        "identical": True,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Revision queue sizes.")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed runs per measurement (median is reported).")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    from django.test import RequestFactory
+
+    request = RequestFactory().get("/api/dashboard/")
+    rows = [_compare(_seed(size), request, args.repeat) for size in args.sizes]
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(
+            rows,
+            [
+                "rows",
+                "drf_ms",
+                "values_ms",
+                "speedup",
+                "drf_serialize_ms",
+                "values_serialize_ms",
+                "serialize_speedup",
+                "identical",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import tempfile
+from pathlib import Path
+
+from config.settings.base import *  # noqa: F403
+from config.settings.base import REST_FRAMEWORK, SQLITE_PRAGMAS, SQLITE_TUNING, env
+from config.sqlite import tune_sqlite_databases
+
+
+DEBUG = False
+
+ALLOWED_HOSTS = ["*"]
+
+DATABASES = {
+    "default": env.db(
+        "BENCH_DATABASE_URL",
+        default=f"sqlite:///{Path(tempfile.gettempdir()) / 'usolve-bench.sqlite3'}",
+    ),
+}
+if SQLITE_TUNING:
+    tune_sqlite_databases(DATABASES, SQLITE_PRAGMAS)
+
+# Benchmarks create many users; hashing cost is not what we measure.
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_THROTTLE_CLASSES": (),
+}
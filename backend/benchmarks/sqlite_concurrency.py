@@ -0,0 +1,207 @@
+"""
+Concurrent tracking writes on SQLite: stock connection settings vs the
+tuned mode (`config.sqlite`: WAL, busy timeout, IMMEDIATE transactions,
+in-process write queueing).
+
+    python -m benchmarks.sqlite_concurrency --workers 1,4 --threads 8 --requests 300
+
+Each worker is a separate process running `--threads` threads against the
+WSGI application, like a threaded gunicorn worker. Every thread owns a study
+session and sends a mix of 80% pings, 10% dashboard loads and 10% lesson
+completions. Reported per mode and worker count: throughput, latency, and
+errors (mostly HTTP 500 from "database is locked").
+
+SQLite only (the default `BENCH_DATABASE_URL`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+from .harness import LatencyStats, access_token_for, print_table, setup_django, wsgi_request
+
+
+MODES = {
+    "stock": {"SQLITE_TUNING": "0", "SQLITE_SERIALIZE_WRITES": "0"},
+    "tuned": {"SQLITE_TUNING": "1", "SQLITE_SERIALIZE_WRITES": "1"},
+}
+LESSONS = 10
+
+
+def _email(worker: int, thread: int) -> str:
+    return f"bench-sqlite-{worker}-{thread}@example.com"
+
+
+def _seed(workers: int, threads: int) -> None:
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from apps.learning.models import Course, Lesson, LessonCard
+    from apps.tracking.models import StudySession
+
+    course = Course.objects.create(title="Bench", slug="bench")
+    lessons = Lesson.objects.bulk_create(
+        Lesson(course=course, title=f"Lesson {i}", slug=f"bench-{i}", order=i) for i in range(LESSONS)
+    )
+    LessonCard.objects.bulk_create(
+        LessonCard(lesson=lesson, order=j, english=f"word {j}", uzbek="so‘z") for lesson in lessons for j in range(20)
+    )
+    User = get_user_model()
+    users = User.objects.bulk_create(
+        User(email=_email(w, t), password="!") for w in range(workers) for t in range(threads)
+    )
+    StudySession.objects.bulk_create(StudySession(user=user, last_ping_at=timezone.now()) for user in users)
+
+
+def _set_journal_mode(path: str, mode: str) -> None:
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute(f"PRAGMA journal_mode={mode}")
+    finally:
+        connection.close()
+
+
+def run_child(worker: int, threads: int, requests: int, seq_base: int, start_at: float) -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    import django
+
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    from apps.tracking.models import StudySession
+    from config.wsgi import application
+
+    clients = []
+    for thread in range(threads):
+        user = get_user_model().objects.get(email=_email(worker, thread))
+        session_id = str(StudySession.objects.filter(user=user).values_list("id", flat=True).get())
+        clients.append((access_token_for(user), session_id))
+    connection.close()
+
+    stats = LatencyStats(name=f"worker-{worker}")
+    lock = threading.Lock()
+
+    def client(token: str, session_id: str) -> None:
+        try:
+            for i in range(requests):
+                kind = i % 10
+                begun = time.perf_counter()
+                if kind == 0:
+                    status, _ = wsgi_request(application, "GET", "/api/dashboard/", token=token, keep_body=False)
+                elif kind == 1:
+                    path = f"/api/lessons/bench-{i % LESSONS}/complete/"
+                    status, _ = wsgi_request(application, "POST", path, token=token, keep_body=False)
+                else:
+                    payload = {"session_id": session_id, "active_seconds": 5, "seq": seq_base + i}
+                    status, _ = wsgi_request(
+                        application, "POST", "/api/study-sessions/ping/", payload=payload, token=token, keep_body=False
+                    )
+                with lock:
+                    stats.record(time.perf_counter() - begun, ok=status < 400)
+        finally:
+            connection.close()
+
+    time.sleep(max(0.0, start_at - time.time()))
+    started = time.perf_counter()
+    pool = [threading.Thread(target=client, args=pair) for pair in clients]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    stats.elapsed_seconds = time.perf_counter() - started
+    print(json.dumps({"elapsed": stats.elapsed_seconds, "errors": stats.errors, "latencies_ms": stats.latencies_ms}))
+
+
+def _run(mode: str, workers: int, threads: int, requests: int, seq_base: int) -> dict:
+    env = {**os.environ, **MODES[mode], "DJANGO_SETTINGS_MODULE": "benchmarks.settings"}
+    start_at = time.time() + 2 + workers * 0.5
+    procs = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.sqlite_concurrency",
+                "--child",
+                str(worker),
+                "--threads",
+                str(threads),
+                "--requests",
+                str(requests),
+                "--seq-base",
+                str(seq_base),
+                "--start-at",
+                str(start_at),
+            ],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        for worker in range(workers)
+    ]
+
+    stats = LatencyStats(name=mode)
+    for proc in procs:
+        out, _ = proc.communicate()
+        if proc.returncode:
+            raise SystemExit(f"worker failed with exit code {proc.returncode}")
+        result = json.loads(out.strip().splitlines()[-1])
+        stats.elapsed_seconds = max(stats.elapsed_seconds, result["elapsed"])
+        for latency in result["latencies_ms"]:
+            stats.record(latency / 1000, ok=True)
+        stats.errors += result["errors"]
+    return {"workers": workers, "threads": threads, **stats.summary()}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,4", help="Comma-separated worker process counts.")
+    parser.add_argument("--threads", type=int, default=8, help="Threads per worker.")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per thread.")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table.")
+    parser.add_argument("--child", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--seq-base", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child is not None:
+        run_child(args.child, args.threads, args.requests, args.seq_base, args.start_at)
+        return
+
+    worker_counts = [int(value) for value in args.workers.split(",")]
+    setup_django()
+
+    from django.conf import settings
+    from django.db import connection
+
+    database = settings.DATABASES["default"]
+    if not database["ENGINE"].endswith("sqlite3"):
+        raise SystemExit("benchmarks.sqlite_concurrency needs a SQLite BENCH_DATABASE_URL")
+    _seed(max(worker_counts), args.threads)
+    connection.close()
+
+    rows = []
+    for mode in MODES:
+        for workers in worker_counts:
+            # WAL is persistent in the database file; stock runs start from
+            # the default rollback journal.
+            _set_journal_mode(database["NAME"], "WAL" if mode == "tuned" else "DELETE")
+            rows.append(_run(mode, workers, args.threads, args.requests, seq_base=len(rows) * args.requests))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows, ["name", "workers", "threads", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Load benchmark for the study-session hot path: sync DRF views behind WSGI vs
+native async views behind ASGI.
+
+    python -m benchmarks.tracking_asgi --sessions 500 --pings 5000 --concurrency 64
+
+Each mode runs in its own subprocess (the view implementation is picked at URL
+import time from `TRACKING_ASYNC_VIEWS`). Every simulated tab starts a session,
+pings it repeatedly and stops it; requests/second and p50/p95/p99 latency are
+reported per phase.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .harness import LatencyStats, access_token_for, asgi_request, print_table, setup_django, wsgi_request
+
+
+MODES = {
+    "wsgi": "0",
+    "asgi": "1",
+}
+
+
+def _prepare_users(count: int) -> list[str]:
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    users = User.objects.bulk_create(
+        [User(email=f"bench-{i}@example.com", first_name="Bench", password="!") for i in range(count)],
+        batch_size=500,
+    )
+    if users and users[0].pk is None:
+        users = list(User.objects.filter(email__startswith="bench-").order_by("id"))
+    return [access_token_for(user) for user in users]
+
+
+PHASES = ("start", "ping", "stop")
+
+
+def _phase_requests(phase: str, tokens: list[str], session_ids: list[str | None], pings: int):
+    """
+    Returns `(index, path, payload, token)` tuples; `index` is the tab number.
+    """
+
+    if phase == "start":
+        return [(i, "/api/study-sessions/start/", {"context": "bench"}, token) for i, token in enumerate(tokens)]
+    if phase == "ping":
+        return [
+            (
+                i % len(tokens),
+                "/api/study-sessions/ping/",
+                {"session_id": session_ids[i % len(tokens)], "active_seconds": 30},
+                tokens[i % len(tokens)],
+            )
+            for i in range(pings)
+        ]
+    return [
+        (i, "/api/study-sessions/stop/", {"session_id": session_ids[i]}, token) for i, token in enumerate(tokens)
+    ]
+
+
+def run_wsgi(tokens: list[str], pings: int, concurrency: int) -> list[dict]:
+    from config.wsgi import application
+
+    session_ids: list[str | None] = [None] * len(tokens)
+    results = []
+
+    def call(stats: LatencyStats, index: int, path: str, payload: dict, token: str):
+        started = time.perf_counter()
+        status, body = wsgi_request(application, "POST", path, payload=payload, token=token)
+        stats.record(time.perf_counter() - started, ok=status < 400)
+        if status == 201:
+            session_ids[index] = json.loads(body)["id"]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for phase in PHASES:
+            stats = LatencyStats(name=phase)
+            requests = _phase_requests(phase, tokens, session_ids, pings)
+            started = time.perf_counter()
+            list(pool.map(lambda req: call(stats, *req), requests))
+            stats.elapsed_seconds = time.perf_counter() - started
+            results.append(stats.summary())
+    return results
+
+
+def run_asgi(tokens: list[str], pings: int, concurrency: int) -> list[dict]:
+    from config.asgi import application
+
+    session_ids: list[str | None] = [None] * len(tokens)
+
+    async def main() -> list[dict]:
+        results = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(stats: LatencyStats, index: int, path: str, payload: dict, token: str):
+            async with semaphore:
+                started = time.perf_counter()
+                status, body = await asgi_request(application, "POST", path, payload=payload, token=token)
+                stats.record(time.perf_counter() - started, ok=status < 400)
+                if status == 201:
+                    session_ids[index] = json.loads(body)["id"]
+
+        for phase in PHASES:
+            stats = LatencyStats(name=phase)
+            requests = _phase_requests(phase, tokens, session_ids, pings)
+            started = time.perf_counter()
+            await asyncio.gather(*(call(stats, *req) for req in requests))
+            stats.elapsed_seconds = time.perf_counter() - started
+            results.append(stats.summary())
+        return results
+
+    return asyncio.run(main())
+
+
+def run_child(mode: str, sessions: int, pings: int, concurrency: int) -> None:
+    setup_django()
+    tokens = _prepare_users(sessions)
+    runner = run_asgi if mode == "asgi" else run_wsgi
+    rows = [{"mode": mode, **row} for row in runner(tokens, pings, concurrency)]
+    print(json.dumps(rows))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["both", *MODES], default="both")
+    parser.add_argument("--sessions", type=int, default=200, help="Concurrent study sessions (open tabs).")
+    parser.add_argument("--pings", type=int, default=2000, help="Total ping requests.")
+    parser.add_argument("--concurrency", type=int, default=64, help="Requests in flight at once.")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.mode, args.sessions, args.pings, args.concurrency)
+        return
+
+    rows = []
+    for mode in MODES if args.mode == "both" else [args.mode]:
+        env = {**os.environ, "TRACKING_ASYNC_VIEWS": MODES[mode]}
+        proc = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.tracking_asgi",
+                "--child",
+                "--mode",
+                mode,
+                "--sessions",
+                str(args.sessions),
+                "--pings",
+                str(args.pings),
+                "--concurrency",
+                str(args.concurrency),
+            ],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        rows.extend(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows, ["mode", "name", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP is served by Django; study-session heartbeat WebSockets are routed to
+``apps.tracking.heartbeat``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -16,4 +18,9 @@ os.environ.setdefault(
     os.getenv("DJANGO_SETTINGS_MODULE", "config.settings.prod"),
 )
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after the app registry is ready (it touches models).
+from apps.tracking.heartbeat import HeartbeatRouter  # noqa: E402
+
+application = HeartbeatRouter(django_application)
@@ -0,0 +1,168 @@
+"""
+Primary/replica database routing.
+
+Enabled when `DATABASE_REPLICA_URL` is set (see `config.settings.base`):
+
+- reads of catalog content (`apps.learning`) go to the replica;
+- analytics reads opt in via `read_alias()` (e.g. study-time summaries);
+- every write, and all other reads, stay on the primary.
+
+Read-your-writes: once a user writes, their requests are pinned to the
+primary for `DATABASE_REPLICA_STICKY_SECONDS`, so replication lag never hides
+a ping or review they just made. Unsafe (non-GET) requests are always pinned.
+The pin is kept in the `DATABASE_REPLICA_STICKY_CACHE` cache, which every
+worker must share: the middleware refuses to start with a per-process one.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+
+
+REPLICA_ALIAS = "replica"
+
+REPLICA_APP_LABELS = frozenset({"learning"})
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+_current_user_id: ContextVar = ContextVar("db_router_user_id", default=None)
+_pinned: ContextVar[bool] = ContextVar("db_router_pinned", default=False)
+_wrote: ContextVar[bool] = ContextVar("db_router_wrote", default=False)
+
+
+def _sticky_key(user_id) -> str:
+    return f"db-router:pinned:{user_id}"
+
+
+def _sticky_cache():
+    return caches[settings.DATABASE_REPLICA_STICKY_CACHE]
+
+
+def check_sticky_cache() -> None:
+    """
+    Raise `ImproperlyConfigured` if pins would not reach the user's next
+    request: a per-process cache only pins it when the same worker serves it.
+    """
+
+    if settings.DATABASE_REPLICA_STICKY_SECONDS <= 0:
+        return
+    alias = settings.DATABASE_REPLICA_STICKY_CACHE
+    if isinstance(caches[alias], (LocMemCache, DummyCache)):
+        raise ImproperlyConfigured(
+            f"DATABASE_REPLICA_STICKY_SECONDS needs a cache shared by all workers, but the "
+            f"{alias!r} cache is {settings.CACHES[alias]['BACKEND']}. Set CACHE_URL (or "
+            f"DATABASE_REPLICA_STICKY_CACHE) to a shared cache, or DATABASE_REPLICA_STICKY_SECONDS=0."
+        )
+
+
+def replica_enabled() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def read_alias() -> str:
+    """
+    Database alias for replica-safe reads in the current request.
+    """
+
+    if not replica_enabled() or _pinned.get():
+        return DEFAULT_DB_ALIAS
+    return REPLICA_ALIAS
+
+
+def pin_to_primary() -> None:
+    """
+    Route the rest of this request, and the user's requests for the sticky
+    window, to the primary.
+    """
+
+    if _wrote.get():
+        return
+    _wrote.set(True)
+    _pinned.set(True)
+
+    user_id = _current_user_id.get()
+    if user_id is not None:
+        _sticky_cache().set(_sticky_key(user_id), True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in REPLICA_APP_LABELS:
+            return read_alias()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of the primary, so objects from either may be related.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """
+    Identifies the requesting user from the JWT (without a DB lookup) and pins
+    the request to the primary if it is unsafe or the user wrote recently.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        check_sticky_cache()
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _enter(user_id, pinned: bool):
+        return _current_user_id.set(user_id), _pinned.set(pinned), _wrote.set(False)
+
+    @staticmethod
+    def _exit(tokens) -> None:
+        user_token, pinned_token, wrote_token = tokens
+        _wrote.reset(wrote_token)
+        _pinned.reset(pinned_token)
+        _current_user_id.reset(user_token)
+
+    def _user_id(self, request):
+        from apps.tracking.async_auth import get_user_id_from_request
+
+        return get_user_id_from_request(request)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        user_id = self._user_id(request)
+        pinned = request.method not in SAFE_METHODS or (
+            user_id is not None and bool(_sticky_cache().get(_sticky_key(user_id)))
+        )
+        tokens = self._enter(user_id, pinned)
+        try:
+            return self.get_response(request)
+        finally:
+            self._exit(tokens)
+
+    async def __acall__(self, request):
+        user_id = self._user_id(request)
+        pinned = request.method not in SAFE_METHODS or (
+            user_id is not None and bool(await _sticky_cache().aget(_sticky_key(user_id)))
+        )
+        tokens = self._enter(user_id, pinned)
+        try:
+            return await self.get_response(request)
+        finally:
+            self._exit(tokens)
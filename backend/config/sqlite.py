@@ -0,0 +1,86 @@
+"""
+SQLite as a production database for single-node deployments.
+
+Connection tuning (`tune_sqlite_databases`, applied from settings when
+`SQLITE_TUNING` is on) sets, on every new connection:
+
+- `journal_mode=WAL`: readers no longer block the writer or each other;
+- `synchronous=NORMAL`: fsync at checkpoints instead of every commit (safe
+  with WAL; a power loss can only drop the last commits, never corrupt);
+- `busy_timeout`: a writer waits for the lock instead of failing at once
+  with "database is locked";
+- `cache_size` / `mmap_size`: page cache and memory-mapped reads;
+
+and opens every `transaction.atomic()` with `BEGIN IMMEDIATE`, so a
+transaction that reads before it writes takes the write lock up front
+instead of failing to upgrade its read lock (which `busy_timeout` cannot
+help with).
+
+SQLite still has a single writer. Within a process, `serialize_writes`
+queues the tracking writes on a lock so threads wait their turn in Python
+rather than spinning in SQLite's busy handler; across worker processes,
+`busy_timeout` does the queueing. Both are no-ops on other databases.
+Async code takes the same lock: under ASGI each request's `sync_to_async`
+calls run on a thread of their own (`ThreadSensitiveContext`), so async
+views and the heartbeat do their writes in one sync function that holds
+`serialized_writes`, wrapped once in `sync_to_async`.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS
+
+
+BASE_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+
+_write_lock = threading.RLock()
+
+
+def _is_file_sqlite(database: dict) -> bool:
+    name = str(database.get("NAME", ""))
+    return database["ENGINE"].endswith("sqlite3") and name != ":memory:" and "mode=memory" not in name
+
+
+def sqlite_options(pragmas: dict) -> dict:
+    """Django `OPTIONS` for a tuned SQLite connection."""
+    init_command = ";".join(f"PRAGMA {name}={value}" for name, value in {**BASE_PRAGMAS, **pragmas}.items())
+    return {"init_command": init_command, "transaction_mode": "IMMEDIATE"}
+
+
+def tune_sqlite_databases(databases: dict, pragmas: dict) -> None:
+    """Add `sqlite_options` to every file-backed SQLite database (explicit `OPTIONS` win)."""
+    for database in databases.values():
+        if _is_file_sqlite(database):
+            database["OPTIONS"] = {**sqlite_options(pragmas), **database.get("OPTIONS", {})}
+
+
+def _serialized(using: str) -> bool:
+    from django.conf import settings
+    from django.db import connections
+
+    return getattr(settings, "SQLITE_SERIALIZE_WRITES", False) and connections[using].vendor == "sqlite"
+
+
+@contextmanager
+def serialized_writes(using: str = DEFAULT_DB_ALIAS):
+    """Hold the process-wide SQLite write lock (re-entrant) for the block."""
+    if not _serialized(using):
+        yield
+        return
+    with _write_lock:
+        yield
+
+
+def serialize_writes(func):
+    """Decorator form of `serialized_writes` for the default database."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with serialized_writes():
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -1,15 +1,12 @@
 from django.contrib import admin
 from django.urls import include, path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+from apps.core.openapi import SchemaView, swagger_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path(
-        "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
-    ),
+    path("api/schema/", SchemaView.as_view(), name="schema"),
+    path("api/docs/", swagger_view, name="swagger-ui"),
     path("api/auth/", include("apps.accounts.urls")),
     path("api/", include("apps.learning.urls")),
     path("api/", include("apps.tracking.urls")),
@@ -7,18 +7,57 @@ type StartResponse = {
   id: string;
 };
 
+type PendingPing = {
+  seq: number;
+  seconds: number;
+};
+
+type PingResponse = {
+  duration_seconds: number;
+  next_ping_after?: number;
+};
+
+const DEFAULT_FLUSH_MS = 30_000;
+// The API accepts at most one hour of active time per ping.
+const MAX_ACTIVE_SECONDS = 60 * 60;
+
+// The access token goes in the first frame, not the URL (which proxies and logs record).
+function heartbeatUrl(apiBaseUrl: string, sessionId: string) {
+  const base = apiBaseUrl.replace(/^http/, "ws");
+  return `${base}/study-sessions/${sessionId}/heartbeat/`;
+}
+
+// Delay before retrying a throttled ping: `Retry-After` (seconds or an HTTP
+// date), and never sooner than the usual cadence.
+function retryAfterMs(res: Response) {
+  const header = res.headers.get("Retry-After");
+  if (!header) return DEFAULT_FLUSH_MS;
+  const seconds = Number(header);
+  const delayMs = Number.isFinite(seconds) ? seconds * 1000 : Date.parse(header) - Date.now();
+  return Number.isFinite(delayMs) ? Math.max(delayMs, DEFAULT_FLUSH_MS) : DEFAULT_FLUSH_MS;
+}
+
 export function useStudySessionTracker(context: string) {
-  const { authFetch, user } = useAuth();
+  const { authFetch, user, access } = useAuth();
   const apiBaseUrl = getApiBaseUrl();
 
+  const accessRef = useRef(access);
+  accessRef.current = access;
+
   const sessionIdRef = useRef<string | null>(null);
+  const socketRef = useRef<WebSocket | null>(null);
   const pendingSecondsRef = useRef(0);
+  // Per-session ping sequence; a failed ping is resent with the same `seq`
+  // so the server can drop it if the first attempt actually landed.
+  const pingSeqRef = useRef(0);
+  const unackedPingRef = useRef<PendingPing | null>(null);
   const lastActivityRef = useRef<number>(Date.now());
 
   useEffect(() => {
     if (!user) return;
 
     let cancelled = false;
+    let flushTimer: number | undefined;
     const idleMs = 60_000;
 
     function markActivity() {
@@ -26,7 +65,10 @@ export function useStudySessionTracker(context: string) {
     }
 
     const onVisibility = () => {
-      void flush();
+      void flush().then((nextMs) => {
+        // Coming back from a hidden tab: don't keep the long hidden-tab delay.
+        scheduleFlush(document.visibilityState === "visible" ? DEFAULT_FLUSH_MS : nextMs);
+      });
     };
     const onBeforeUnload = () => {
       void stop();
@@ -40,25 +82,126 @@ export function useStudySessionTracker(context: string) {
       });
       if (!res.ok) return;
       const data = (await res.json()) as StartResponse;
-      if (!cancelled) sessionIdRef.current = data.id;
+      if (cancelled) return;
+      sessionIdRef.current = data.id;
+      pingSeqRef.current = 0;
+      unackedPingRef.current = null;
+      openHeartbeat(data.id);
     }
 
-    async function flush() {
-      const sessionId = sessionIdRef.current;
-      const seconds = pendingSecondsRef.current;
-      if (!sessionId || seconds <= 0) return;
+    // One long-lived socket per session; HTTP pings are the fallback whenever
+    // it is not open (unsupported, rejected, or dropped).
+    function openHeartbeat(sessionId: string) {
+      const token = accessRef.current;
+      if (!token || typeof WebSocket === "undefined") return;
+
+      let socket: WebSocket;
+      try {
+        socket = new WebSocket(heartbeatUrl(apiBaseUrl, sessionId));
+      } catch {
+        return;
+      }
+      socket.onopen = () => {
+        if (cancelled || sessionIdRef.current !== sessionId) {
+          socket.close();
+          return;
+        }
+        socket.send(JSON.stringify({ token }));
+      };
+      // Heartbeats go over the socket only once the server has accepted the token.
+      socket.onmessage = (event) => {
+        if (socketRef.current === socket) return;
+        let data: { authenticated?: boolean } | null = null;
+        try {
+          data = JSON.parse(String(event.data)) as { authenticated?: boolean };
+        } catch {
+          return;
+        }
+        if (data?.authenticated && !cancelled && sessionIdRef.current === sessionId) socketRef.current = socket;
+      };
+      socket.onclose = () => {
+        if (socketRef.current === socket) socketRef.current = null;
+      };
+    }
+
+    function closeHeartbeat() {
+      const socket = socketRef.current;
+      socketRef.current = null;
+      socket?.close();
+    }
 
-      pendingSecondsRef.current = 0;
-      await authFetch(`${apiBaseUrl}/study-sessions/ping/`, {
+    function scheduleFlush(delayMs: number) {
+      if (cancelled) return;
+      window.clearTimeout(flushTimer);
+      flushTimer = window.setTimeout(() => {
+        void flush().then((nextMs) => scheduleFlush(nextMs));
+      }, delayMs);
+    }
+
+    // Sends pending active time; resolves to the delay before the next flush.
+    // Over HTTP the server paces us via `next_ping_after`; the socket is cheap
+    // enough to keep the default cadence.
+    async function flush(): Promise<number> {
+      const sessionId = sessionIdRef.current;
+      if (!sessionId) return DEFAULT_FLUSH_MS;
+
+      let ping = unackedPingRef.current;
+      if (!ping) {
+        const seconds = Math.min(pendingSecondsRef.current, MAX_ACTIVE_SECONDS);
+        if (seconds <= 0) return DEFAULT_FLUSH_MS;
+        pendingSecondsRef.current -= seconds;
+
+        const socket = socketRef.current;
+        if (socket && socket.readyState === WebSocket.OPEN) {
+          socket.send(JSON.stringify({ active_seconds: seconds }));
+          return DEFAULT_FLUSH_MS;
+        }
+
+        pingSeqRef.current += 1;
+        ping = { seq: pingSeqRef.current, seconds };
+        unackedPingRef.current = ping;
+      }
+
+      const res = await authFetch(`${apiBaseUrl}/study-sessions/ping/`, {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ session_id: sessionId, active_seconds: seconds }),
+        body: JSON.stringify({
+          session_id: sessionId,
+          active_seconds: ping.seconds,
+          seq: ping.seq,
+          visible: document.visibilityState === "visible",
+        }),
         keepalive: true,
       }).catch(() => undefined);
+
+      // Network errors and 5xx are retried on the next flush, and a throttled
+      // ping once its `Retry-After` has passed, with the same `seq`.
+      if (!res || res.status >= 500) return DEFAULT_FLUSH_MS;
+      if (res.status === 429) return retryAfterMs(res);
+      // The server closed the session after a long idle spell: carry the
+      // time over to a new one.
+      if (res.status === 404 && sessionIdRef.current === sessionId) {
+        unackedPingRef.current = null;
+        pendingSecondsRef.current += ping.seconds;
+        sessionIdRef.current = null;
+        closeHeartbeat();
+        await start();
+        return DEFAULT_FLUSH_MS;
+      }
+      // Only a 2xx, 400 or 409 settles the ping; anything else (such as a 401
+      // the token refresh did not clear) keeps it for the next flush.
+      if (!res.ok && res.status !== 400 && res.status !== 409) return DEFAULT_FLUSH_MS;
+      if (unackedPingRef.current === ping) unackedPingRef.current = null;
+      if (!res.ok) return DEFAULT_FLUSH_MS;
+
+      const data = (await res.json().catch(() => null)) as PingResponse | null;
+      const nextSeconds = data?.next_ping_after;
+      return typeof nextSeconds === "number" && nextSeconds > 0 ? nextSeconds * 1000 : DEFAULT_FLUSH_MS;
     }
 
     async function stop() {
       await flush();
+      closeHeartbeat();
       const sessionId = sessionIdRef.current;
       if (!sessionId) return;
       sessionIdRef.current = null;
@@ -77,9 +220,7 @@ export function useStudySessionTracker(context: string) {
       if (!isIdle && isVisible) pendingSecondsRef.current += 1;
     }, 1000);
 
-    const flushInterval = window.setInterval(() => {
-      void flush();
-    }, 30_000);
+    scheduleFlush(DEFAULT_FLUSH_MS);
 
     window.addEventListener("mousemove", markActivity);
     window.addEventListener("keydown", markActivity);
@@ -93,7 +234,7 @@ export function useStudySessionTracker(context: string) {
     return () => {
       cancelled = true;
       window.clearInterval(tick);
-      window.clearInterval(flushInterval);
+      window.clearTimeout(flushTimer);
       window.removeEventListener("mousemove", markActivity);
       window.removeEventListener("keydown", markActivity);
       window.removeEventListener("scroll", markActivity);
@@ -4,6 +4,7 @@ import { useNavigate } from "react-router-dom";
 import { useAuth } from "../../app/providers/AuthProvider";
 import { useTheme } from "../../app/providers/ThemeProvider";
 import { useStudySessionTracker } from "../../features/studyTime/useStudySessionTracker";
+import { LessonCover, type CoverImages } from "../../shared/components/LessonCover";
 import { getApiBaseUrl } from "../../shared/config/env";
 import { usePageStyles } from "../../shared/hooks/usePageStyles";
 import { formatDuration } from "../../shared/utils/format";
@@ -13,6 +14,7 @@ type Lesson = {
   slug: string;
   title: string;
   cover_image_path: string;
+  cover_images: CoverImages | null;
   order: number;
   card_count: number;
 };
@@ -34,10 +36,17 @@ type RevisionSchedule = {
     slug: string;
     title: string;
     cover_image_path: string;
+    cover_images: CoverImages | null;
   };
   stage: number;
   next_review_at: string | null;
   status: string;
+  version: number;
+};
+
+// `/revisions/session/`: due schedules with their lessons' cards, in one request.
+type RevisionSessionSchedule = RevisionSchedule & {
+  lesson: RevisionSchedule["lesson"] & { cards: LessonCard[] };
 };
 
 type DashboardResponse = {
@@ -161,7 +170,10 @@ export function DashboardPage() {
 
   const [activeLesson, setActiveLesson] = useState<Lesson | null>(null);
   const [activeScheduleId, setActiveScheduleId] = useState<string | null>(null);
+  const [activeScheduleVersion, setActiveScheduleVersion] = useState<number | null>(null);
   const [cards, setCards] = useState<LessonCard[]>([]);
+  // Cards of the due revisions, loaded when the first one is started.
+  const [revisionDecks, setRevisionDecks] = useState<Map<string, LessonCard[]> | null>(null);
   const [learnedIds, setLearnedIds] = useState<Set<string>>(new Set());
   const [currentIndex, setCurrentIndex] = useState(0);
   const [sessionStartMs, setSessionStartMs] = useState<number | null>(null);
@@ -214,16 +226,33 @@ export function DashboardPage() {
     };
   }, [activePage, apiBaseUrl, authFetch]);
 
-  async function startFlashcards(lessonSlug: string, scheduleId?: string | null) {
+  async function startFlashcards(lessonSlug: string, scheduleId?: string | null, scheduleVersion?: number) {
     const lesson = lessons.find((l) => l.slug === lessonSlug) || null;
     setActiveLesson(lesson);
     setActiveScheduleId(scheduleId ?? null);
+    setActiveScheduleVersion(scheduleVersion ?? null);
     setShowMnemonic(false);
     setShowCompletion(false);
     setLearnedIds(new Set());
     setCurrentIndex(0);
     setSessionStartMs(Date.now());
 
+    // The first revision started loads every due revision's cards from
+    // `/revisions/session/` in one request; later ones reuse them.
+    let decks = revisionDecks;
+    if (scheduleId && !decks) {
+      const sessionRes = await authFetch(`${apiBaseUrl}/revisions/session/`);
+      const session = sessionRes.ok ? ((await sessionRes.json()) as RevisionSessionSchedule[]) : [];
+      decks = new Map(session.map((schedule) => [schedule.id, schedule.lesson.cards]));
+      setRevisionDecks(decks);
+    }
+    const prefetched = scheduleId ? decks?.get(scheduleId) : undefined;
+    if (prefetched) {
+      setCards(prefetched);
+      setActivePage("flashcard");
+      return;
+    }
+
     const res = await authFetch(`${apiBaseUrl}/lessons/${lessonSlug}/cards/`);
     if (!res.ok) return;
     const deck = (await res.json()) as LessonCard[];
@@ -261,7 +290,12 @@ export function DashboardPage() {
     // Sync backend SRS
     if (activeLesson) {
       if (activeScheduleId) {
-        await authFetch(`${apiBaseUrl}/revisions/${activeScheduleId}/review/`, { method: "POST" });
+        // Sending the version we reviewed makes a repeated submit a 409 instead of a second review.
+        await authFetch(`${apiBaseUrl}/revisions/${activeScheduleId}/review/`, {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify(activeScheduleVersion === null ? {} : { version: activeScheduleVersion }),
+        });
       } else {
         await authFetch(`${apiBaseUrl}/lessons/${activeLesson.slug}/complete/`, { method: "POST" });
       }
@@ -470,12 +504,17 @@ export function DashboardPage() {
                 {dashboardRevisionTopics.map((topic) => (
                   <div className="learning-card" key={topic.id}>
                     <div className="learning-image">
-                      <img src={topic.lesson.cover_image_path} alt="" />
+                      <LessonCover
+                        path={topic.lesson.cover_image_path}
+                        images={topic.lesson.cover_images}
+                        alt=""
+                        sizes="350px"
+                      />
                       <span className="lesson-badge">{topic.lesson.title}</span>
                     </div>
                     <div className="learning-content">
                       <div className="instructor">
-                        <button className="start-btn" onClick={() => void startFlashcards(topic.lesson.slug, topic.id)}>
+                        <button className="start-btn" onClick={() => void startFlashcards(topic.lesson.slug, topic.id, topic.version)}>
                           Boshlash
                         </button>
                         <span className="review-time-small">{formatReviewTime(topic.next_review_at, topic.status)}</span>
@@ -499,7 +538,12 @@ export function DashboardPage() {
                 {lessons.map((lesson) => (
                   <div className="theme-card" key={lesson.id}>
                     <div className="theme-image">
-                      <img src={lesson.cover_image_path} alt={lesson.title} />
+                      <LessonCover
+                        path={lesson.cover_image_path}
+                        images={lesson.cover_images}
+                        alt={lesson.title}
+                        sizes="(max-width: 600px) 100vw, 320px"
+                      />
                       <span className="lesson-badge">{lesson.card_count}ta so'z</span>
                     </div>
                     <div className="theme-info">
@@ -537,11 +581,11 @@ export function DashboardPage() {
                         <div
                           className="review-item"
                           key={t.id}
-                          onClick={() => void startFlashcards(t.lesson.slug, t.id)}
+                          onClick={() => void startFlashcards(t.lesson.slug, t.id, t.version)}
                           role="button"
                           tabIndex={0}
                         >
-                          <img src={t.lesson.cover_image_path} alt="" />
+                          <LessonCover path={t.lesson.cover_image_path} images={t.lesson.cover_images} alt="" sizes="80px" />
                           <div className="review-details">
                             <h4>{t.lesson.title}</h4>
                           </div>
@@ -0,0 +1,35 @@
+export type CoverImages = {
+  width: number;
+  height: number;
+  src: string;
+  sources: { type: string; srcset: string }[];
+};
+
+type LessonCoverProps = {
+  path: string;
+  images?: CoverImages | null;
+  alt: string;
+  // Rendered width of the image slot, so the browser picks the smallest variant that fits.
+  sizes: string;
+};
+
+export function LessonCover({ path, images, alt, sizes }: LessonCoverProps) {
+  if (!images) return <img src={path} alt={alt} loading="lazy" decoding="async" />;
+
+  return (
+    <picture>
+      {images.sources.map((source) => (
+        <source key={source.type} type={source.type} srcSet={source.srcset} sizes={sizes} />
+      ))}
+      <img
+        src={images.src}
+        alt={alt}
+        width={images.width}
+        height={images.height}
+        sizes={sizes}
+        loading="lazy"
+        decoding="async"
+      />
+    </picture>
+  );
+}